@@ -16,7 +16,8 @@ celery = Celery(
         'tasks.case',           
         'tasks.helpers',
         'tasks.batch',
-        'tasks.chain_tasks'       
+        'tasks.chain_tasks',
+        'tasks.imports'
     ]
 )
 
@@ -5,6 +5,7 @@ This module contains custom Flask CLI commands for administrative tasks.
 Only includes essential commands for the fresh execution engine implementation.
 """
 
+import json
 import click
 from flask.cli import with_appcontext
 from flask import Blueprint
@@ -119,7 +120,248 @@ def delete_user_command(username):
         click.secho(f"❌ Error deleting user: {e}", fg="red")
 
 
+@click.command('compact-response-bodies')
+@click.option('--batch-size', default=500, show_default=True, help='Execution results migrated per commit.')
+@click.option('--prune/--no-prune', default=True, help='Delete stored bodies no longer referenced.')
+@with_appcontext
+def compact_response_bodies_command(batch_size, prune):
+    """Moves inline execution response bodies into the deduplicated body store."""
+    from models.model_ExecutionSession import ExecutionResult
+    from services.results.response_store import prune_orphaned_response_bodies
+
+    migrated = 0
+    try:
+        while True:
+            batch = ExecutionResult.query.filter(
+                ExecutionResult.response_body_hash.is_(None),
+                ExecutionResult.response_data.isnot(None)
+            ).order_by(ExecutionResult.id).limit(batch_size).all()
+
+            if not batch:
+                break
+
+            for result in batch:
+                body = result.response_data
+                if not isinstance(body, str):
+                    body = json.dumps(body)
+                result.set_response_body(body)
+
+            db.session.commit()
+            migrated += len(batch)
+            click.echo(f"  Moved {migrated} response bodies...")
+
+        pruned = prune_orphaned_response_bodies() if prune else 0
+        db.session.commit()
+        click.secho(f"✅ Moved {migrated} inline bodies, pruned {pruned} orphaned bodies.", fg="green")
+
+    except Exception as e:
+        db.session.rollback()
+        click.secho(f"❌ Error compacting response bodies: {e}", fg="red")
+
+
+@click.command('archive-sessions')
+@click.option('--older-than-days', type=int, default=None,
+              help='Archive sessions completed more than this many days ago (default: RESULT_ARCHIVE_AFTER_DAYS).')
+@click.option('--limit', type=int, default=None, help='Maximum number of sessions to archive in this run.')
+@with_appcontext
+def archive_sessions_command(older_than_days, limit):
+    """Moves results of old, completed execution sessions to the Parquet archive."""
+    from flask import current_app
+    from services.results.archive import archive_completed_sessions, index_archived_sessions
+
+    if older_than_days is None:
+        older_than_days = current_app.config['RESULT_ARCHIVE_AFTER_DAYS']
+
+    indexed = index_archived_sessions()
+    if indexed:
+        db.session.commit()
+        click.echo(f"Recorded result id ranges of {indexed} previously archived session(s).")
+
+    click.echo(f"Archiving sessions completed more than {older_than_days} day(s) ago...")
+    archived_ids = archive_completed_sessions(older_than_days, limit=limit)
+
+    if not archived_ids:
+        click.echo("No sessions to archive.")
+        return
+    click.secho(f"✅ Archived {len(archived_ids)} session(s) to {current_app.config['ARCHIVE_FOLDER']}", fg="green")
+
+
+@click.command('export-results')
+@click.argument('run_id', type=int)
+@click.option('--output', '-o', required=True, type=click.Path(dir_okay=False, writable=True),
+              help='Destination file.')
+@click.option('--format', 'export_format', type=click.Choice(['csv', 'jsonl', 'parquet']), default=None,
+              help='Output format (default: inferred from the file extension, else csv).')
+@click.option('--session-id', type=int, default=None, help='Export a single execution session.')
+@click.option('--columns', default=None, help='Comma-separated list of columns.')
+@click.option('--success', type=click.Choice(['true', 'false']), default=None, help='Only passed or failed results.')
+@click.option('--status-code', type=int, default=None, help='Only results with this HTTP status code.')
+@click.option('--iteration', type=int, default=None, help='Only results of this iteration.')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows fetched per database round trip.')
+@with_appcontext
+def export_results_command(run_id, output, export_format, session_id, columns, success, status_code,
+                           iteration, batch_size):
+    """Streams the execution results of a test run to a CSV, JSONL or Parquet file."""
+    import os
+    from models.model_TestRun import TestRun
+    from models.model_ExecutionSession import ExecutionSession
+    from services.results.export import (
+        ExportError, iter_result_batches, parse_columns, parse_filters,
+        stream_csv, stream_jsonl, write_parquet
+    )
+
+    run = db.session.get(TestRun, run_id)
+    if not run:
+        click.secho(f"❌ Error: Test run {run_id} not found.", fg="red")
+        return
+
+    if export_format is None:
+        extension = os.path.splitext(output)[1].lstrip('.').lower()
+        export_format = {'ndjson': 'jsonl'}.get(extension, extension)
+        if export_format not in ('csv', 'jsonl', 'parquet'):
+            export_format = 'csv'
+
+    try:
+        selected_columns = parse_columns(columns.split(',') if columns else None)
+        filters = parse_filters({'success': success, 'status_code': status_code, 'iteration': iteration})
+    except ExportError as e:
+        click.secho(f"❌ Error: {e}", fg="red")
+        return
+
+    sessions_query = ExecutionSession.query.filter(ExecutionSession.test_run_id == run.id)
+    if session_id:
+        sessions_query = sessions_query.filter(ExecutionSession.id == session_id)
+    sessions = sessions_query.order_by(ExecutionSession.started_at).all()
+
+    rows_written = 0
+
+    def counted(batches):
+        nonlocal rows_written
+        for rows in batches:
+            rows_written += len(rows)
+            yield rows
+
+    batches = counted(iter_result_batches(sessions, selected_columns, filters, batch_size))
+    if export_format == 'parquet':
+        write_parquet(batches, selected_columns, output)
+    else:
+        chunks = stream_csv(batches, selected_columns) if export_format == 'csv' else stream_jsonl(batches)
+        with open(output, 'w', newline='' if export_format == 'csv' else None, encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(chunk)
+
+    click.secho(f"✅ Exported {rows_written} result(s) from {len(sessions)} session(s) to {output}", fg="green")
+
+
+@click.command('backfill-prompt-fingerprints')
+@click.option('--batch-size', default=2000, show_default=True, help='Test cases updated per commit.')
+@with_appcontext
+def backfill_prompt_fingerprints_command(batch_size):
+    """Computes prompt hashes and fingerprints for test cases created before they existed."""
+    from sqlalchemy import or_, update
+    from models.model_TestCase import TestCase
+    from services.test_cases.fingerprint import prompt_fingerprint, prompt_hash
+
+    updated = 0
+    while True:
+        rows = db.session.query(TestCase.id, TestCase.prompt).filter(
+            or_(TestCase.prompt_fingerprint.is_(None), TestCase.prompt_hash.is_(None))
+        ).order_by(TestCase.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        db.session.execute(
+            update(TestCase),
+            [{'id': case_id, 'prompt_hash': prompt_hash(prompt), 'prompt_fingerprint': prompt_fingerprint(prompt)}
+             for case_id, prompt in rows]
+        )
+        db.session.commit()
+        updated += len(rows)
+        click.echo(f"  Fingerprinted {updated} test cases...")
+
+    click.secho(f"✅ Backfilled {updated} prompt fingerprint(s).", fg="green")
+
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """(Re)creates the prompt and response search indexes: tsvector/pg_trgm on Postgres, FTS5 on SQLite."""
+    from services.test_cases.search import create_search_index, drop_search_index, get_search_backend
+    from services.results.response_search import create_response_search_index, drop_response_search_index
+
+    with db.engine.begin() as connection:
+        drop_search_index(connection)
+        create_search_index(connection)
+        drop_response_search_index(connection)
+        create_response_search_index(connection)
+    click.secho(f"✅ Search indexes rebuilt (backend: {get_search_backend()}).", fg="green")
+
+
+@click.command('backfill-response-text')
+@click.option('--batch-size', default=500, show_default=True, help='Response bodies updated per commit.')
+@with_appcontext
+def backfill_response_text_command(batch_size):
+    """Extracts searchable response text for bodies stored before it was captured."""
+    from sqlalchemy import update
+    from models.model_ResponseBody import ResponseBody
+    from services.results.response_store import decompress_body
+    from services.results.response_text import extract_response_text
+
+    updated = 0
+    last_hash = ''
+    while True:
+        rows = ResponseBody.query.filter(
+            ResponseBody.response_text.is_(None),
+            ResponseBody.content_hash > last_hash
+        ).order_by(ResponseBody.content_hash).limit(batch_size).all()
+        if not rows:
+            break
+
+        db.session.execute(
+            update(ResponseBody),
+            [{'content_hash': row.content_hash, 'response_text': extract_response_text(decompress_body(row))}
+             for row in rows]
+        )
+        db.session.commit()
+        last_hash = rows[-1].content_hash
+        updated += len(rows)
+        db.session.expunge_all()
+        click.echo(f"  Extracted text for {updated} response bodies...")
+
+    click.secho(f"✅ Backfilled response text for {updated} bodies.", fg="green")
+
+
+@click.command('rebuild-case-stats')
+@with_appcontext
+def rebuild_case_stats_command():
+    """Recomputes per-(test case, endpoint) pass/fail history from stored execution results."""
+    from services.results.case_stats import rebuild_case_stats
+
+    written = rebuild_case_stats()
+    db.session.commit()
+    click.secho(f"✅ Rebuilt pass/fail history for {written} (test case, endpoint) pair(s).", fg="green")
+
+
+@click.command('backfill-chain-steps')
+@with_appcontext
+def backfill_chain_steps_command():
+    """Creates per-step rows for chain results recorded before chain steps were persisted."""
+    from services.results.chain_steps import backfill_chain_steps
+
+    written = backfill_chain_steps()
+    db.session.commit()
+    click.secho(f"✅ Wrote {written} chain step row(s).", fg="green")
+
+
 # Register commands with the blueprint
 bp.cli.add_command(create_admin_command)
 bp.cli.add_command(list_users_command)
-bp.cli.add_command(delete_user_command)
\ No newline at end of file
+bp.cli.add_command(delete_user_command)
+bp.cli.add_command(compact_response_bodies_command)
+bp.cli.add_command(archive_sessions_command)
+bp.cli.add_command(export_results_command)
+bp.cli.add_command(backfill_prompt_fingerprints_command)
+bp.cli.add_command(rebuild_search_index_command)
+bp.cli.add_command(backfill_response_text_command)
+bp.cli.add_command(rebuild_case_stats_command)
+bp.cli.add_command(backfill_chain_steps_command)
\ No newline at end of file
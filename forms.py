@@ -165,6 +165,18 @@ class EndpointForm(FlaskForm):
     auth_method = SelectField('Authentication Method', choices=[('none', 'None'), ('bearer', 'Bearer Token'), ('api_key', 'Custom API Key Header')], default='none')
     credentials_encrypted = StringField('Credentials (Token or Key)', validators=[Optional()], description="Secret value will be encrypted upon saving.")
     
+    # Token refresh for bearer tokens that expire during long runs
+    token_refresh_chain = QuerySelectField(
+        'Token Refresh Chain',
+        query_factory=lambda: APIChain.query.filter_by(user_id=current_user.id).order_by(APIChain.name),
+        get_label='name',
+        allow_blank=True,
+        blank_text='None',
+        description="Chain that obtains a fresh token; it runs shortly before the token in the header below expires or when it is rejected."
+    )
+    token_refresh_variable = StringField('Token Variable', validators=[Length(max=100)], render_kw={"placeholder": "e.g., access_token"}, description="Variable extracted by the refresh chain that holds the new token.")
+    token_header = StringField('Token Header', default='Authorization', validators=[Optional(), Length(max=255)], description="Header that carries the token. Authorization tokens are sent as 'Bearer <token>'.")
+    
     raw_headers = TextAreaField(
         'Raw Headers (Optional)',
         description="One 'Key: Value' pair per line. These are used for non-sensitive headers like 'Accept'. Sensitive tokens should use the Authentication fields below.",
@@ -197,4 +209,9 @@ class EndpointForm(FlaskForm):
     def validate_payload_template(self, field):
         """Validate existing template is selected when using existing option."""
         if self.payload_option.data == 'existing' and not field.data:
-            raise ValidationError('Please select an existing template or choose a different option.')
\ No newline at end of file
+            raise ValidationError('Please select an existing template or choose a different option.')
+
+    def validate_token_refresh_variable(self, field):
+        """Validate the token variable is named when a refresh chain is selected."""
+        if self.token_refresh_chain.data and not field.data:
+            raise ValidationError('Name the refresh chain variable that holds the token.')
\ No newline at end of file
@@ -91,6 +91,13 @@ class Config:
     UPLOAD_FOLDER_NAME = 'uploads' # Relative to instance path
     ALLOWED_EXTENSIONS = {'txt', 'csv', 'json', 'yaml', 'yml'}
 
+    # Parquet archive of old execution results (relative to instance path)
+    ARCHIVE_FOLDER_NAME = 'archive'
+    RESULT_ARCHIVE_AFTER_DAYS = int(os.environ.get('RESULT_ARCHIVE_AFTER_DAYS', 30))
+
+    # Seconds the landing page statistics are cached per user
+    DASHBOARD_STATS_TTL = int(os.environ.get('DASHBOARD_STATS_TTL', 30))
+
     # Flask Debug Mode
     DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() in ('true', '1', 't')
 
@@ -141,6 +148,9 @@ def create_app(config_object=Config): # Pass the class itself
         upload_path = os.path.join(app.instance_path, app.config['UPLOAD_FOLDER_NAME'])
         os.makedirs(upload_path, exist_ok=True)
         app.config['UPLOAD_FOLDER'] = upload_path # Set absolute path for UPLOAD_FOLDER
+        archive_path = os.path.join(app.instance_path, app.config['ARCHIVE_FOLDER_NAME'])
+        os.makedirs(archive_path, exist_ok=True)
+        app.config['ARCHIVE_FOLDER'] = archive_path
     except OSError as e:
         app.logger.error(f"Error creating instance path or upload folder: {e}")
 
@@ -13,12 +13,17 @@ from .model_TestSuite import TestSuite
 # TestExecution and TestRunAttempt removed - replaced by ExecutionSession/ExecutionResult
 from .model_TestRun import TestRun
 from .model_ExecutionSession import ExecutionSession, ExecutionResult
+from .model_ResponseBody import ResponseBody
 from .model_PromptFilter import PromptFilter
 from .model_Invitation import Invitation
 from .model_Dialogue import Dialogue 
 from .model_ManualTestRecord import ManualTestRecord 
 from .model_APIChain import APIChain, APIChainStep
 from .model_PayloadTemplate import PayloadTemplate
+from .model_SuiteImportJob import SuiteImportJob
+from .model_TestCaseEndpointStats import TestCaseEndpointStats
+from .model_ChainStepResult import ChainStepResult
+from .model_ChainRun import ChainRun, ChainStepLog
 
 
 # Import association tables if they are defined in models/associations.py
@@ -28,8 +33,9 @@ from .model_PayloadTemplate import PayloadTemplate
 __all__ = [
     'db',
     'User', 'EndpointHeader', 'Endpoint', 'TestCase', 'TestSuite',
-    'TestRun', 'ExecutionSession', 'ExecutionResult', 
+    'TestRun', 'ExecutionSession', 'ExecutionResult', 'ResponseBody',
     'PromptFilter', 'Invitation', 'Dialogue', 'ManualTestRecord',
-    'APIChain', 'APIChainStep', 'PayloadTemplate',
+    'APIChain', 'APIChainStep', 'PayloadTemplate', 'SuiteImportJob', 'TestCaseEndpointStats',
+    'ChainStepResult', 'ChainRun', 'ChainStepLog',
     'test_suite_cases', 'test_run_suites', 'test_run_filters'
 ]
\ No newline at end of file
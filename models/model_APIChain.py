@@ -30,6 +30,14 @@ class APIChain(db.Model):
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
     updated_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Bumped whenever a step is added, edited, removed or reordered; workers
+    # rebuild their cached execution plan when it changes
+    steps_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+    def touch_steps(self):
+        """Mark the steps as changed so cached execution plans are recompiled. The caller commits."""
+        self.steps_version = (self.steps_version or 0) + 1
+
     def to_dict(self):
         """Convert the API chain instance into a dictionary."""
         return {
@@ -39,6 +47,7 @@ class APIChain(db.Model):
             "user_id": self.user_id,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "steps_version": self.steps_version,
             "steps": [step.to_dict() for step in self.steps.all()] # .all() is needed if lazy='dynamic'
         }
 
@@ -0,0 +1,125 @@
+# models/model_ChainRun.py
+"""
+Background executions of an API chain and their step logs
+
+A ChainRun is written when `/api/chains/<id>/execute` starts a chain and is
+updated after every step, together with one ChainStepLog row per finished
+step, so callers can follow progress while the chain runs. The run keeps the
+context after its last successful step, which lets a failed run be resumed
+from the failing step instead of from step one.
+"""
+
+from extensions import db
+from datetime import datetime
+
+
+class ChainRun(db.Model):
+    """
+    One background execution of a chain
+    """
+    __tablename__ = 'chain_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    chain_id = db.Column(db.Integer, db.ForeignKey('api_chains.id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+
+    # The failed run this one continues from
+    resumed_from_id = db.Column(db.Integer, db.ForeignKey('chain_runs.id', ondelete='SET NULL'), nullable=True)
+    celery_task_id = db.Column(db.String(255), nullable=True)
+
+    status = db.Column(db.String(20), default='pending', nullable=False)  # pending, running, completed, failed
+    # APIChain.steps_version the run executed; a failed run can only resume on the same version
+    steps_version = db.Column(db.Integer, nullable=True)
+    total_steps = db.Column(db.Integer, default=0, nullable=False)
+    completed_steps = db.Column(db.Integer, default=0, nullable=False)
+    last_completed_step_order = db.Column(db.Integer, nullable=True)
+    failed_step_order = db.Column(db.Integer, nullable=True)
+    error_message = db.Column(db.Text, nullable=True)
+
+    # Chain context after the last successful step
+    context = db.Column(db.JSON, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    chain = db.relationship('APIChain', backref=db.backref('runs', lazy='dynamic', passive_deletes=True))
+    resumed_from = db.relationship('ChainRun', remote_side=[id])
+    step_logs = db.relationship('ChainStepLog', back_populates='chain_run', cascade='all, delete-orphan',
+                                order_by='ChainStepLog.id', lazy='dynamic')
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
+
+    def to_dict(self, include_steps=False):
+        """Convert to dictionary for API responses"""
+        data = {
+            'id': self.id,
+            'chain_id': self.chain_id,
+            'resumed_from_id': self.resumed_from_id,
+            'celery_task_id': self.celery_task_id,
+            'status': self.status,
+            'steps_version': self.steps_version,
+            'total_steps': self.total_steps,
+            'completed_steps': self.completed_steps,
+            'progress_percentage': (self.completed_steps / self.total_steps * 100) if self.total_steps else 0,
+            'last_completed_step_order': self.last_completed_step_order,
+            'failed_step_order': self.failed_step_order,
+            'error_message': self.error_message,
+            'context_keys': sorted((self.context or {}).keys()),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+        if include_steps:
+            data['steps'] = [log.to_dict() for log in self.step_logs]
+        return data
+
+    def __repr__(self):
+        return f"<ChainRun {self.id} chain={self.chain_id} status={self.status} steps={self.completed_steps}/{self.total_steps}>"
+
+
+class ChainStepLog(db.Model):
+    """
+    Outcome of one step of a ChainRun, written as soon as the step finishes
+    """
+    __tablename__ = 'chain_step_logs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    chain_run_id = db.Column(db.Integer, db.ForeignKey('chain_runs.id', ondelete='CASCADE'), nullable=False, index=True)
+    step_id = db.Column(db.Integer, db.ForeignKey('api_chain_steps.id', ondelete='SET NULL'), nullable=True)
+    endpoint_id = db.Column(db.Integer, db.ForeignKey('endpoints.id', ondelete='SET NULL'), nullable=True)
+
+    step_order = db.Column(db.Integer, nullable=False)
+    step_name = db.Column(db.String(100), nullable=True)
+    status = db.Column(db.String(20), nullable=False)  # success, error
+    status_code = db.Column(db.Integer, nullable=True)
+    latency_ms = db.Column(db.Integer, nullable=True)
+    response_preview = db.Column(db.Text, nullable=True)
+    extracted_preview = db.Column(db.JSON, nullable=True)
+    error_message = db.Column(db.Text, nullable=True)
+    finished_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    chain_run = db.relationship('ChainRun', back_populates='step_logs')
+
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'id': self.id,
+            'chain_run_id': self.chain_run_id,
+            'step_id': self.step_id,
+            'endpoint_id': self.endpoint_id,
+            'step_order': self.step_order,
+            'step_name': self.step_name,
+            'status': self.status,
+            'status_code': self.status_code,
+            'latency_ms': self.latency_ms,
+            'response_preview': self.response_preview,
+            'extracted_preview': self.extracted_preview,
+            'error_message': self.error_message,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f"<ChainStepLog run={self.chain_run_id} step={self.step_order} status={self.status}>"
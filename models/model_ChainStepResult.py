@@ -0,0 +1,68 @@
+# models/model_ChainStepResult.py
+"""
+Per-step outcomes of chain executions
+
+One row per executed chain step, written alongside the chain's
+ExecutionResult, so step success rates and waterfalls are grouped SQL
+queries instead of walks over the JSON `step_results` of every result.
+"""
+
+from extensions import db
+from datetime import datetime
+
+
+class ChainStepResult(db.Model):
+    """
+    Outcome of one step of one chain execution
+    """
+    __tablename__ = 'chain_step_results'
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    execution_result_id = db.Column(db.Integer, db.ForeignKey('execution_results.id', ondelete='CASCADE'),
+                                    nullable=False, index=True)
+    test_run_id = db.Column(db.Integer, db.ForeignKey('test_run.id', ondelete='CASCADE'), nullable=True, index=True)
+    chain_id = db.Column(db.Integer, db.ForeignKey('api_chains.id', ondelete='CASCADE'), nullable=False)
+    step_id = db.Column(db.Integer, db.ForeignKey('api_chain_steps.id', ondelete='SET NULL'), nullable=True)
+    endpoint_id = db.Column(db.Integer, db.ForeignKey('endpoints.id', ondelete='SET NULL'), nullable=True, index=True)
+
+    step_order = db.Column(db.Integer, nullable=False)
+    step_name = db.Column(db.String(100), nullable=True)
+    success = db.Column(db.Boolean, nullable=False)
+    status_code = db.Column(db.Integer, nullable=True)
+    latency_ms = db.Column(db.Integer, nullable=True)
+    extracted_count = db.Column(db.Integer, default=0, nullable=False)
+    error_message = db.Column(db.String(500), nullable=True)
+
+    # Offset of the step's start from the start of the chain execution (waterfall)
+    started_offset_ms = db.Column(db.Integer, nullable=True)
+    executed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_chain_step_results_chain_executed', 'chain_id', 'executed_at'),
+        db.Index('ix_chain_step_results_chain_step', 'chain_id', 'step_order'),
+    )
+
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'id': self.id,
+            'execution_result_id': self.execution_result_id,
+            'test_run_id': self.test_run_id,
+            'chain_id': self.chain_id,
+            'step_id': self.step_id,
+            'endpoint_id': self.endpoint_id,
+            'step_order': self.step_order,
+            'step_name': self.step_name,
+            'success': self.success,
+            'status_code': self.status_code,
+            'latency_ms': self.latency_ms,
+            'extracted_count': self.extracted_count,
+            'error_message': self.error_message,
+            'started_offset_ms': self.started_offset_ms,
+            'executed_at': self.executed_at.isoformat() if self.executed_at else None
+        }
+
+    def __repr__(self):
+        return (f"<ChainStepResult result={self.execution_result_id}, step={self.step_order}, "
+                f"success={self.success}, status={self.status_code}>")
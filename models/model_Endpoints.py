@@ -25,6 +25,13 @@ class Endpoint(db.Model):
     # --- Authentication Fields ---
     auth_method = db.Column(db.String(50), default='none', nullable=False) # e.g., 'none', 'bearer', 'api_key'
     credentials_encrypted = db.Column(db.Text, nullable=True) # For storing encrypted tokens/keys
+
+    # --- Token Refresh (see services/endpoints/token_provider.py) ---
+    # Chain that obtains a fresh token, the chain variable holding it and the header that carries it
+    token_refresh_chain_id = db.Column(db.Integer, db.ForeignKey('api_chains.id', ondelete='SET NULL'), nullable=True)
+    token_refresh_variable = db.Column(db.String(100), nullable=True)
+    token_header = db.Column(db.String(255), default='Authorization', nullable=True)
+    token_refresh_chain = db.relationship('APIChain', foreign_keys=[token_refresh_chain_id])
     
     # --- Resiliency Fields ---
     timeout_seconds = db.Column(db.Integer, default=60, nullable=False)
@@ -57,6 +64,9 @@ class Endpoint(db.Model):
             "payload_template_id": self.payload_template_id,
             "payload_template_name": self.payload_template.name if self.payload_template else None,
             "auth_method": self.auth_method,
+            "token_refresh_chain_id": self.token_refresh_chain_id,
+            "token_refresh_variable": self.token_refresh_variable,
+            "token_header": self.token_header,
             "timeout_seconds": self.timeout_seconds,
             "retry_attempts": self.retry_attempts,
             "headers": [header.to_dict() for header in self.headers],
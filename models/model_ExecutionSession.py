@@ -54,6 +54,25 @@ class ExecutionSession(db.Model):
     last_adjustment_at = db.Column(db.DateTime, nullable=True)
     health_status = db.Column(db.String(20), default='unknown')
     
+    # Payload template snapshot shared by all results (see services/results/request_manifest.py)
+    request_manifest = db.Column(db.JSON, nullable=True)
+    
+    # Stratified sample runs (see tasks/orchestrator.py): the dispatch plan and the
+    # latest failure-rate estimate with its confidence interval
+    sample_plan = db.Column(db.JSON, nullable=True)
+    sample_stats = db.Column(db.JSON, nullable=True)
+
+    # Delta runs: results copied from recent identical executions instead of re-run
+    reused_test_cases = db.Column(db.Integer, default=0, nullable=False, server_default='0')
+    
+    # Parquet archival (see services/results/archive.py); results rows are gone once archived
+    archived_at = db.Column(db.DateTime, nullable=True, index=True)
+    archive_path = db.Column(db.String(1024), nullable=True)
+    archive_rollup = db.Column(db.JSON, nullable=True)
+    # Range of ExecutionResult ids in the archive file, to find an archived result's session
+    archived_min_result_id = db.Column(db.Integer, nullable=True, index=True)
+    archived_max_result_id = db.Column(db.Integer, nullable=True)
+    
     # Timestamps
     started_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -112,9 +131,16 @@ class ExecutionSession(db.Model):
         """Get average response time in seconds"""
         return self.avg_response_time_ms / 1000.0 if self.avg_response_time_ms else 0.0
     
+    @property
+    def is_archived(self):
+        """Check if results have been moved to the Parquet archive"""
+        return self.archived_at is not None
+    
     @property
     def result_count(self):
         """Get number of execution results (modern SQLAlchemy)"""
+        if self.is_archived:
+            return (self.archive_rollup or {}).get('result_count', 0)
         return db.session.query(func.count(ExecutionResult.id)).filter(
             ExecutionResult.session_id == self.id
         ).scalar()
@@ -183,6 +209,7 @@ class ExecutionSession(db.Model):
                 'completed_test_cases': self.completed_test_cases,
                 'successful_test_cases': self.successful_test_cases,
                 'failed_test_cases': self.failed_test_cases,
+                'reused_test_cases': self.reused_test_cases,
                 'progress_percentage': self.progress_percentage,
                 'success_rate': self.success_rate,
                 'error_rate': self.error_rate
@@ -218,8 +245,12 @@ class ExecutionSession(db.Model):
                 'batch_count': self.batch_count,
                 'result_count': self.result_count,
                 'is_active': self.is_active,
-                'is_completed': self.is_completed
-            }
+                'is_completed': self.is_completed,
+                'is_archived': self.is_archived
+            },
+            
+            # Stratified sampling estimate (sample runs only)
+            'sampling': self.sample_stats
         }
     
     def to_dict(self):
@@ -249,6 +280,11 @@ class ExecutionSession(db.Model):
             'duration_seconds': self.duration_seconds,
             'is_active': self.is_active,
             'is_completed': self.is_completed,
+            'is_archived': self.is_archived,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None,
+            'archive_rollup': self.archive_rollup,
+            'sample_stats': self.sample_stats,
+            'reused_test_cases': self.reused_test_cases,
             'result_count': self.result_count
         }
     
@@ -301,8 +337,21 @@ class ExecutionResult(db.Model):
     error_message = db.Column(db.Text, nullable=True)
     
     # Optional detailed data
-    request_data = db.Column(db.JSON, nullable=True)
-    response_data = db.Column(db.JSON, nullable=True)
+    request_data = db.Column(db.JSON, nullable=True)  # Full payload, only when not delta-stored
+    response_data = db.Column(db.JSON, nullable=True)  # Legacy inline bodies only
+
+    # Delta-stored request: processed prompt + hash of the session manifest it was rendered with
+    processed_prompt = db.Column(db.Text, nullable=True)
+    request_manifest_hash = db.Column(db.String(32), nullable=True)
+
+    # Deduplicated response body (see services/results/response_store.py)
+    response_body_hash = db.Column(db.String(32), db.ForeignKey('response_bodies.content_hash'), nullable=True, index=True)
+    response_preview = db.Column(db.String(255), nullable=True)
+
+    # Delta runs: hash of case content, transformations, template version and endpoint
+    # config (see services/results/delta_runs.py); set on copies to the executed result
+    run_fingerprint = db.Column(db.String(32), nullable=True, index=True)
+    reused_from_id = db.Column(db.Integer, db.ForeignKey('execution_results.id', ondelete='SET NULL'), nullable=True)
     
     # Timestamps
     started_at = db.Column(db.DateTime, nullable=True)
@@ -325,6 +374,30 @@ class ExecutionResult(db.Model):
             return (self.executed_at - self.started_at).total_seconds()
         return 0.0
     
+    def get_request_data(self, manifest=None):
+        """Request payload, rebuilt from the session manifest when delta-stored"""
+        if self.request_data is not None or not self.request_manifest_hash:
+            return self.request_data
+        if manifest is None:
+            manifest = self.session.request_manifest if self.session else None
+        if not manifest or manifest.get('hash') != self.request_manifest_hash:
+            return None
+        from services.results.request_manifest import reconstruct_request_data
+        return reconstruct_request_data(manifest, self.processed_prompt)
+    
+    def get_response_data(self):
+        """Response body, resolved from the content-addressed store when deduplicated"""
+        if self.response_body_hash:
+            from services.results.response_store import load_response_body
+            return load_response_body(self.response_body_hash)
+        return self.response_data
+    
+    def set_response_body(self, body):
+        """Store a response body in the content-addressed store and reference it"""
+        from services.results.response_store import store_response_body
+        self.response_body_hash, self.response_preview = store_response_body(body)
+        self.response_data = None
+    
     def to_dict(self, include_detailed_data=False):
         """Convert to dictionary for API responses"""
         data = {
@@ -339,14 +412,17 @@ class ExecutionResult(db.Model):
             'response_time_ms': self.response_time_ms,
             'response_time_seconds': self.response_time_seconds,
             'error_message': self.error_message,
+            'response_preview': self.response_preview,
+            'reused_from_id': self.reused_from_id,
             'executed_at': self.executed_at.isoformat(),
             'duration_seconds': self.duration_seconds
         }
         
         if include_detailed_data:
             data.update({
-                'request_data': self.request_data,
-                'response_data': self.response_data,
+                'request_data': self.get_request_data(),
+                'processed_prompt': self.processed_prompt,
+                'response_data': self.get_response_data(),
                 'started_at': self.started_at.isoformat() if self.started_at else None
             })
         
@@ -0,0 +1,46 @@
+# models/model_ResponseBody.py
+"""
+Content-addressed storage for execution response bodies
+
+LLM endpoints return the same refusal text over and over, so bodies are
+hashed and stored once (compressed). ExecutionResult rows only keep the
+hash plus a short preview.
+"""
+
+from extensions import db
+from datetime import datetime
+
+
+class ResponseBody(db.Model):
+    """
+    A single, deduplicated response body keyed by its xxh3-128 hash
+    """
+    __tablename__ = 'response_bodies'
+
+    # xxh3_128 hex digest of the UTF-8 encoded body
+    content_hash = db.Column(db.String(32), primary_key=True)
+
+    # zlib-compressed body bytes
+    body_compressed = db.Column(db.LargeBinary, nullable=False)
+    compression = db.Column(db.String(20), default='zlib', nullable=False)
+
+    # Sizes (bytes) for storage reporting
+    size_bytes = db.Column(db.Integer, nullable=False)
+    compressed_size_bytes = db.Column(db.Integer, nullable=False)
+
+    # Assistant text pulled out of the body at ingest; full-text indexed for
+    # response search (see services/results/response_search.py)
+    response_text = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    @property
+    def compression_ratio(self):
+        """Original size divided by stored size"""
+        if self.compressed_size_bytes:
+            return self.size_bytes / self.compressed_size_bytes
+        return 0.0
+
+    def __repr__(self):
+        return (f"<ResponseBody hash={self.content_hash}, size={self.size_bytes}, "
+                f"stored={self.compressed_size_bytes}>")
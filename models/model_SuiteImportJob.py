@@ -0,0 +1,88 @@
+# models/model_SuiteImportJob.py
+"""
+Background test suite import jobs
+
+Large suite files are uploaded, saved to the upload folder and imported by a
+Celery task in bulk batches. This row tracks the job's progress so the UI can
+poll it from any web worker.
+"""
+
+from extensions import db
+from datetime import datetime
+
+
+class SuiteImportJob(db.Model):
+    """
+    A single test suite file import (v1.0 JSON, JSONL or CSV)
+    """
+    __tablename__ = 'suite_import_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+
+    # Uploaded file
+    filename = db.Column(db.String(255), nullable=False)
+    file_path = db.Column(db.String(1024), nullable=False)
+    file_format = db.Column(db.String(20), nullable=False)  # 'json', 'jsonl' or 'csv'
+    total_bytes = db.Column(db.BigInteger, default=0, nullable=False)
+
+    # Options
+    default_suite_description = db.Column(db.String(255), nullable=True)  # for rows without a suite column
+    force = db.Column(db.Boolean, default=False, nullable=False)  # import even if a suite already exists
+
+    # Progress
+    status = db.Column(db.String(20), default='pending', nullable=False, index=True)
+    # Possible values: 'pending', 'running', 'completed', 'failed'
+    processed_bytes = db.Column(db.BigInteger, default=0, nullable=False)
+    cases_imported = db.Column(db.Integer, default=0, nullable=False)
+    cases_reused = db.Column(db.Integer, default=0, nullable=False)  # linked to an existing identical prompt
+    rows_skipped = db.Column(db.Integer, default=0, nullable=False)
+    suite_ids = db.Column(db.JSON, nullable=True)
+    duplicates = db.Column(db.JSON, nullable=True)
+    error_message = db.Column(db.Text, nullable=True)
+    celery_task_id = db.Column(db.String(255), nullable=True)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    user = db.relationship('User', backref=db.backref('suite_import_jobs', lazy=True))
+
+    @property
+    def progress_percentage(self):
+        """Progress by bytes parsed"""
+        if self.status == 'completed':
+            return 100
+        if self.total_bytes:
+            return min(99, int(self.processed_bytes * 100 / self.total_bytes))
+        return 0
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
+
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'file_format': self.file_format,
+            'status': self.status,
+            'progress_percentage': self.progress_percentage,
+            'processed_bytes': self.processed_bytes,
+            'total_bytes': self.total_bytes,
+            'cases_imported': self.cases_imported,
+            'cases_reused': self.cases_reused,
+            'rows_skipped': self.rows_skipped,
+            'suite_ids': self.suite_ids or [],
+            'duplicates': self.duplicates or [],
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+    def __repr__(self):
+        return (f"<SuiteImportJob id={self.id}, file='{self.filename}', status='{self.status}', "
+                f"cases={self.cases_imported}>")
@@ -1,18 +1,23 @@
 from datetime import datetime
+from sqlalchemy.orm import validates
 from extensions import db
 from models.associations import test_suite_cases
+from services.test_cases.fingerprint import prompt_fingerprint as compute_fingerprint, prompt_hash as compute_hash
 
 # Working on the taxonomy of a prompt
 class TestCase(db.Model):
     __tablename__ = 'test_cases'
     
     id = db.Column(db.Integer, primary_key=True)
-    prompt = db.Column(db.TEXT, nullable=False)
+    prompt = db.Column(db.TEXT, nullable=False)  # full-text indexed, see services/test_cases/search.py
+    # Exact and normalised content hashes of the prompt, kept in sync by the validator below
+    prompt_hash = db.Column(db.String(32), nullable=True, index=True)
+    prompt_fingerprint = db.Column(db.String(32), nullable=True, index=True)
 
     source = db.Column(db.String(255), nullable=True)
-    attack_type = db.Column(db.String(50), nullable=True) # jailbreak / prompt_injection / other
+    attack_type = db.Column(db.String(50), nullable=True, index=True) # jailbreak / prompt_injection / other
     data_type = db.Column(db.String(50), nullable=True) # text / image / audio
-    nist_risk = db.Column(db.String(50), nullable=True)
+    nist_risk = db.Column(db.String(50), nullable=True, index=True)
     reviewed = db.Column(db.Boolean, default=False, nullable=True) 
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
 
@@ -28,5 +33,11 @@ class TestCase(db.Model):
         cascade='all, delete-orphan'
     )
 
+    @validates('prompt')
+    def _update_fingerprint(self, key, prompt):
+        self.prompt_hash = compute_hash(prompt)
+        self.prompt_fingerprint = compute_fingerprint(prompt)
+        return prompt
+
     def __repr__(self):
         return f"<TestCase {self.id} - {self.prompt[:50]}...>"  # Show first 50 chars of prompt
\ No newline at end of file
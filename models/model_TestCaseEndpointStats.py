@@ -0,0 +1,49 @@
+# models/model_TestCaseEndpointStats.py
+"""
+Historical pass/fail statistics per (test case, endpoint)
+
+Updated incrementally by the case execution task as each ExecutionResult is
+written, so the orchestrator can order a run by how likely each case is to
+fail without scanning past results.
+"""
+
+from extensions import db
+from datetime import datetime
+
+
+class TestCaseEndpointStats(db.Model):
+    """
+    Running execution and failure counts of one test case against one endpoint
+    """
+    __tablename__ = 'test_case_endpoint_stats'
+
+    test_case_id = db.Column(db.Integer, db.ForeignKey('test_cases.id', ondelete='CASCADE'), primary_key=True)
+    endpoint_id = db.Column(db.Integer, db.ForeignKey('endpoints.id', ondelete='CASCADE'), primary_key=True, index=True)
+
+    executions = db.Column(db.Integer, default=0, nullable=False)
+    failures = db.Column(db.Integer, default=0, nullable=False)
+    last_success = db.Column(db.Boolean, nullable=True)
+    last_executed_at = db.Column(db.DateTime, nullable=True)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def failure_probability(self):
+        """Laplace-smoothed failure rate; 0.5 for a case never run against the endpoint"""
+        return (self.failures + 1) / (self.executions + 2)
+
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'test_case_id': self.test_case_id,
+            'endpoint_id': self.endpoint_id,
+            'executions': self.executions,
+            'failures': self.failures,
+            'failure_probability': self.failure_probability,
+            'last_success': self.last_success,
+            'last_executed_at': self.last_executed_at.isoformat() if self.last_executed_at else None
+        }
+
+    def __repr__(self):
+        return (f"<TestCaseEndpointStats case={self.test_case_id}, endpoint={self.endpoint_id}, "
+                f"failures={self.failures}/{self.executions}>")
@@ -41,6 +41,9 @@ class TestRun(db.Model):
     status = db.Column(db.String(50), default='not_started', nullable=False)
     # Possible values: 'not_started', 'running', 'paused', 'completed', 'failed', 'cancelled'
 
+    # Unique test cases the orchestrator planned (after deduplication/sampling); None until started
+    planned_test_cases = db.Column(db.Integer, nullable=True)
+
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -132,6 +135,24 @@ class TestRun(db.Model):
         config.setdefault('max_retries', 2)
         config.setdefault('timeout', 30)
         config.setdefault('iterations', 1)
+        config.setdefault('dedupe_prompts', True)
+        config.setdefault('case_order', 'suite')  # 'suite' or 'likely_failures'
+        # Delta run: only execute combinations without a result in the last delta_max_age_hours
+        config.setdefault('delta', False)
+        config.setdefault('delta_max_age_hours', 168)
+        # Chains: run the prompt-independent leading steps once per run (and TTL) per worker
+        config.setdefault('share_chain_prefix', True)
+        config.setdefault('chain_prefix_ttl_seconds', 300)
+        config.setdefault('chain_step_concurrency', 1)  # >1: run independent chain steps in parallel
+        config.setdefault('chain_instance_concurrency', 1)  # >1: run test cases' chains in parallel, in batch tasks
+        config.setdefault('sample_size', None)  # sample run: N random cases without replacement
+        config.setdefault('sample_seed', None)
+        # Stratified sample run: dispatch in waves, stop once the failure-rate CI is narrow enough
+        config.setdefault('stratified_sample', False)
+        config.setdefault('ci_width', 0.1)
+        config.setdefault('ci_confidence', 0.95)
+        config.setdefault('sample_wave_size', 50)
+        config.setdefault('sample_min_cases', 30)
         
         return config
 
@@ -176,48 +197,42 @@ class TestRun(db.Model):
         return 'No target configured'
 
     def get_test_case_count(self):
-        """Get total number of test cases from all suites (avoiding duplicates)"""
-        if not self.test_suites:
-            return 0
-        
-        suite_ids = [suite.id for suite in self.test_suites]
-        print(f"DEBUG TestRun {self.id}: Counting test cases for suites: {suite_ids}")
-        
-        # Debug: count per suite using the relationship
-        total_from_relationships = 0
-        for suite in self.test_suites:
-            count = len(suite.test_cases)
-            total_from_relationships += count
-            print(f"DEBUG TestRun {self.id}: Suite {suite.id} ({suite.description}) has {count} test cases")
-        
-        print(f"DEBUG TestRun {self.id}: Total from relationships (with potential duplicates): {total_from_relationships}")
-        
-        # Use a simpler approach: collect unique test case IDs from the loaded relationships
-        unique_test_case_ids = set()
-        for suite in self.test_suites:
-            for test_case in suite.test_cases:
-                unique_test_case_ids.add(test_case.id)
-        
-        unique_count = len(unique_test_case_ids)
-        print(f"DEBUG TestRun {self.id}: Unique test case IDs: {sorted(unique_test_case_ids)}")
-        print(f"DEBUG TestRun {self.id}: Unique test case count: {unique_count}")
-        
-        return unique_count
+        """Number of unique test cases: planned at orchestration, else COUNT(DISTINCT) over the suites"""
+        if self.planned_test_cases is not None:
+            return self.planned_test_cases
+        cached = getattr(self, '_test_case_count', None)
+        if cached is None:
+            cached = TestRun.load_test_case_counts([self])[self.id]
+        return cached
     
     def get_total_execution_count(self):
         """Get total number of executions (test cases × iterations)"""
         base_count = self.get_test_case_count()
         if base_count == 0:
             return 0
-            
-        # Multiply by iterations from execution config
-        exec_config = self.get_execution_config()
-        iterations = exec_config.get('iterations', 1)
-        
-        total = base_count * iterations
-        print(f"DEBUG TestRun {self.id}: {base_count} test cases × {iterations} iterations = {total} total executions")
-        
-        return total
+        return base_count * self.get_execution_config().get('iterations', 1)
+
+    @classmethod
+    def load_test_case_counts(cls, runs):
+        """
+        Count unique test cases for many runs in one grouped query and cache the
+        result on each instance (for list pages). Returns {run_id: count}.
+        """
+        pending = [run for run in runs if run.planned_test_cases is None and run.id is not None]
+        counts = {}
+        if pending:
+            rows = db.session.query(
+                test_run_suites.c.test_run_id,
+                func.count(func.distinct(test_suite_cases.c.test_case_id))
+            ).join(
+                test_suite_cases, test_suite_cases.c.test_suite_id == test_run_suites.c.test_suite_id
+            ).filter(
+                test_run_suites.c.test_run_id.in_([run.id for run in pending])
+            ).group_by(test_run_suites.c.test_run_id).all()
+            counts = dict(rows)
+        for run in pending:
+            run._test_case_count = counts.get(run.id, 0)
+        return {run.id: run.get_test_case_count() for run in runs}
 
     # Status management
     def start_execution(self):
@@ -280,14 +295,14 @@ class TestRun(db.Model):
 
     # Serialization
     def get_status_data(self):
-        """Get status data for real-time WebSocket updates"""
+        """Get status data for real-time WebSocket updates (from the session's stored counters)"""
         active_session = self.current_execution_session
         
         return {
             'run_id': self.id,
             'status': self.status,
-            'progress_percentage': self.progress_percentage,
-            'is_active': self.is_active,
+            'progress_percentage': active_session.progress_percentage if active_session else 0,
+            'is_active': active_session is not None,
             'target_name': self.get_target_name(),
             'execution_count': self.execution_count,
             'current_session': {
@@ -345,4 +360,5 @@ class TestRun(db.Model):
 from .model_ExecutionSession import ExecutionSession
 from .model_TestSuite import TestSuite
 from .model_TestCase import TestCase
-from .model_APIChain import APIChain, APIChainStep
\ No newline at end of file
+from .model_APIChain import APIChain, APIChainStep
+from .associations import test_run_suites, test_suite_cases
\ No newline at end of file
@@ -15,6 +15,9 @@ class User(UserMixin, db.Model):
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     role = db.Column(db.String(80), nullable=False, default=ROLE_USER)
 
+    # Bumped when one of the user's runs finishes; stale dashboard stats are recomputed
+    stats_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
 
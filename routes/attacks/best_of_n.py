@@ -1,12 +1,13 @@
 import random
-import string
-import time
 import json
 from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, Response, stream_with_context
 from models.model_Endpoints import Endpoint
 from models.model_Dialogue import Dialogue
-from services.common.http_request_service import execute_api_request
 from services.common.header_parser_service import headers_from_apiheader_list
+from services.jailbreaks.permutations import generate_permutations
+from services.jailbreaks.best_of_n import (
+    BestOfNEngine, PayloadBuilder, endpoint_sender, DEFAULT_MAX_IN_FLIGHT, DEFAULT_SUCCESS_THRESHOLD
+)
 from extensions import db 
 
 best_of_n_bp = Blueprint('best_of_n_bp', __name__, url_prefix='/best_of_n')
@@ -77,12 +78,31 @@ def best_of_n_index():
             endpoint.http_payload = ep_payload
 
         # Use potentially overridden values
-        hostname = endpoint.base_url
-        endpoint_path = endpoint.path
         payload_template = endpoint.payload_template.template if endpoint.payload_template else "{}"
 
-        # Generate all permutations upfront (could be changed to generate on-the-fly if needed)
-        permutations = generate_permutations(initial_prompt, options, num_samples)
+        # Concurrency and early stopping
+        try:
+            max_in_flight = int(request.args.get('max_in_flight', DEFAULT_MAX_IN_FLIGHT))
+        except ValueError:
+            max_in_flight = DEFAULT_MAX_IN_FLIGHT
+        try:
+            success_threshold = float(request.args.get('success_threshold', DEFAULT_SUCCESS_THRESHOLD))
+        except ValueError:
+            success_threshold = DEFAULT_SUCCESS_THRESHOLD
+        if request.args.get('stop_early') != 'on':
+            success_threshold = None
+
+        # Permutations are reproducible: a sweep without a seed reports the one it drew
+        try:
+            seed = int(request.args['seed']) if request.args.get('seed') else random.randrange(2 ** 32)
+            if seed < 0:
+                raise ValueError("seed must not be negative")
+        except ValueError:
+            seed = random.randrange(2 ** 32)
+
+        # Generate all permutations upfront, deduplicated (may be fewer than N for short prompts)
+        permutations = generate_permutations(initial_prompt, options, num_samples, seed=seed)
+        num_samples = len(permutations)
         attempts_log = [] # Log to store results
 
         def prepare_raw_headers(ep):
@@ -93,83 +113,57 @@ def best_of_n_index():
 
         def generate():
             nonlocal attempts_log # Allow modification of the outer scope variable
-            raw_headers = prepare_raw_headers(endpoint)
-            
-            # --- Initial Status Update ---
-            yield f"data: {json.dumps({'status': 'Starting Best of N process...'})}\n\n"
-            time.sleep(0.2) # Small delay for frontend to show initial status
-
-            # --- Loop through permutations ---
-            for i, perm in enumerate(permutations):
-                
-                # --- Status Update: Before Request ---
-                status_message = f"Processing permutation {i + 1}/{num_samples}..."
-                yield f"data: {json.dumps({'status': status_message})}\n\n"
-                
-                # Prepare payload for this specific permutation
-                # Use try-except for robust replacement, handle potential errors
-                try:
-                    # Parse the payload template as JSON
-                    payload_dict = json.loads(payload_template)
-                    # Find and replace the INJECT_PROMPT token in the messages
-                    for message in payload_dict.get('messages', []):
-                        if 'content' in message and '{{INJECT_PROMPT}}' in message['content']:
-                            message['content'] = message['content'].replace('{{INJECT_PROMPT}}', perm)
-                    # Convert back to JSON string
-                    payload = json.dumps(payload_dict)
-                except Exception as e:
-                    # Handle error during payload creation (e.g., template issue)
-                    error_message = f"Error creating payload for permutation {i + 1}: {e}"
-                    yield f"data: {json.dumps({'status': error_message, 'error': True})}\n\n" 
-                    # Log the attempt with an error state
-                    attempts_log.append({"prompt": perm, "response": f"ERROR: {error_message}", "error": True})
-                    continue # Skip to the next permutation
 
-                # --- Make the HTTP request ---
-                try:
-                    # Add timeout to prevent hanging indefinitely
-                    response_data = execute_api_request(
-                        method=endpoint.method,  # Use the endpoint's configured method
-                        hostname_url=hostname,
-                        endpoint_path=endpoint_path,
-                        raw_headers_or_dict=raw_headers,
-                        http_payload_as_string=payload,
-                        timeout=30
-                    ) 
-                    response_text = response_data.get("response_body", "No response text received.")
-                    is_error = False
-
-                except Exception as e:
-                    # Handle network errors or errors from execute_api_request
-                    response_text = f"ERROR executing request for permutation {i + 1}: {e}"
-                    is_error = True
-                    # Yield an error status
-                    yield f"data: {json.dumps({'status': response_text, 'error': True})}\n\n"
+            # --- Initial Status Update ---
+            yield f"data: {json.dumps({'status': f'Starting Best of N process ({num_samples} permutations, seed {seed})...'})}\n\n"
 
-                # --- Store and Yield Result ---
+            # The payload template is parsed once for all permutations
+            try:
+                payload_builder = PayloadBuilder(payload_template)
+            except ValueError as e:
+                error_message = f"Error creating payload: the endpoint's payload template is not valid JSON ({e})"
+                yield f"data: {json.dumps({'status': error_message, 'error': True})}\n\n"
+                yield f"data: {json.dumps({'final': True, 'attempts_log': [], 'best_prompt': None, 'best_response': None})}\n\n"
+                return
+
+            engine = BestOfNEngine(
+                endpoint_sender(endpoint, prepare_raw_headers(endpoint), timeout=30),
+                payload_builder,
+                initial_prompt,
+                max_in_flight=max_in_flight,
+                success_threshold=success_threshold
+            )
+
+            # --- Stream samples as they complete ---
+            for sample in engine.run(permutations):
                 attempt_data = {
-                    "prompt": perm,
-                    "response": response_text
+                    "prompt": sample.prompt,
+                    "response": sample.response,
+                    "index": sample.index,
+                    "score": sample.score,
+                    "is_successful": sample.is_successful,
+                    "latency_ms": sample.latency_ms
                 }
-                if is_error:
+                if sample.error:
                      attempt_data["error"] = True # Mark if request failed
-
                 attempts_log.append(attempt_data)
+
+                status_message = (f"Completed {len(attempts_log)}/{num_samples} permutations "
+                                  f"({engine.in_flight} in flight, best score {engine.best.score if engine.best else 0:.2f})...")
+                yield f"data: {json.dumps({'status': status_message})}\n\n"
                 # Yield the actual prompt/response pair
                 yield f"data: {json.dumps(attempt_data)}\n\n"
 
-                # Optional short delay between requests/yields
-                time.sleep(0.1) 
-
             # --- Process finished ---
-            yield f"data: {json.dumps({'status': 'Processing complete. Finalizing...'})}\n\n"
-            
-            # --- Find Best Result (Placeholder - Implement your logic here) ---
-            # Example: find the shortest non-error response
-            best_prompt = None
-            best_response = None
-            # Add logic here to evaluate attempts_log and set best_prompt/best_response
-            # For now, we'll leave them as None
+            if engine.stopped_early:
+                status_message = f"Stopped early: a permutation scored {engine.best.score:.2f}. Finalizing..."
+            else:
+                status_message = 'Processing complete. Finalizing...'
+            yield f"data: {json.dumps({'status': status_message})}\n\n"
+
+            # --- Best Result: highest JailbreakSuccessAnalyzer score ---
+            best_prompt = engine.best.prompt if engine.best else None
+            best_response = engine.best.response if engine.best else None
 
             # --- Save to Database ---
             try:
@@ -193,7 +187,10 @@ def best_of_n_index():
                 "attempts_log": attempts_log,
                 # Include best result if found, otherwise frontend handles absence
                 "best_prompt": best_prompt, 
-                "best_response": best_response 
+                "best_response": best_response,
+                "best_score": engine.best.score if engine.best else None,
+                "stopped_early": engine.stopped_early,
+                "seed": seed
             }
             yield f"data: {json.dumps(final_message)}\n\n"
 
@@ -217,106 +214,3 @@ def endpoint_details(endpoint_id):
         "payload_template": endpoint.payload_template.template if endpoint.payload_template else None,
         "headers": headers_list
     })
-
-
-# ********************************
-# SERVICES
-# ********************************
-def rearrange_letters(s):
-    """Randomly rearrange the middle letters of one word (if available)."""
-    words = s.split()
-    candidates = [w for w in words if len(w) > 3]
-    if not candidates:
-        return s
-    word = random.choice(candidates)
-    index = words.index(word)
-    first, middle, last = word[0], list(word[1:-1]), word[-1]
-    random.shuffle(middle)
-    new_word = first + "".join(middle) + last
-    words[index] = new_word
-    return " ".join(words)
-
-def random_capitalize(s):
-    """Randomly toggle the case of each alphabetical character."""
-    result = ""
-    for ch in s:
-        if ch.isalpha() and random.random() < 0.5:
-            result += ch.upper() if ch.islower() else ch.lower()
-        else:
-            result += ch
-    return result
-
-def substitute_common_typo(s):
-    """
-    Substitute one randomly chosen letter in the input string with an adjacent key 
-    (based on a QWERTY keyboard layout) to mimic a common typing error.
-    """
-    keyboard_adjacent = {
-        'q': ['w', 'a'],
-        'w': ['q', 'e', 'a', 's'],
-        'e': ['w', 'r', 's', 'd'],
-        'r': ['e', 't', 'd', 'f'],
-        't': ['r', 'y', 'f', 'g'],
-        'y': ['t', 'u', 'g', 'h'],
-        'u': ['y', 'i', 'h', 'j'],
-        'i': ['u', 'o', 'j', 'k'],
-        'o': ['i', 'p', 'k', 'l'],
-        'p': ['o', 'l'],
-        'a': ['q', 'w', 's', 'z'],
-        's': ['a', 'w', 'e', 'd', 'z', 'x'],
-        'd': ['s', 'e', 'r', 'f', 'x', 'c'],
-        'f': ['d', 'r', 't', 'g', 'c', 'v'],
-        'g': ['f', 't', 'y', 'h', 'v', 'b'],
-        'h': ['g', 'y', 'u', 'j', 'b', 'n'],
-        'j': ['h', 'u', 'i', 'k', 'n', 'm'],
-        'k': ['j', 'i', 'o', 'l', 'm'],
-        'l': ['k', 'o', 'p'],
-        'z': ['a', 's', 'x'],
-        'x': ['z', 's', 'd', 'c'],
-        'c': ['x', 'd', 'f', 'v'],
-        'v': ['c', 'f', 'g', 'b'],
-        'b': ['v', 'g', 'h', 'n'],
-        'n': ['b', 'h', 'j', 'm'],
-        'm': ['n', 'j', 'k']
-    }
-    indices = [i for i, ch in enumerate(s) if ch.isalpha()]
-    if not indices:
-        return s
-    idx = random.choice(indices)
-    original_letter = s[idx]
-    lower_letter = original_letter.lower()
-    if lower_letter in keyboard_adjacent:
-        neighbors = keyboard_adjacent[lower_letter]
-        new_letter = random.choice(neighbors)
-        if original_letter.isupper():
-            new_letter = new_letter.upper()
-    else:
-        new_letter = random.choice(string.ascii_letters)
-    return s[:idx] + new_letter + s[idx+1:]
-
-
-def substitute_random_letter(s):
-    """Substitute one randomly chosen letter with another random letter."""
-    indices = [i for i, ch in enumerate(s) if ch.isalpha()]
-    if not indices:
-        return s
-    idx = random.choice(indices)
-    random_letter = random.choice(string.ascii_letters)
-    return s[:idx] + random_letter + s[idx+1:]
-
-
-def generate_permutations(prompt, options, n):
-    """Generate n permutations of the prompt using the selected options."""
-    permutations = []
-    for i in range(n):
-        perm = prompt
-        if options.get("rearrange"):
-            perm = rearrange_letters(perm)
-        if options.get("capitalization"):
-            perm = random_capitalize(perm)
-        if options.get("substitute"):
-            perm = substitute_random_letter(perm)
-        if options.get("typo"):
-            perm = substitute_common_typo(perm)
-        permutations.append(perm)
-    return permutations
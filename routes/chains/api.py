@@ -1,22 +1,28 @@
 # routes/chains/api.py
 import logging
 import json
+import time
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context, url_for
 from flask_login import login_required, current_user
 
 # Correctly import the functions and classes we will use
 from services.chain_execution_service import APIChainExecutor, ChainExecutionError
 from services.common.templating_service import render_template_string
 from services.common.http_request_service import execute_api_request
-from services.common.data_extraction_service import extract_data_from_response, DataExtractionError
+from services.common.extraction_engine import ExtractionProgram
 from tasks.chain_tasks import execute_full_chain_run
-from models import db, APIChain, APIChainStep, Endpoint
+from models import db, APIChain, APIChainStep, Endpoint, ChainRun, ChainStepLog
+from services.chains.run_log import create_chain_run, resume_blocker
 
 from . import chains_api_bp
 
 logger = logging.getLogger(__name__)
 
+# Chain run progress streams poll the run rows at this interval and give up after the timeout
+STREAM_POLL_SECONDS = 1.0
+STREAM_TIMEOUT_SECONDS = 900
+
 @chains_api_bp.route('/<int:chain_id>/details', methods=['GET'])
 @login_required
 def get_chain_details(chain_id):
@@ -93,16 +99,9 @@ def test_step_in_isolation():
         )
 
         # 3. Extract data from the response using the service function
-        extracted_data = {}
-        for rule in extraction_rules:
-            variable_name = rule.get("variable_name")
-            if not variable_name:
-                continue
-            try:
-                extracted_data[variable_name] = extract_data_from_response(response_data, rule)
-            except DataExtractionError as e:
-                # Still include the variable name in the result, but with the error message
-                extracted_data[variable_name] = f"Extraction Error: {e}"
+        extracted_data, extraction_errors = ExtractionProgram(extraction_rules).extract_each(response_data)
+        # Still include the variable name in the result, but with the error message
+        extracted_data.update({name: f"Extraction Error: {e}" for name, e in extraction_errors.items()})
         
         # This response is tailored for the single-step test UI
         return jsonify({
@@ -153,16 +152,99 @@ def execute_step():
 def execute_full_chain(chain_id):
     """
     API endpoint to trigger a full, asynchronous execution of a chain.
+    Progress is available from the returned ChainRun's status and stream URLs.
     """
     chain = APIChain.query.filter_by(id=chain_id, user_id=current_user.id).first_or_404()
-    
-    task = execute_full_chain_run.delay(chain_id=chain.id)
-    
+
+    chain_run = create_chain_run(chain, current_user.id)
+    db.session.commit()
+    return _dispatch_chain_run(chain_run, 'Chain execution started.')
+
+@chains_api_bp.route('/<int:chain_id>/runs', methods=['GET'])
+@login_required
+def list_chain_runs(chain_id):
+    """The chain's most recent background runs."""
+    chain = APIChain.query.filter_by(id=chain_id, user_id=current_user.id).first_or_404()
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    runs = chain.runs.order_by(ChainRun.id.desc()).limit(limit).all()
+    return jsonify({'runs': [run.to_dict() for run in runs]})
+
+@chains_api_bp.route('/runs/<int:run_id>', methods=['GET'])
+@login_required
+def get_chain_run(run_id):
+    """Status, progress and step logs of a background chain run."""
+    chain_run = _get_user_chain_run(run_id)
+    return jsonify(chain_run.to_dict(include_steps=True))
+
+@chains_api_bp.route('/runs/<int:run_id>/stream', methods=['GET'])
+@login_required
+def stream_chain_run(run_id):
+    """
+    Server-sent events for a chain run: a 'step' event per finished step, a
+    'progress' event whenever the run changes and a final 'end' event.
+    """
+    chain_run = _get_user_chain_run(run_id)
+    return Response(stream_with_context(_chain_run_events(chain_run.id)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@chains_api_bp.route('/runs/<int:run_id>/resume', methods=['POST'])
+@login_required
+def resume_chain_run(run_id):
+    """Start a new run that continues a failed run from its failing step with the saved context."""
+    failed_run = _get_user_chain_run(run_id)
+    blocker = resume_blocker(failed_run)
+    if blocker:
+        return jsonify({'error': blocker}), 409
+
+    chain_run = create_chain_run(failed_run.chain, current_user.id, resumed_from=failed_run)
+    db.session.commit()
+    return _dispatch_chain_run(chain_run, f'Resuming chain run {failed_run.id} from step {failed_run.failed_step_order}.')
+
+def _get_user_chain_run(run_id):
+    return (ChainRun.query.join(APIChain, APIChain.id == ChainRun.chain_id)
+            .filter(ChainRun.id == run_id, APIChain.user_id == current_user.id)
+            .first_or_404())
+
+def _dispatch_chain_run(chain_run, message):
+    task = execute_full_chain_run.delay(chain_id=chain_run.chain_id, chain_run_id=chain_run.id)
+    chain_run.celery_task_id = task.id
+    db.session.commit()
+
     return jsonify({
-        'message': 'Chain execution started.',
-        'task_id': task.id
+        'message': message,
+        'task_id': task.id,
+        'chain_run_id': chain_run.id,
+        'status_url': url_for('chains_api_bp.get_chain_run', run_id=chain_run.id),
+        'stream_url': url_for('chains_api_bp.stream_chain_run', run_id=chain_run.id)
     }), 202
 
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _chain_run_events(run_id):
+    """Poll the run's rows (written by the worker per step) and emit what changed."""
+    last_log_id, last_progress = 0, None
+    deadline = time.monotonic() + STREAM_TIMEOUT_SECONDS
+    while True:
+        chain_run = db.session.get(ChainRun, run_id)
+        if chain_run is None:
+            yield _sse('end', {'error': 'Chain run not found'})
+            return
+        for log in chain_run.step_logs.filter(ChainStepLog.id > last_log_id).all():
+            last_log_id = log.id
+            yield _sse('step', log.to_dict())
+        progress = chain_run.to_dict()
+        if progress != last_progress:
+            last_progress = progress
+            yield _sse('progress', progress)
+        finished = chain_run.is_finished
+        # End the read transaction so the next poll sees the worker's commits
+        db.session.rollback()
+        if finished or time.monotonic() > deadline:
+            yield _sse('end', progress)
+            return
+        time.sleep(STREAM_POLL_SECONDS)
+
 @chains_api_bp.route('/<int:chain_id>/reorder_steps', methods=['POST'])
 @login_required
 def reorder_steps(chain_id):
@@ -198,6 +280,7 @@ def reorder_steps(chain_id):
             if step_id in steps_map:
                 steps_map[step_id].step_order = i + 1
 
+        chain.touch_steps()
         db.session.commit()
         return jsonify({'success': True, 'message': 'Steps reordered successfully.'})
         
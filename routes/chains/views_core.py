@@ -130,6 +130,7 @@ def add_step(chain_id):
             data_extraction_rules=json.loads(form.data_extraction_rules.data or '[]')
         )
         db.session.add(new_step)
+        chain.touch_steps()
         db.session.commit()
         flash('Step added successfully!', 'success')
     else:
@@ -187,6 +188,7 @@ def edit_step(chain_id, step_id):
 
         try:
             step.data_extraction_rules = json.loads(form.data_extraction_rules.data or '[]')
+            chain.touch_steps()
             db.session.commit()
             flash(f"Step {step.step_order} updated successfully!", "success")
             return redirect(url_for('chains_bp.chain_details', chain_id=chain.id))
@@ -220,6 +222,7 @@ def delete_step(chain_id, step_id):
     if not step_to_delete or step_to_delete.chain.user_id != current_user.id:
         abort(404)
 
+    chain = step_to_delete.chain
     db.session.delete(step_to_delete)
     db.session.commit()
 
@@ -227,6 +230,7 @@ def delete_step(chain_id, step_id):
     remaining_steps = APIChainStep.query.filter_by(chain_id=chain.id).order_by(APIChainStep.step_order).all()
     for index, step in enumerate(remaining_steps, 1):
         step.step_order = index
+    chain.touch_steps()
     db.session.commit()
 
     flash('Step deleted successfully.', 'success')
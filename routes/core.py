@@ -5,7 +5,8 @@ from datetime import datetime, timezone
 
 from models.model_TestRun import TestRun
 from models.model_TestSuite import TestSuite
-from models.model_ExecutionSession import ExecutionSession, ExecutionResult
+from models.model_ExecutionSession import ExecutionSession
+from services.results.dashboard_stats import get_dashboard_stats
 
 from sqlalchemy import desc
 
@@ -32,11 +33,6 @@ def index():
     recent_activity = []
     
     if current_user.is_authenticated:
-        from models.model_Endpoints import Endpoint
-        from models.model_APIChain import APIChain
-        from sqlalchemy import func, and_
-        from datetime import datetime, timedelta
-        
         # Get user's recent test runs
         user_test_runs = TestRun.query.filter_by(user_id=current_user.id).order_by(desc(TestRun.created_at)).limit(5).all()
         
@@ -46,40 +42,9 @@ def index():
             TestRun.status.in_(['running', 'pending', 'paused'])
         ).order_by(desc(TestRun.created_at)).limit(3).all()
         
-        # Generate execution engine statistics
-        total_executed = ExecutionResult.query.join(ExecutionSession).join(TestRun).filter(
-            TestRun.user_id == current_user.id
-        ).count()
-        
-        successful_executed = ExecutionResult.query.join(ExecutionSession).join(TestRun).filter(
-            TestRun.user_id == current_user.id,
-            ExecutionResult.success == True
-        ).count()
-        
-        active_sessions = ExecutionSession.query.join(TestRun).filter(
-            TestRun.user_id == current_user.id,
-            ExecutionSession.state.in_(['pending', 'running', 'paused'])
-        ).count()
-        
-        # Calculate average response time from recent executions (last 24h)
-        recent_cutoff = datetime.utcnow() - timedelta(hours=24)
-        avg_response = db.session.query(func.avg(ExecutionResult.response_time_ms)).join(ExecutionSession).join(TestRun).filter(
-            TestRun.user_id == current_user.id,
-            ExecutionResult.executed_at >= recent_cutoff,
-            ExecutionResult.response_time_ms.isnot(None)
-        ).scalar()
-        
-        stats = {
-            'total_test_runs': TestRun.query.filter_by(user_id=current_user.id).count(),
-            'total_test_suites': TestSuite.query.filter_by(user_id=current_user.id).count(),
-            'total_endpoints': Endpoint.query.filter_by(user_id=current_user.id).count(),
-            'total_chains': APIChain.query.filter_by(user_id=current_user.id).count(),
-            'total_test_cases_executed': total_executed,
-            'successful_executions': successful_executed,
-            'overall_success_rate': successful_executed / total_executed if total_executed > 0 else 0,
-            'active_executions': active_sessions,
-            'avg_response_time_ms': avg_response or 0
-        }
+        # Counts, success rates and session summaries (one aggregate query, cached per user)
+        dashboard = get_dashboard_stats(current_user)
+        stats = dashboard['stats']
         
         # Generate recent activity
         recent_activity = []
@@ -133,27 +98,8 @@ def index():
                 'requests_per_second': session.requests_per_second or 0
             })
         
-        # Get recent performance (24h)
-        if total_executed > 0:
-            recent_sessions = ExecutionSession.query.join(TestRun).filter(
-                TestRun.user_id == current_user.id,
-                ExecutionSession.started_at >= recent_cutoff
-            ).all()
-            
-            if recent_sessions:
-                execution_overview['recent_performance'] = {
-                    'total_cases_executed': sum(s.completed_test_cases for s in recent_sessions),
-                    'success_rate': sum(s.success_rate for s in recent_sessions) / len(recent_sessions),
-                    'avg_response_time_ms': avg_response or 0,
-                    'sessions_count': len(recent_sessions)
-                }
-        
-        # Get health summary
-        health_counts = {}
-        for session in ExecutionSession.query.join(TestRun).filter(TestRun.user_id == current_user.id).all():
-            health = session.health_status or 'unknown'
-            health_counts[health] = health_counts.get(health, 0) + 1
-        execution_overview['health_summary'] = health_counts
+        execution_overview['recent_performance'] = dashboard['recent_performance']
+        execution_overview['health_summary'] = dashboard['health_summary']
 
     else:
         execution_overview = {'active_sessions': [], 'recent_performance': None, 'strategy_efficiency': {}, 'health_summary': {}}
@@ -58,7 +58,10 @@ def create_endpoint():
             # NOTE: In a production app, you would encrypt this value before saving.
             credentials_encrypted=form.credentials_encrypted.data,
             timeout_seconds=form.timeout_seconds.data,
-            retry_attempts=form.retry_attempts.data
+            retry_attempts=form.retry_attempts.data,
+            token_refresh_chain=form.token_refresh_chain.data,
+            token_refresh_variable=form.token_refresh_variable.data or None,
+            token_header=form.token_header.data or 'Authorization'
         )
         db.session.add(new_endpoint)
         db.session.commit()
@@ -100,6 +103,9 @@ def edit_endpoint(endpoint_id):
              endpoint.credentials_encrypted = form.credentials_encrypted.data
         endpoint.timeout_seconds = form.timeout_seconds.data
         endpoint.retry_attempts = form.retry_attempts.data
+        endpoint.token_refresh_chain = form.token_refresh_chain.data
+        endpoint.token_refresh_variable = form.token_refresh_variable.data or None
+        endpoint.token_header = form.token_header.data or 'Authorization'
 
         # First, remove all existing headers to start fresh
         EndpointHeader.query.filter_by(endpoint_id=endpoint.id).delete()
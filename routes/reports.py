@@ -11,6 +11,7 @@ from models.model_TestRun import TestRun
 from models.model_ExecutionSession import ExecutionSession, ExecutionResult
 from models.model_TestCase import TestCase
 from models.model_APIChain import APIChain, APIChainStep
+from services.results.chain_steps import chain_step_analysis, chain_step_waterfall
 from extensions import db
 
 report_bp = Blueprint('report_bp', __name__, url_prefix='/reports')
@@ -395,57 +396,18 @@ def api_chain_analysis():
     chain_id = request.args.get('chain_id')
     time_range = request.args.get('time_range', '30')
     
-    if time_range != 'all':
-        cutoff_date = datetime.utcnow() - timedelta(days=int(time_range))
-        query = ExecutionResult.query.filter(
-            and_(ExecutionResult.started_at >= cutoff_date, ExecutionResult.request_method == 'CHAIN')
-        )
-    else:
-        query = ExecutionResult.query.filter(ExecutionResult.request_method == 'CHAIN')
-    
-    if chain_id and chain_id != 'all':
-        # Filter by specific chain
-        executions = [e for e in query.all() 
-                     if e.request_payload and e.request_payload.get('chain_id') == int(chain_id)]
-    else:
-        executions = query.all()
-    
-    # Analyze chain step performance
-    step_analysis = defaultdict(lambda: {'success': 0, 'failure': 0, 'total': 0})
-    
-    for execution in executions:
-        if execution.request_payload and execution.request_payload.get('step_results'):
-            for step_result in execution.request_payload['step_results']:
-                step_order = step_result.get('step_order', 0)
-                step_name = step_result.get('step_name', f'Step {step_order}')
-                step_success = step_result.get('success', False)
-                
-                step_analysis[step_name]['total'] += 1
-                if step_success:
-                    step_analysis[step_name]['success'] += 1
-                else:
-                    step_analysis[step_name]['failure'] += 1
-    
-    # Convert to list format for charting
-    step_data = []
-    for step_name, data in step_analysis.items():
-        success_rate = (data['success'] / data['total'] * 100) if data['total'] > 0 else 0
-        step_data.append({
-            'step_name': step_name,
-            'success_rate': success_rate,
-            'total_executions': data['total'],
-            'success_count': data['success'],
-            'failure_count': data['failure']
-        })
-    
-    # Sort by step order if possible
-    step_data.sort(key=lambda x: x['step_name'])
-    
-    return jsonify({
-        'step_analysis': step_data,
-        'total_chain_executions': len(executions),
-        'overall_success_rate': (len([e for e in executions if e.success]) / len(executions) * 100) if executions else 0
-    })
+    # Grouped queries over the per-step rows (see services/results/chain_steps.py)
+    cutoff_date = datetime.utcnow() - timedelta(days=int(time_range)) if time_range != 'all' else None
+    analysis = chain_step_analysis(
+        chain_id=int(chain_id) if chain_id and chain_id != 'all' else None,
+        since=cutoff_date
+    )
+    return jsonify(analysis)
+
+@report_bp.route('/api/chains/results/<int:result_id>/waterfall')
+def api_chain_waterfall(result_id):
+    """Step timings of one chain execution"""
+    return jsonify({'execution_result_id': result_id, 'steps': chain_step_waterfall(result_id)})
 
 @report_bp.route('/api/endpoint/<int:endpoint_id>/overview')
 def api_endpoint_overview(endpoint_id):
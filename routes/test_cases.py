@@ -3,6 +3,8 @@ from extensions import db
 from models.model_TestCase import TestCase
 from datetime import datetime
 from services.transformers.helpers import process_transformations
+from services.test_cases.duplicates import count_duplicate_clusters, get_duplicate_clusters
+from services.test_cases.search import FACET_FIELDS, SearchError, search_test_cases
 
 test_cases_bp = Blueprint('test_cases_bp', __name__, url_prefix='/test_cases')
 
@@ -15,13 +17,28 @@ def list_test_cases():
     # 1. pull page & search from query string
     page   = request.args.get('page',   1,   type=int)
     search = request.args.get('search', '',  type=str)
-
-    # 2. build base query and filter if needed
+    facets = {field: request.args.get(field) for field in FACET_FIELDS if request.args.get(field)}
+
+    # 2. searches and facet filters go through the search index with keyset pagination
+    if search or facets:
+        try:
+            results = search_test_cases(search, facets, cursor=request.args.get('cursor'),
+                                        limit=20, include_facets=True)
+        except SearchError as e:
+            flash(str(e), 'danger')
+            return redirect(url_for('test_cases_bp.list_test_cases'))
+        return render_template(
+          'test_cases/list_test_cases.html',
+          test_cases=results['items'],
+          pagination=None,
+          search=search,
+          facets=facets,
+          facet_counts=results['facets'],
+          next_cursor=results['next_cursor'],
+        )
+
+    # 3. otherwise paginate the full list
     q = TestCase.query.order_by(TestCase.created_at.desc())
-    if search:
-        q = q.filter(TestCase.prompt.ilike(f'%{search}%'))
-
-    # 3. paginate
     pagination = q.paginate(page=page, per_page=20, error_out=False)
     test_cases = pagination.items
 
@@ -30,8 +47,47 @@ def list_test_cases():
       test_cases=test_cases,
       pagination=pagination,
       search=search,            # so template can echo it back
+      facets={},
+      facet_counts=None,
+      next_cursor=None,
     )
 
+@test_cases_bp.route('/search', methods=['GET'])
+def search_test_cases_api():
+    """
+    GET /test_cases/search?q=...&attack_type=...&nist_risk=...&cursor=...&limit=...
+    Ranked prompt search with facet counts and keyset pagination
+    """
+    facets = {field: request.args.getlist(field) for field in FACET_FIELDS if request.args.getlist(field)}
+    try:
+        results = search_test_cases(
+            request.args.get('q', '', type=str),
+            facets,
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', 20, type=int),
+            include_facets=request.args.get('facets', 'true').lower() != 'false'
+        )
+    except SearchError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'items': [
+            {
+                'id': case.id,
+                'prompt': case.prompt,
+                'source': case.source,
+                'attack_type': case.attack_type,
+                'nist_risk': case.nist_risk,
+                'score': results['scores'].get(case.id),
+                'suites': [{'id': s.id, 'description': s.description} for s in case.test_suites]
+            }
+            for case in results['items']
+        ],
+        'next_cursor': results['next_cursor'],
+        'facets': results['facets'],
+        'backend': results['backend']
+    })
+
 @test_cases_bp.route('/', methods=['POST'])
 def create_test_case_api():
     """
@@ -46,6 +102,27 @@ def create_test_case_api():
 
     return jsonify({"id": new_case.id, "message": "Test case created"}), 201
 
+@test_cases_bp.route('/duplicates', methods=['GET'])
+def duplicate_clusters():
+    """
+    GET /test_cases/duplicates -> Clusters of test cases with the same normalised prompt
+    """
+    page = request.args.get('page', 1, type=int)
+    per_page = 25
+    clusters = get_duplicate_clusters(page=page, per_page=per_page)
+    totals = count_duplicate_clusters()
+
+    if request.args.get('format') == 'json':
+        return jsonify({'page': page, 'per_page': per_page, **totals, 'items': clusters})
+
+    return render_template(
+        'test_cases/duplicate_clusters.html',
+        clusters=clusters,
+        totals=totals,
+        page=page,
+        has_next=page * per_page < totals['clusters']
+    )
+
 # Routes for detail, update, delete
 @test_cases_bp.route('/<int:case_id>', methods=['GET'])
 def get_test_case(case_id):
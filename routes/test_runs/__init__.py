@@ -7,4 +7,6 @@ from . import core
 from . import execution
 from . import filters
 from . import status
-from . import api 
\ No newline at end of file
+from . import api
+from . import export
+from . import search
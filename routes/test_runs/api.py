@@ -1,15 +1,17 @@
 # routes/test_runs/api.py
 
 import logging
-import random
 from flask import jsonify, request
 from flask_login import login_required, current_user
+from sqlalchemy import select
 
 from extensions import db
+from models.associations import test_suite_cases
 from models.model_TestRun import TestRun
 from models.model_TestSuite import TestSuite
 from models.model_TestCase import TestCase
 from models.model_ExecutionSession import ExecutionSession
+from services.test_cases.sampling import owned_suite_ids, random_case_id
 from services.transformers.registry import apply_multiple_transformations, TRANSFORM_PARAM_CONFIG
 from . import test_runs_bp
 
@@ -32,35 +34,23 @@ def get_random_test_case():
         return jsonify({'error': 'Invalid suite IDs provided'}), 400
     
     try:
-        logger.debug(f"Getting test cases for suite_ids: {suite_ids}, user_id: {current_user.id}")
+        logger.debug(f"Getting random test case for suite_ids: {suite_ids}, user_id: {current_user.id}")
         
-        # Get all test cases from the selected suites
-        test_cases = TestCase.query.join(TestCase.test_suites).filter(
-            TestSuite.id.in_(suite_ids),
-            TestSuite.user_id == current_user.id  # Ensure user owns the suites
-        ).all()
+        # Only suites the user owns; pick a case id in SQL instead of loading the suites
+        user_suite_ids = owned_suite_ids(suite_ids, current_user.id)
+        case_id = random_case_id(user_suite_ids)
         
-        logger.debug(f"Found {len(test_cases)} test cases")
-        
-        if not test_cases:
-            # Let's also check if the suites exist and belong to the user
-            user_suites = TestSuite.query.filter(
-                TestSuite.id.in_(suite_ids),
-                TestSuite.user_id == current_user.id
-            ).all()
-            logger.debug(f"User owns {len(user_suites)} of the requested suites")
-            
-            # Check total test cases in those suites
-            if user_suites:
-                total_cases = TestCase.query.join(TestCase.test_suites).filter(
-                    TestSuite.id.in_([s.id for s in user_suites])
-                ).count()
-                logger.debug(f"Total test cases in user's suites: {total_cases}")
-            
+        if case_id is None:
+            logger.debug(f"User owns {len(user_suite_ids)} of the requested suites, none with test cases")
             return jsonify({'error': 'No test cases found in selected suites'}), 404
         
-        # Pick a random test case
-        random_case = random.choice(test_cases)
+        random_case = db.session.get(TestCase, case_id)
+        suite_name = db.session.scalar(
+            select(TestSuite.description)
+            .join(test_suite_cases, test_suite_cases.c.test_suite_id == TestSuite.id)
+            .where(test_suite_cases.c.test_case_id == case_id, TestSuite.id.in_(user_suite_ids))
+            .limit(1)
+        )
         
         return jsonify({
             'id': random_case.id,
@@ -69,7 +59,7 @@ def get_random_test_case():
             'attack_type': random_case.attack_type,
             'data_type': random_case.data_type,
             'nist_risk': random_case.nist_risk,
-            'suite_name': random_case.test_suites[0].description if random_case.test_suites else 'Unknown'
+            'suite_name': suite_name or 'Unknown'
         })
         
     except Exception as e:
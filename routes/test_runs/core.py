@@ -12,9 +12,12 @@ from datetime import datetime
 from models.model_Endpoints import Endpoint
 from models.model_TestSuite import TestSuite
 from models.model_TestRun import TestRun
+from models.model_TestCase import TestCase
 from models.model_ExecutionSession import ExecutionSession, ExecutionResult
 from models.model_PromptFilter import PromptFilter
 from models.model_APIChain import APIChain
+from services.results.response_store import load_response_bodies
+from services.results.archive import load_archived_results
 from . import test_runs_bp
 
 
@@ -36,6 +39,8 @@ def list_test_runs():
                   .order_by(TestRun.id.desc())
                   .paginate(page=page, per_page=10, error_out=False))
     runs = pagination.items
+    # One grouped COUNT(DISTINCT) for the page instead of loading every suite's cases
+    TestRun.load_test_case_counts(runs)
     return render_template('test_runs/list_test_runs.html', test_runs=runs, pagination=pagination)
 
 
@@ -75,7 +80,27 @@ def view_test_run(run_id):
         'success_rate': 0.0
     }
     
-    if latest_session:
+    if latest_session and latest_session.is_archived:
+        # Results were moved to the Parquet archive; read them back from there
+        archived_rows = load_archived_results(latest_session)
+        case_ids = {row['test_case_id'] for row in archived_rows if row.get('test_case_id')}
+        test_cases = {tc.id: tc for tc in TestCase.query.filter(TestCase.id.in_(case_ids)).all()} if case_ids else {}
+
+        for row in archived_rows:
+            execution_results.append({
+                'id': row['id'],
+                'test_case': test_cases.get(row.get('test_case_id')),
+                'sequence_number': row.get('sequence_number'),
+                'success': row.get('success'),
+                'status_code': row.get('status_code'),
+                'response_time_ms': row.get('response_time_ms'),
+                'error_message': row.get('error_message'),
+                'executed_at': row.get('executed_at'),
+                'started_at': row.get('started_at'),
+                'request_data': row.get('request_data'),
+                'response_data': row.get('response_data')
+            })
+    elif latest_session:
         # Get execution results for this session
         results = (
             ExecutionResult.query
@@ -85,6 +110,9 @@ def view_test_run(run_id):
             .all()
         )
         
+        # Resolve deduplicated response bodies in one query
+        load_response_bodies(r.response_body_hash for r in results)
+        
         # Build execution results for display
         for result in results:
             execution_results.append({
@@ -97,16 +125,20 @@ def view_test_run(run_id):
                 'error_message': result.error_message,
                 'executed_at': result.executed_at,
                 'started_at': result.started_at,
-                'request_data': result.request_data,
-                'response_data': result.response_data
+                'request_data': result.get_request_data(latest_session.request_manifest),
+                'response_data': result.get_response_data(),
+                'reused_from_id': result.reused_from_id
             })
         
+    if latest_session:
         # Calculate statistics
+        successful = sum(1 for r in execution_results if r['success'])
         result_stats = {
-            'total': len(results),
-            'successful': sum(1 for r in results if r.success),
-            'failed': sum(1 for r in results if not r.success),
-            'success_rate': (sum(1 for r in results if r.success) / len(results) * 100) if results else 0
+            'total': len(execution_results),
+            'successful': successful,
+            'failed': len(execution_results) - successful,
+            'success_rate': (successful / len(execution_results) * 100) if execution_results else 0,
+            'reused': sum(1 for r in execution_results if r.get('reused_from_id'))
         }
 
     # Load all prompt filters (for backward compatibility)
@@ -199,6 +231,17 @@ def create_test_run():
         'concurrency': int(request.form.get('concurrency', 2)),
         'delay_between_requests': float(request.form.get('delay_between_requests', 0.5)),
         'iterations': int(request.form.get('iterations', 1)),
+        'sample_size': int(request.form.get('sample_size') or 0) or None,
+        'sample_seed': int(request.form['sample_seed']) if request.form.get('sample_seed') else None,
+        'case_order': request.form.get('case_order', 'suite'),
+        'delta': request.form.get('delta') == 'true',
+        'delta_max_age_hours': int(request.form.get('delta_max_age_hours') or 168),
+        'share_chain_prefix': request.form.get('share_chain_prefix') == 'true',
+        'chain_prefix_ttl_seconds': int(request.form.get('chain_prefix_ttl_seconds') or 300),
+        'chain_step_concurrency': int(request.form.get('chain_step_concurrency') or 1),
+        'chain_instance_concurrency': int(request.form.get('chain_instance_concurrency') or 1),
+        'stratified_sample': request.form.get('stratified_sample') == 'true',
+        'ci_width': float(request.form.get('ci_width') or 0.1),
         'auto_adjust': request.form.get('auto_adjust') == 'true',
         'error_threshold': float(request.form.get('error_threshold', 0.1)),
         'execution_mode': request.form.get('execution_mode', 'production'),
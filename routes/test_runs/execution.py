@@ -10,7 +10,7 @@ from extensions import db
 from sqlalchemy import func
 
 # Celery task import
-from tasks.orchestrator import orchestrate          # the new orchestrator task
+from tasks.orchestrator import orchestrate, DEFAULT_SAMPLE_RUN_CASES  # the new orchestrator task
 from tasks.helpers    import emit_run_update        # the shared helper
 
 # Model imports
@@ -84,6 +84,10 @@ def start_test_run(test_run_id):
     
     # Multiply by iterations to get total number of executions
     execution_config = test_run.get_execution_config()
+    if execution_config.get('sample_size'):
+        total_test_cases = min(total_test_cases, execution_config['sample_size'])
+    elif execution_config.get('stratified_sample'):
+        total_test_cases = min(total_test_cases, DEFAULT_SAMPLE_RUN_CASES)
     iterations = execution_config.get('iterations', 1)
     total_test_cases *= iterations
 
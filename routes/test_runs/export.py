@@ -0,0 +1,82 @@
+# routes/test_runs/export.py
+"""
+Streaming export of execution results for a test run.
+"""
+
+import logging
+import os
+import tempfile
+
+from flask import Response, jsonify, request, send_file, stream_with_context
+from flask_login import login_required, current_user
+
+from models.model_TestRun import TestRun
+from models.model_ExecutionSession import ExecutionSession
+from services.results.export import (
+    CONTENT_TYPES, EXPORT_FORMATS, ExportError,
+    iter_result_batches, parse_columns, parse_filters,
+    stream_csv, stream_jsonl, write_parquet
+)
+from . import test_runs_bp
+
+logger = logging.getLogger(__name__)
+
+
+@test_runs_bp.route('/<int:run_id>/export', methods=['GET'])
+@login_required
+def export_run_results(run_id):
+    """
+    Stream the execution results of a run.
+
+    Query parameters:
+        format: csv (default), jsonl or parquet
+        session_id: export one execution session (default: all sessions of the run)
+        columns: comma-separated column list
+        success, status_code, iteration: optional row filters
+    """
+    run = TestRun.query.get_or_404(run_id)
+    if run.user_id != current_user.id and not current_user.is_admin:
+        return jsonify({'error': 'Permission denied'}), 403
+
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unsupported format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    try:
+        columns = parse_columns(request.args.get('columns', '').split(',') if request.args.get('columns') else None)
+        filters = parse_filters(request.args)
+    except ExportError as e:
+        return jsonify({'error': str(e)}), 400
+
+    sessions_query = ExecutionSession.query.filter(ExecutionSession.test_run_id == run.id)
+    session_id = request.args.get('session_id', type=int)
+    if session_id:
+        sessions_query = sessions_query.filter(ExecutionSession.id == session_id)
+    sessions = sessions_query.order_by(ExecutionSession.started_at).all()
+    if session_id and not sessions:
+        return jsonify({'error': 'Execution session not found for this run'}), 404
+
+    filename = f"test_run_{run.id}_results.{export_format}"
+    batches = iter_result_batches(sessions, columns, filters)
+
+    if export_format == 'parquet':
+        # Parquet needs a seekable file for its footer; spool to a temp file in batches
+        fd, tmp_path = tempfile.mkstemp(suffix='.parquet')
+        os.close(fd)
+        try:
+            write_parquet(batches, columns, tmp_path)
+        except Exception as e:
+            os.remove(tmp_path)
+            logger.error(f"Export of run {run_id} failed: {e}", exc_info=True)
+            return jsonify({'error': f'Export failed: {e}'}), 500
+        response = send_file(tmp_path, mimetype=CONTENT_TYPES['parquet'],
+                             as_attachment=True, download_name=filename)
+        response.call_on_close(lambda: os.remove(tmp_path))
+        return response
+
+    body = stream_csv(batches, columns) if export_format == 'csv' else stream_jsonl(batches)
+    return Response(
+        stream_with_context(body),
+        mimetype=CONTENT_TYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
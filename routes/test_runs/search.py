@@ -0,0 +1,67 @@
+# routes/test_runs/search.py
+"""
+Full-text search over the response text of execution results.
+"""
+
+from datetime import datetime
+
+from flask import jsonify, request
+from flask_login import login_required, current_user
+
+from models.model_TestRun import TestRun
+from services.results.response_search import search_responses
+from services.test_cases.search import SearchError
+from . import test_runs_bp
+
+
+def _parse_datetime(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise SearchError(f"'{name}' must be an ISO 8601 date or datetime")
+
+
+def _search(run_id=None):
+    try:
+        results = search_responses(
+            request.args.get('q', '', type=str),
+            run_id=run_id,
+            endpoint_id=request.args.get('endpoint_id', type=int),
+            session_id=request.args.get('session_id', type=int),
+            since=_parse_datetime('since'),
+            until=_parse_datetime('until'),
+            user_id=None if current_user.is_admin else current_user.id,
+            cursor=request.args.get('cursor', type=int),
+            limit=request.args.get('limit', 50, type=int)
+        )
+    except SearchError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(results)
+
+
+@test_runs_bp.route('/responses/search', methods=['GET'])
+@login_required
+def search_all_responses():
+    """
+    Search response text across runs.
+
+    Query parameters:
+        q: search terms (quoted phrases and -exclusions on Postgres)
+        endpoint_id, session_id: optional scope
+        since, until: optional ISO 8601 bounds on executed_at
+        cursor, limit: keyset pagination (pass next_cursor back)
+    """
+    return _search()
+
+
+@test_runs_bp.route('/<int:run_id>/responses/search', methods=['GET'])
+@login_required
+def search_run_responses(run_id):
+    """Search response text within one run (same parameters as /responses/search)."""
+    run = TestRun.query.get_or_404(run_id)
+    if run.user_id != current_user.id and not current_user.is_admin:
+        return jsonify({'error': 'Permission denied'}), 403
+    return _search(run_id=run.id)
@@ -3,11 +3,12 @@ Status update operations for execution results.
 This module handles updating execution session status and viewing execution results.
 """
 
-from flask import redirect, url_for, flash, jsonify, request
+from flask import redirect, url_for, flash, jsonify, request, abort
 from flask_login import login_required, current_user
 from extensions import db
 from models.model_TestRun import TestRun
 from models.model_ExecutionSession import ExecutionSession, ExecutionResult
+from services.results.archive import find_archived_result, archived_result_to_dict
 from . import test_runs_bp
 
 @test_runs_bp.route('/execution_result/<int:result_id>/view', methods=['GET'])
@@ -22,17 +23,28 @@ def view_execution_result(result_id):
     Returns:
         JSON response with execution result details
     """
-    result = ExecutionResult.query.get_or_404(result_id)
+    result = db.session.get(ExecutionResult, result_id)
+    archived_row = None
+    if result is None:
+        # Fall back to the Parquet archive for results of archived sessions
+        archived_row = find_archived_result(result_id)
+        if archived_row is None:
+            abort(404)
+        session = ExecutionSession.query.get_or_404(archived_row['session_id'])
+    else:
+        session = result.session
     
     # Check permissions via the test run
-    session = result.session
     test_run = session.test_run
     
     if test_run.user_id != current_user.id and not current_user.is_admin:
         return jsonify({'error': 'Permission denied'}), 403
     
     try:
-        result_data = result.to_dict(include_detailed_data=True)
+        if archived_row is not None:
+            result_data = archived_result_to_dict(archived_row, include_detailed_data=True)
+        else:
+            result_data = result.to_dict(include_detailed_data=True)
         result_data['session'] = session.to_dict()
         result_data['test_run'] = test_run.to_dict()
         
@@ -4,12 +4,25 @@ This module handles importing and exporting test suites.
 """
 
 import json
-from flask import request, render_template, jsonify
+import os
+import uuid
+from flask import request, render_template, jsonify, url_for, Response, stream_with_context
 from flask_login import login_required, current_user
+from werkzeug.utils import secure_filename
 from extensions import db
 from flask import current_app
 from models.model_TestSuite import TestSuite
 from models.model_TestCase import TestCase
+from models.model_SuiteImportJob import SuiteImportJob
+from services.test_suites.bulk_import import (
+    BulkSuiteImporter, ImportFormatError, detect_format, import_rows, iter_v1_json,
+    suite_prompt_hashes
+)
+from services.test_suites.export import (
+    batch_text, gzip_stream, iter_suite_case_rows, stream_v1_json,
+    stream_jsonl as stream_suites_jsonl
+)
+from tasks.imports import import_test_suites_file
 from . import test_suites_bp
 from datetime import datetime
 
@@ -56,7 +69,7 @@ def export_test_suite(suite_id):
 @test_suites_bp.route('/import_suite', methods=['POST'])
 @login_required
 def import_test_suite():
-    """Import test suite(s) from a JSON file."""
+    """Import test suite(s) from a v1.0 JSON document (small files; use import_jobs for large ones)."""
     try:
         # Handle both JSON and form data
         if request.is_json:
@@ -78,155 +91,145 @@ def import_test_suite():
         if import_data.get('version') != '1.0':
             return jsonify({'error': 'Unsupported file version'}), 400
         
-        # Check if this is a bulk export file (contains multiple suites)
         if 'test_suites' in import_data:
-            # First, check for duplicates
-            duplicates = []
-            for suite_data in import_data['test_suites']:
-                existing_suite = TestSuite.query.filter_by(
-                    description=suite_data['description'],
-                    behavior=suite_data.get('behavior')
-                ).first()
-                
-                if existing_suite:
-                    duplicates.append({
-                        'description': suite_data['description'],
-                        'behavior': suite_data.get('behavior'),
-                        'existing_id': existing_suite.id
-                    })
-            
-            # If there are duplicates, return them for confirmation
-            if duplicates:
-                return jsonify({
-                    'error': 'duplicates_found',
-                    'message': 'Duplicate test suites found',
-                    'duplicates': duplicates,
-                    'total_suites': len(import_data['test_suites']),
-                    'duplicate_count': len(duplicates)
-                }), 409
-            
-            # If no duplicates or force_import is True, proceed with import
-            suites_imported = 0
-            for suite_data in import_data['test_suites']:
-                new_suite = TestSuite(
-                    description=suite_data['description'],
-                    behavior=suite_data.get('behavior'),
-                    objective=suite_data.get('objective'),
-                    user_id=current_user.id
-                )
-                db.session.add(new_suite)
-                
-                # Create test cases
-                for case_data in suite_data.get('test_cases', []):
-                    test_case = TestCase(
-                        prompt=case_data['prompt'],
-                        source=case_data.get('source'),
-                        attack_type=case_data.get('attack_type'),
-                        data_type=case_data.get('data_type'),
-                        nist_risk=case_data.get('nist_risk'),
-                        reviewed=case_data.get('reviewed', False)
-                    )
-                    db.session.add(test_case)
-                    new_suite.test_cases.append(test_case)
-                
-                suites_imported += 1
-            
-            db.session.commit()
-            return jsonify({
-                'success': True,
-                'message': f'Successfully imported {suites_imported} test suite(s)',
-                'suites_imported': suites_imported
-            })
-            
-        # Handle single suite import
+            suites = import_data['test_suites']
         elif 'test_suite' in import_data:
-            suite_data = import_data['test_suite']
-            
-            # Check for duplicates
-            existing_suite = TestSuite.query.filter_by(
-                description=suite_data['description'],
-                behavior=suite_data.get('behavior')
-            ).first()
-            
-            if existing_suite:
+            suites = [import_data['test_suite']]
+        else:
+            return jsonify({'error': 'Invalid file format'}), 400
+        
+        # Check all suites for duplicates in a single query
+        importer = BulkSuiteImporter(user_id=current_user.id)
+        duplicates = importer.check_duplicates(
+            (suite_data['description'], suite_data.get('behavior')) for suite_data in suites
+        )
+        # ...and for suites with a different name but exactly the same prompts
+        duplicates += importer.check_content_duplicates(suite_prompt_hashes(suites))
+        if duplicates:
+            if 'test_suite' in import_data:
                 return jsonify({
                     'error': 'Duplicate test suite',
-                    'message': f'A test suite with description "{suite_data["description"]}" and behavior "{suite_data.get("behavior")}" already exists.',
-                    'existing_suite_id': existing_suite.id
+                    'message': f'A test suite with description "{duplicates[0]["description"]}" and behavior "{duplicates[0]["behavior"]}" already exists.',
+                    'existing_suite_id': duplicates[0]['existing_id']
                 }), 409
-            
-            new_suite = TestSuite(
-                description=suite_data['description'],
-                behavior=suite_data.get('behavior'),
-                objective=suite_data.get('objective'),
-                user_id=current_user.id
-            )
-            db.session.add(new_suite)
-            
-            # Create test cases
-            for case_data in suite_data.get('test_cases', []):
-                test_case = TestCase(
-                    prompt=case_data['prompt'],
-                    source=case_data.get('source'),
-                    attack_type=case_data.get('attack_type'),
-                    data_type=case_data.get('data_type'),
-                    nist_risk=case_data.get('nist_risk'),
-                    reviewed=case_data.get('reviewed', False)
-                )
-                db.session.add(test_case)
-                new_suite.test_cases.append(test_case)
-            
-            db.session.commit()
+            return jsonify({
+                'error': 'duplicates_found',
+                'message': 'Duplicate test suites found',
+                'duplicates': duplicates,
+                'total_suites': len(suites),
+                'duplicate_count': len(duplicates)
+            }), 409
+        
+        # No duplicates: create the suites (in file order), then bulk insert their cases
+        importer.force = True
+        for suite_data in suites:
+            importer.resolve_suite((suite_data['description'], suite_data.get('behavior'), suite_data.get('objective')))
+        import_rows(iter_v1_json(import_data), importer)
+        db.session.commit()
+        
+        if 'test_suite' in import_data:
             return jsonify({
                 'success': True,
                 'message': 'Test suite imported successfully',
-                'suite_id': new_suite.id
+                'suite_id': importer.created_suite_ids[0]
             })
-        else:
-            return jsonify({'error': 'Invalid file format'}), 400
+        return jsonify({
+            'success': True,
+            'message': f'Successfully imported {len(importer.created_suite_ids)} test suite(s)',
+            'suites_imported': len(importer.created_suite_ids),
+            'cases_imported': importer.cases_imported,
+            'cases_reused': importer.cases_reused
+        })
         
+    except ImportFormatError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Error importing test suite: {str(e)}'}), 500
 
-@test_suites_bp.route('/export_all', methods=['GET'])
+@test_suites_bp.route('/import_jobs', methods=['POST'])
 @login_required
-def export_all_test_suites():
-    """Export all test suites to a JSON file."""
-    # Query all test suites
-    test_suites = TestSuite.query.all()
+def create_import_job():
+    """
+    Upload a suite file (v1.0 JSON, JSONL or CSV) and import it in the background.
+
+    Form fields:
+        file: the file to import
+        suite_description: suite for JSONL/CSV rows without a 'suite' column
+        force: import even if a suite with the same description/behavior exists
+    """
+    if 'file' not in request.files or request.files['file'].filename == '':
+        return jsonify({'error': 'No file provided'}), 400
     
-    # Create export data
-    export_data = {
-        'version': '1.0',
-        'exported_at': datetime.utcnow().isoformat(),
-        'test_suites': []
-    }
+    file = request.files['file']
+    file_format = detect_format(file.filename)
+    if not file_format:
+        return jsonify({'error': 'Unsupported file type. Use .json, .jsonl or .csv'}), 400
     
-    # Add each test suite
-    for suite in test_suites:
-        suite_data = {
-            'description': suite.description,
-            'behavior': suite.behavior,
-            'objective': suite.objective,
-            'test_cases': []
-        }
-        
-        # Add test cases for this suite
-        for tc in suite.test_cases:
-            case_data = {
-                'prompt': tc.prompt,
-                'source': tc.source,
-                'attack_type': tc.attack_type,
-                'data_type': tc.data_type,
-                'nist_risk': tc.nist_risk,
-                'reviewed': tc.reviewed
-            }
-            suite_data['test_cases'].append(case_data)
-        
-        export_data['test_suites'].append(suite_data)
+    # Save the upload so the worker can stream it from disk
+    stored_name = f"suite_import_{uuid.uuid4().hex}_{secure_filename(file.filename)}"
+    file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], stored_name)
+    file.save(file_path)
     
-    # Create response with JSON file
-    response = jsonify(export_data)
-    response.headers['Content-Disposition'] = 'attachment; filename=all_test_suites.json'
-    return response
\ No newline at end of file
+    job = SuiteImportJob(
+        user_id=current_user.id,
+        filename=file.filename,
+        file_path=file_path,
+        file_format=file_format,
+        total_bytes=os.path.getsize(file_path),
+        default_suite_description=request.form.get('suite_description') or None,
+        force=request.form.get('force', '').lower() in ('1', 'true', 'yes', 'on')
+    )
+    db.session.add(job)
+    db.session.commit()
+    
+    import_test_suites_file.delay(job.id)
+    
+    return jsonify({
+        'success': True,
+        'job': job.to_dict(),
+        'status_url': url_for('test_suites_bp.get_import_job', job_id=job.id)
+    }), 202
+
+@test_suites_bp.route('/import_jobs/<int:job_id>', methods=['GET'])
+@login_required
+def get_import_job(job_id):
+    """Progress of a background suite import."""
+    job = SuiteImportJob.query.get_or_404(job_id)
+    if job.user_id != current_user.id and not current_user.is_admin:
+        return jsonify({'error': 'Permission denied'}), 403
+    return jsonify(job.to_dict())
+
+@test_suites_bp.route('/export_all', methods=['GET'])
+@login_required
+def export_all_test_suites():
+    """
+    Stream all test suites as a v1.0 JSON file.
+
+    Query parameters:
+        format: json (default) or jsonl (one test case per line)
+        gzip: 1 to gzip the response body (Content-Encoding: gzip)
+    """
+    export_format = request.args.get('format', 'json').lower()
+    if export_format not in ('json', 'jsonl'):
+        return jsonify({'error': "Unsupported format. Use 'json' or 'jsonl'."}), 400
+    use_gzip = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+    rows = iter_suite_case_rows()
+    if export_format == 'jsonl':
+        body = stream_suites_jsonl(rows)
+        mimetype = 'application/x-ndjson'
+    else:
+        body = stream_v1_json(rows)
+        mimetype = 'application/json'
+
+    headers = {'Content-Disposition': f'attachment; filename=all_test_suites.{export_format}'}
+    if use_gzip:
+        body = gzip_stream(body)
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+    else:
+        body = batch_text(body)
+
+    return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
@@ -1,16 +1,18 @@
 # services/chain_execution_service.py
 import logging
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 from urllib.parse import urlparse  # Add this import
 from models.model_APIChain import APIChain, APIChainStep
 from models.model_Endpoints import Endpoint
 from services.common.templating_service import render_template_string
 
-from .common.data_extraction_service import extract_data_from_response, DataExtractionError
-from services.common.templating_service import render_template_string
 from services.common.http_request_service import execute_api_request
-from services.common.data_extraction_service import extract_data_from_response, DataExtractionError
+from services.common.data_extraction_service import DataExtractionError
+from services.common.extraction_engine import ExtractionProgram
+from services.chains.execution_plan import ChainPlan, get_chain_plan
 
 from extensions import db
 
@@ -24,158 +26,232 @@ class ChainExecutionError(Exception):
         super().__init__(message)
         self.step_order = step_order
         self.original_exception = original_exception
+        # Results of the steps run so far (set by execute_chain), including the failing one
+        self.step_results = []
         logger.error(
             f"ChainExecutionError at step {step_order}: {message}", exc_info=original_exception)
 
 
 class APIChainExecutor:
-    def __init__(self):
-        pass
-
-    def execute_chain(self, chain_id: int, execute_until_step_id: int = None, initial_context: dict = None):
-        chain = db.session.get(APIChain, chain_id)
-        if not chain:
+    def __init__(self, session=None):
+        # Optional requests.Session: its cookie jar carries cookies set by one step into the next
+        self.session = session
+
+    def execute_chain(self, chain_id: int, execute_until_step_id: int = None, initial_context: dict = None,
+                      plan: ChainPlan = None, start_after_step_order: int = None, max_parallel_steps: int = 1,
+                      on_step_finished=None):
+        # on_step_finished(step_result, chain_context) is called as each step finishes, successful or not,
+        # with the context including that step's extracted variables
+        # The compiled plan is cached per worker and rebuilt when the chain's steps change;
+        # callers that already looked it up pass it in
+        try:
+            plan = plan or get_chain_plan(chain_id)
+        except Exception as e:
+            raise ChainExecutionError(f"Could not compile APIChain with ID {chain_id}: {e}", original_exception=e) from e
+        if not plan:
             raise ChainExecutionError(
                 f"APIChain with ID {chain_id} not found.")
 
         # This context is built dynamically, carrying values from one step to the next.
         # Start with any provided initial context (e.g., from test cases)
         chain_context = initial_context.copy() if initial_context else {}
-        execution_results = []
-
-        # Sort steps by their defined order
-        steps_to_execute = sorted(chain.steps, key=lambda s: s.step_order)
 
-        for step in steps_to_execute:
-            # Initialize the result dict for this step
-            step_result = {}
-            try:
-                # --- Phase 1: PREPARE & RENDER ---
-                current_endpoint_config = step.endpoint
-                if not current_endpoint_config:
-                    raise ValueError(
-                        f"Endpoint configuration not found for step {step.step_order}")
-
-                step_result = {"step_order": step.step_order,
-                               "endpoint_name": current_endpoint_config.name, "status": "processing"}
-
-                # Render all necessary components using the current state of the chain_context
-                # The headers for an endpoint are now a single JSON string template
-                
-                # Enhanced debugging for header templating
-                logger.info(f"Step {step.step_order} - Current chain context: {chain_context}")
-                logger.info(f"Step {step.step_order} - Headers template: {step.headers or '{}'}")
-                logger.info(f"Step {step.step_order} - Payload template: {step.payload or '{}'}")
-                
-                try:
-                    rendered_headers_str = render_template_string(step.headers or '{}', chain_context)
-                    logger.info(f"Step {step.step_order} - Rendered headers string: {rendered_headers_str}")
-                    rendered_headers = json.loads(rendered_headers_str)
-                    logger.info(f"Step {step.step_order} - Parsed headers dict: {rendered_headers}")
-                except Exception as header_error:
-                    logger.error(f"Step {step.step_order} - Header templating/parsing error: {header_error}")
-                    raise ChainExecutionError(f"Header templating failed: {header_error}") from header_error
-                
-                try:
-                    rendered_payload_str = render_template_string(step.payload or '{}', chain_context)
-                    logger.info(f"Step {step.step_order} - Rendered payload: {rendered_payload_str}")
-                except Exception as payload_error:
-                    logger.error(f"Step {step.step_order} - Payload templating error: {payload_error}")
-                    raise ChainExecutionError(f"Payload templating failed: {payload_error}") from payload_error
-
-                logger.info(
-                    f"Executing Step {step.step_order}: '{current_endpoint_config.name}' with method {current_endpoint_config.method}")
-                logger.info(f"Step {step.step_order} - Target URL: {current_endpoint_config.base_url}{current_endpoint_config.path}")
-                logger.info(f"Step {step.step_order} - Final headers: {rendered_headers}")
-                logger.info(f"Step {step.step_order} - Final payload: {rendered_payload_str}")
-                
-                # --- Phase 2: EXECUTE ---
-                api_response_data = execute_api_request(
-                    method=current_endpoint_config.method,
-                    hostname_url=current_endpoint_config.base_url, # Base URL is not templated per step
-                    endpoint_path=current_endpoint_config.path,   # Path is not templated per step
-                    raw_headers_or_dict=rendered_headers,
-                    http_payload_as_string=rendered_payload_str
-                )
-
-                # Populate result with response info for logging and extraction
-                step_result["response_status_code"] = api_response_data.get(
-                    "status_code")
-                response_body = api_response_data.get("response_body", "")
-                step_result["response_body_preview"] = response_body[:200] + \
-                    ("..." if len(response_body) > 200 else "")
-
-                # --- Phase 3: VALIDATE ---
-                # Consolidated check for any kind of failure from the API call
-                is_successful_call = not api_response_data.get("error_message") and 200 <= (
-                    api_response_data.get("status_code") or 0) < 300
-
-                if not is_successful_call:
-                    # Enhanced error reporting
-                    status_code = api_response_data.get('status_code')
-                    error_message = api_response_data.get("error_message")
-                    response_body = api_response_data.get("response_body", "")
-                    request_headers = api_response_data.get("request_headers_sent", {})
-                    
-                    err_msg = f"API call failed with status {status_code}"
-                    if error_message:
-                        err_msg += f" - {error_message}"
-                    
-                    # Log detailed error information
-                    logger.error(f"Step {step.step_order} - API call failed:")
-                    logger.error(f"  Status Code: {status_code}")
-                    logger.error(f"  Error Message: {error_message}")
-                    logger.error(f"  Response Body: {response_body[:500]}{'...' if len(response_body) > 500 else ''}")
-                    logger.error(f"  Request Headers: {request_headers}")
-                    logger.error(f"  Target URL: {current_endpoint_config.base_url}{current_endpoint_config.path}")
-                    logger.error(f"  HTTP Method: {current_endpoint_config.method}")
-                    
-                    raise ChainExecutionError(f"API call failed: {err_msg}")
-
-                step_result["status"] = "success"
-                logger.info(f"Step {step.step_order} successful with status {api_response_data.get('status_code')}.")
-
-                # --- Phase 4: EXTRACT ---
-                if step.data_extraction_rules:
-                    extracted_data = {}
-                    for rule in step.data_extraction_rules:
-                        variable_name = rule.get("variable_name")
-                        if variable_name:
-                            # DataExtractionError will be caught by the main exception handler below
-                            extracted_value = extract_data_from_response(
-                                api_response_data, rule)
-                            chain_context[variable_name] = extracted_value
-                            extracted_data[variable_name] = extracted_value
-
-                    # Create a preview of extracted data for logging/UI
-                    step_result["extracted_data_preview"] = {k: str(
-                        v)[:50] + '...' if len(str(v)) > 50 else str(v) for k, v in extracted_data.items()}
-
-            except (ValueError, DataExtractionError, ChainExecutionError) as e:
-                step_result.setdefault("status", "error")
-                step_result["message"] = str(e)
-                raise ChainExecutionError(
-                    f"Error at step {step.step_order}: {e}", step_order=step.step_order, original_exception=e) from e
-
-            except Exception as e_unexpected:
-                step_result.setdefault("status", "error")
-                step_result["message"] = f"An unexpected error occurred: {str(e_unexpected)}"
-                raise ChainExecutionError(
-                    f"Unexpected error at step {step.step_order}", step_order=step.step_order, original_exception=e_unexpected) from e_unexpected
-
-            finally:
-                # This 'finally' block ensures that the result of the step,
-                # whether it ended in success or error, is always recorded.
+        # Steps up to start_after_step_order already ran; their output is in initial_context
+        steps = [step for step in plan.steps
+                 if start_after_step_order is None or step.step_order > start_after_step_order]
+        # Stop after execute_until_step_id ( used in testing the upto link functionality )
+        if execute_until_step_id is not None:
+            until = next((i for i, step in enumerate(steps) if step.step_id == execute_until_step_id), None)
+            if until is not None:
+                logger.info(f"Partial execution requested. Stopping after step {steps[until].step_order} "
+                            f"(ID: {execute_until_step_id}).")
+                steps = steps[:until + 1]
+
+        if max_parallel_steps and max_parallel_steps > 1 and len(steps) > 1:
+            execution_results = self._execute_step_graph(steps, chain_context, max_parallel_steps, on_step_finished)
+        else:
+            execution_results = []
+            chain_started = time.monotonic()
+            for step in steps:
+                step_result, extracted_data, error = self._execute_step(step, chain_context, chain_started)
                 execution_results.append(step_result)
-
-            # Check to see if we should stop here ( used in testing the upto link functionality )
-            if execute_until_step_id is not None and step.id == execute_until_step_id:
-                logger.info(f"Partial execution requested. Stopping after step {step.step_order} (ID: {step.id}).")
-                break  # Exit the loop
+                if not error:
+                    chain_context.update(extracted_data)
+                if on_step_finished:
+                    on_step_finished(step_result, chain_context)
+                if error:
+                    error.step_results = execution_results
+                    raise error
 
         logger.info(f"Chain execution completed for Chain ID: {chain_id}. Final context keys: {list(chain_context.keys())}")
         return {"final_context": chain_context, "step_results": execution_results}
 
+    def _execute_step_graph(self, steps, chain_context: dict, max_parallel_steps: int, on_step_finished=None):
+        """
+        Executes the steps as a dependency graph: a step starts as soon as every
+        earlier step it depends on (see CompiledStep.depends_on) has finished,
+        up to max_parallel_steps at a time. Steps that run concurrently never
+        read or write each other's variables, so each one sees the context it
+        would see when run in order and the final context is the same as well.
+        Returns the step results in step order. On failure, waits for the
+        running steps and raises the error of the earliest failed step, whose
+        result is last in its step_results.
+        """
+        pending = {step.step_order: step for step in steps}
+        scheduled = set(pending)
+        done, results, failures = set(), {}, {}
+        running = {}
+        chain_started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=max_parallel_steps) as pool:
+            while pending or running:
+                if not failures:
+                    for order in sorted(pending):
+                        if len(running) >= max_parallel_steps:
+                            break
+                        step = pending[order]
+                        if all(dep in done or dep not in scheduled for dep in step.depends_on):
+                            del pending[order]
+                            # Each step renders from a snapshot of the context at its start
+                            running[pool.submit(self._execute_step, step, dict(chain_context), chain_started)] = step
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                # Merge in step order so simultaneous completions apply deterministically
+                for future in sorted(finished, key=lambda f: running[f].step_order):
+                    step = running.pop(future)
+                    step_result, extracted_data, error = future.result()
+                    results[step.step_order] = step_result
+                    if error:
+                        failures[step.step_order] = error
+                    else:
+                        chain_context.update(extracted_data)
+                        done.add(step.step_order)
+                    if on_step_finished:
+                        on_step_finished(step_result, chain_context)
+
+        if failures:
+            failed_order = min(failures)
+            error = failures[failed_order]
+            error.step_results = ([results[order] for order in sorted(results) if order != failed_order]
+                                  + [results[failed_order]])
+            raise error
+        return [results[order] for order in sorted(results)]
+
+    def _execute_step(self, step, context: dict, chain_started: float):
+        """
+        Renders, sends and validates one compiled step and extracts its variables.
+        Never raises: returns (step_result, extracted_data, ChainExecutionError or None).
+        """
+        # Initialize the result dict for this step
+        step_result = {"step_order": step.step_order, "step_id": step.step_id, "step_name": step.name,
+                       "endpoint_id": step.endpoint_id, "endpoint_name": step.endpoint_name,
+                       "status": "processing", "extracted_count": 0}
+        extracted_data = {}
+        step_started = time.monotonic()
+        try:
+            # --- Phase 1: RENDER ---
+            # Render the precompiled templates using the context the step sees
+            logger.debug(f"Step {step.step_order} - Current chain context keys: {list(context.keys())}")
+            try:
+                rendered_headers = step.render_headers(context)
+            except Exception as header_error:
+                logger.error(f"Step {step.step_order} - Header templating/parsing error: {header_error}")
+                raise ChainExecutionError(f"Header templating failed: {header_error}") from header_error
+
+            try:
+                rendered_payload_str = step.render_payload(context)
+            except Exception as payload_error:
+                logger.error(f"Step {step.step_order} - Payload templating error: {payload_error}")
+                raise ChainExecutionError(f"Payload templating failed: {payload_error}") from payload_error
+
+            logger.info(
+                f"Executing Step {step.step_order}: '{step.endpoint_name}' with method {step.method}")
+            logger.debug(f"Step {step.step_order} - Target URL: {step.base_url}{step.path}")
+            logger.debug(f"Step {step.step_order} - Final headers: {rendered_headers}")
+            logger.debug(f"Step {step.step_order} - Final payload: {rendered_payload_str}")
+
+            # --- Phase 2: EXECUTE ---
+            api_response_data = execute_api_request(
+                method=step.method,
+                hostname_url=step.base_url, # Base URL is not templated per step
+                endpoint_path=step.path,   # Path is not templated per step
+                raw_headers_or_dict=rendered_headers,
+                http_payload_as_string=rendered_payload_str,
+                session=self.session
+            )
+
+            # Populate result with response info for logging and extraction
+            step_result["response_status_code"] = api_response_data.get(
+                "status_code")
+            response_body = api_response_data.get("response_body", "")
+            step_result["response_body_preview"] = response_body[:200] + \
+                ("..." if len(response_body) > 200 else "")
+
+            # --- Phase 3: VALIDATE ---
+            # Consolidated check for any kind of failure from the API call
+            is_successful_call = not api_response_data.get("error_message") and 200 <= (
+                api_response_data.get("status_code") or 0) < 300
+
+            if not is_successful_call:
+                # Enhanced error reporting
+                status_code = api_response_data.get('status_code')
+                error_message = api_response_data.get("error_message")
+                response_body = api_response_data.get("response_body", "")
+                request_headers = api_response_data.get("request_headers_sent", {})
+
+                err_msg = f"API call failed with status {status_code}"
+                if error_message:
+                    err_msg += f" - {error_message}"
+
+                # Log detailed error information
+                logger.error(f"Step {step.step_order} - API call failed:")
+                logger.error(f"  Status Code: {status_code}")
+                logger.error(f"  Error Message: {error_message}")
+                logger.error(f"  Response Body: {response_body[:500]}{'...' if len(response_body) > 500 else ''}")
+                logger.error(f"  Request Headers: {request_headers}")
+                logger.error(f"  Target URL: {step.base_url}{step.path}")
+                logger.error(f"  HTTP Method: {step.method}")
+
+                raise ChainExecutionError(f"API call failed: {err_msg}")
+
+            step_result["status"] = "success"
+            logger.info(f"Step {step.step_order} successful with status {api_response_data.get('status_code')}.")
+
+            # --- Phase 4: EXTRACT ---
+            if step.extraction:
+                # All rules in one pass over a single parse of the body.
+                # DataExtractionError will be caught by the main exception handler below
+                extracted_data = step.extraction.extract(api_response_data)
+
+                step_result["extracted_count"] = len(extracted_data)
+                # Create a preview of extracted data for logging/UI
+                step_result["extracted_data_preview"] = {k: str(
+                    v)[:50] + '...' if len(str(v)) > 50 else str(v) for k, v in extracted_data.items()}
+
+        except (ValueError, DataExtractionError, ChainExecutionError) as e:
+            step_result["status"] = "error"
+            step_result["message"] = str(e)
+            chain_error = ChainExecutionError(
+                f"Error at step {step.step_order}: {e}", step_order=step.step_order, original_exception=e)
+            return step_result, extracted_data, chain_error
+
+        except Exception as e_unexpected:
+            step_result["status"] = "error"
+            step_result["message"] = f"An unexpected error occurred: {str(e_unexpected)}"
+            chain_error = ChainExecutionError(
+                f"Unexpected error at step {step.step_order}", step_order=step.step_order, original_exception=e_unexpected)
+            return step_result, extracted_data, chain_error
+
+        finally:
+            # This 'finally' block ensures that the timing of the step,
+            # whether it ended in success or error, is always recorded.
+            step_result["started_offset_ms"] = int((step_started - chain_started) * 1000)
+            step_result["latency_ms"] = int((time.monotonic() - step_started) * 1000)
+
+        return step_result, extracted_data, None
+
     def execute_single_step(self, step, context):
         """
         Executes a single, prepared step of an API chain.
@@ -235,20 +311,10 @@ class APIChainExecutor:
             )
 
             # 3. EXTRACT DATA
-            new_context_variables = {}
-            for rule in step.data_extraction_rules:
-                try:
-                    # The rule itself contains the variable_name to use as the key
-                    variable_name = rule.get("variable_name")
-                    if not variable_name:
-                        continue # Skip rules without a name
-
-                    # Use the actual function from your data_extraction_service
-                    extracted_value = extract_data_from_response(response_data, rule)
-                    new_context_variables[variable_name] = extracted_value
-                except DataExtractionError as e:
-                    # Log the extraction error but don't stop the whole chain
-                    print(f"Data extraction warning for step {step.step_order}: {e}")
+            new_context_variables, extraction_errors = ExtractionProgram(step.data_extraction_rules).extract_each(response_data)
+            for variable_name, e in extraction_errors.items():
+                # Log the extraction error but don't stop the whole chain
+                logger.warning(f"Data extraction warning for step {step.step_order}: {e}")
 
 
             # Return a comprehensive result for the debugger UI
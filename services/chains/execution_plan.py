@@ -0,0 +1,241 @@
+# services/chains/execution_plan.py
+"""
+Compiled, immutable execution plans for API chains.
+
+Executing a chain used to reload the chain and its steps for every test
+case, re-parse every header and payload template, `json.loads` the rendered
+headers and scan the raw templates for `{{INJECT_PROMPT}}`. None of that
+changes between cases, so it is done once per chain version instead:
+
+    - the steps in execution order with their endpoint target,
+    - the header and payload templates compiled to Jinja templates (headers
+      that are a JSON object are split into per-value templates, so no JSON
+      is parsed per case; static headers are parsed once outright),
+    - the extraction rules, compiled into an ExtractionProgram,
+    - the variables each step reads and writes, and the earlier steps it
+      depends on (the edges of the graph execute_chain runs steps in
+      parallel along).
+
+Plans are cached per worker process keyed on the chain id. Each lookup
+costs one small query for the chain's `steps_version` (bumped whenever a
+step is added, edited, removed or reordered) and the newest `updated_at` of
+the step endpoints; when either differs from the cached plan it is rebuilt.
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+
+from extensions import db
+from models.model_APIChain import APIChain, APIChainStep
+from models.model_Endpoints import Endpoint
+from services.common.extraction_engine import ExtractionProgram
+from services.common.templating_service import compile_template, get_template_variables
+
+logger = logging.getLogger(__name__)
+
+# Context variables that carry the test case prompt
+PROMPT_VARIABLES = frozenset({'INJECT_PROMPT', 'INJECT_PROMPT_JSON'})
+# Context variables that differ between the cases of a run
+CASE_VARIABLES = PROMPT_VARIABLES | {'TEST_CASE_ID', 'ITERATION'}
+
+
+@dataclass(frozen=True)
+class CompiledStep:
+    """One chain step with its templates compiled and its variables resolved."""
+    step_id: int
+    step_order: int
+    name: Optional[str]
+    endpoint_id: int
+    endpoint_name: str
+    method: str
+    base_url: str
+    path: str
+    headers_source: str
+    payload_source: str
+    payload_template: Any
+    # Exactly one of these is set: a JSON object template split into (key, value template)
+    # pairs, a parsed static header dict, or the whole template for anything else
+    header_templates: Optional[Tuple[Tuple[str, Any], ...]]
+    static_headers: Optional[Mapping[str, Any]]
+    headers_template: Any
+    extraction: ExtractionProgram
+    variables_used: FrozenSet[str]
+    variables_produced: FrozenSet[str]
+    # step_order of the earlier steps that must finish first: those that write a
+    # variable this step reads, read a variable it writes, or write the same one
+    depends_on: Tuple[int, ...]
+
+    @property
+    def uses_prompt(self) -> bool:
+        return bool(self.variables_used & PROMPT_VARIABLES)
+
+    def render_headers(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """The request headers for the context. Raises on templates that do not render to a JSON object."""
+        if self.static_headers is not None:
+            return dict(self.static_headers)
+        if self.header_templates is not None:
+            return {key: template.render(context) for key, template in self.header_templates}
+        rendered = json.loads(self.headers_template.render(context))
+        if not isinstance(rendered, dict):
+            raise ValueError(f"Headers for step {self.step_order} must render to a JSON object")
+        return rendered
+
+    def render_payload(self, context: Dict[str, Any]) -> str:
+        return self.payload_template.render(context)
+
+
+@dataclass(frozen=True)
+class ChainPlan:
+    """Everything needed to execute one version of a chain, without touching the ORM."""
+    chain_id: int
+    chain_name: str
+    steps_version: int
+    endpoints_updated_at: Optional[datetime]
+    steps: Tuple[CompiledStep, ...]
+
+    @property
+    def injection_step(self) -> Optional[CompiledStep]:
+        """The first step that reads the test case prompt."""
+        return next((step for step in self.steps if step.uses_prompt), None)
+
+    @property
+    def injection_step_order(self) -> Optional[int]:
+        step = self.injection_step
+        return step.step_order if step else None
+
+    @property
+    def shared_prefix(self) -> Tuple[CompiledStep, ...]:
+        """
+        The leading steps that read no per-case variable (logins, session
+        creation), whose outcome is the same for every case of a run. Empty
+        when no step reads the prompt, as the whole chain would be shared.
+        """
+        if self.injection_step is None:
+            return ()
+        prefix = []
+        for step in self.steps:
+            if step.variables_used & CASE_VARIABLES:
+                break
+            prefix.append(step)
+        return tuple(prefix)
+
+
+# chain_id -> plan compiled by this process
+_plan_cache: Dict[int, ChainPlan] = {}
+
+
+def _compile_headers(source: str):
+    """(header_templates, static_headers, headers_template) for a headers template string."""
+    headers_template = compile_template(source)
+    try:
+        parsed = json.loads(source)
+    except ValueError:
+        # Jinja control structures etc.: render the whole string and parse the result per case
+        return None, None, headers_template
+    if not isinstance(parsed, dict) or not all(isinstance(value, str) and '{' not in key
+                                               for key, value in parsed.items()):
+        return None, None, headers_template
+    if not get_template_variables(source):
+        return None, MappingProxyType(parsed), headers_template
+    return tuple((key, compile_template(value)) for key, value in parsed.items()), None, headers_template
+
+
+def compile_step(step: APIChainStep, earlier: Sequence[CompiledStep]) -> CompiledStep:
+    """Compile one step; `earlier` are the compiled steps before it."""
+    endpoint = step.endpoint
+    if not endpoint:
+        raise ValueError(f"Endpoint configuration not found for step {step.step_order}")
+
+    headers_source = step.headers or '{}'
+    payload_source = step.payload or '{}'
+    header_templates, static_headers, headers_template = _compile_headers(headers_source)
+    variables_used = frozenset(get_template_variables(headers_source) | get_template_variables(payload_source))
+    extraction = ExtractionProgram(step.data_extraction_rules)
+    variables_produced = frozenset(extraction.variable_names)
+    depends_on = tuple(
+        prior.step_order for prior in earlier
+        if prior.variables_produced & (variables_used | variables_produced) or prior.variables_used & variables_produced
+    )
+
+    return CompiledStep(
+        step_id=step.id,
+        step_order=step.step_order,
+        name=step.name,
+        endpoint_id=endpoint.id,
+        endpoint_name=endpoint.name,
+        method=endpoint.method,
+        base_url=endpoint.base_url,
+        path=endpoint.path,
+        headers_source=headers_source,
+        payload_source=payload_source,
+        payload_template=compile_template(payload_source),
+        header_templates=header_templates,
+        static_headers=static_headers,
+        headers_template=headers_template,
+        extraction=extraction,
+        variables_used=variables_used,
+        variables_produced=variables_produced,
+        depends_on=depends_on
+    )
+
+
+def compile_chain(chain: APIChain, version: Optional[Tuple[int, Optional[datetime]]] = None) -> ChainPlan:
+    """Compile the chain's current steps into a plan. `version` is what get_chain_plan read."""
+    steps_version, endpoints_updated_at = version or (chain.steps_version or 0, None)
+    steps = db.session.scalars(
+        select(APIChainStep)
+        .options(joinedload(APIChainStep.endpoint))
+        .where(APIChainStep.chain_id == chain.id)
+        .order_by(APIChainStep.step_order)
+    ).unique().all()
+
+    compiled = []
+    for step in steps:
+        compiled.append(compile_step(step, compiled))
+
+    return ChainPlan(
+        chain_id=chain.id,
+        chain_name=chain.name,
+        steps_version=steps_version,
+        endpoints_updated_at=endpoints_updated_at,
+        steps=tuple(compiled)
+    )
+
+
+def _plan_version(chain_id: int) -> Optional[Tuple[int, Optional[datetime]]]:
+    """(steps_version, newest step endpoint updated_at) of the chain, or None if it does not exist."""
+    row = db.session.execute(
+        select(APIChain.steps_version, func.max(Endpoint.updated_at))
+        .select_from(APIChain)
+        .outerjoin(APIChainStep, APIChainStep.chain_id == APIChain.id)
+        .outerjoin(Endpoint, Endpoint.id == APIChainStep.endpoint_id)
+        .where(APIChain.id == chain_id)
+        .group_by(APIChain.id, APIChain.steps_version)
+    ).first()
+    return (row[0] or 0, row[1]) if row else None
+
+
+def get_chain_plan(chain_id: int) -> Optional[ChainPlan]:
+    """The execution plan for the chain's current version, or None if the chain does not exist."""
+    version = _plan_version(chain_id)
+    if version is None:
+        _plan_cache.pop(chain_id, None)
+        return None
+
+    cached = _plan_cache.get(chain_id)
+    if cached and (cached.steps_version, cached.endpoints_updated_at) == version:
+        return cached
+
+    chain = db.session.get(APIChain, chain_id)
+    plan = compile_chain(chain, version)
+    _plan_cache[chain_id] = plan
+    logger.info(f"Compiled execution plan for chain {chain_id} (steps version {plan.steps_version}, "
+                f"{len(plan.steps)} step(s)).")
+    return plan
@@ -0,0 +1,71 @@
+# services/chains/instances.py
+"""
+Isolated chain instances.
+
+An instance is one execution of a chain for one test case. Each instance
+gets its own APIChainExecutor, requests.Session (and so its own cookie jar)
+and chain context, so any number of instances of the same chain can run at
+once in worker threads without seeing each other's cookies or variables.
+The compiled plan is shared: it is immutable and executing it does not touch
+the database, so the plan must be looked up before the instances start.
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import requests
+
+from services.chain_execution_service import APIChainExecutor, ChainExecutionError
+from services.chains.execution_plan import ChainPlan
+
+logger = logging.getLogger(__name__)
+
+
+def case_context(prompt: str, test_case_id: int, iteration: int = 1,
+                 overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Initial chain context for one test case."""
+    context = {
+        "INJECT_PROMPT": prompt,
+        "INJECT_PROMPT_JSON": json.dumps(prompt)[1:-1],  # JSON-escaped without quotes
+        "TEST_CASE_ID": test_case_id,
+        "ITERATION": iteration
+    }
+    if overrides:
+        context.update(overrides)
+    return context
+
+
+def run_chain_instance(plan: ChainPlan, initial_context: Dict[str, Any],
+                       max_parallel_steps: int = 1) -> Dict[str, Any]:
+    """
+    Execute the plan once with a fresh session. Never raises; returns success,
+    status_code and response_body of the last step that ran, response_time
+    (seconds), error_message, final_context and step_results.
+    """
+    started = time.monotonic()
+    final_context, step_results, error_message = {}, [], None
+    with requests.Session() as session:
+        try:
+            result = APIChainExecutor(session=session).execute_chain(
+                plan.chain_id, initial_context=initial_context, plan=plan,
+                max_parallel_steps=max_parallel_steps)
+            final_context, step_results = result['final_context'], result['step_results']
+        except ChainExecutionError as e:
+            step_results, error_message = e.step_results, str(e)
+        except Exception as e:
+            logger.error(f"Chain {plan.chain_id} instance failed unexpectedly: {e}", exc_info=True)
+            error_message = f"Unexpected error: {e}"
+
+    last_step = step_results[-1] if step_results else {}
+    return {
+        'success': error_message is None,
+        'status_code': last_step.get('response_status_code'),
+        'response_body': last_step.get('response_body_preview', '') if error_message is None
+                         else last_step.get('message') or error_message,
+        'response_time': time.monotonic() - started,
+        'error_message': error_message,
+        'final_context': final_context,
+        'step_results': step_results
+    }
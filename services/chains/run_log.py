@@ -0,0 +1,129 @@
+# services/chains/run_log.py
+"""
+Persisted background chain runs.
+
+`execute_chain_run` executes a ChainRun's chain and records each step as it
+finishes: a ChainStepLog row plus the run's progress counters and its context
+after the last successful step, committed per step so the progress API sees
+steps while the chain is still running. A failed run can be resumed by a new
+run that starts with the saved context at the failing step, provided the
+chain's steps have not changed since (same `steps_version`).
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from extensions import db
+from models.model_APIChain import APIChain
+from models.model_ChainRun import ChainRun, ChainStepLog
+from services.chain_execution_service import APIChainExecutor, ChainExecutionError
+from services.chains.execution_plan import get_chain_plan
+
+logger = logging.getLogger(__name__)
+
+
+def create_chain_run(chain: APIChain, user_id: Optional[int], resumed_from: Optional[ChainRun] = None) -> ChainRun:
+    """A pending run of the chain; a resumed run continues from `resumed_from`'s saved state. The caller commits."""
+    chain_run = ChainRun(chain_id=chain.id, user_id=user_id, status='pending',
+                         steps_version=chain.steps_version, total_steps=chain.steps.count())
+    if resumed_from is not None:
+        chain_run.resumed_from_id = resumed_from.id
+        chain_run.context = dict(resumed_from.context or {})
+        chain_run.completed_steps = resumed_from.completed_steps
+        chain_run.last_completed_step_order = resumed_from.last_completed_step_order
+    db.session.add(chain_run)
+    return chain_run
+
+
+def resume_blocker(chain_run: ChainRun) -> Optional[str]:
+    """Why the run cannot be resumed, or None if it can."""
+    if chain_run.status != 'failed':
+        return f"Only failed runs can be resumed (this run is {chain_run.status})."
+    if chain_run.chain is None:
+        return "The chain no longer exists."
+    if chain_run.steps_version != chain_run.chain.steps_version:
+        return "The chain's steps changed since this run; start a new run instead."
+    return None
+
+
+class ChainRunRecorder:
+    """
+    on_step_finished callback for APIChainExecutor.execute_chain that logs each
+    step of a sequential run and commits the run's progress.
+    """
+
+    def __init__(self, chain_run: ChainRun):
+        self.chain_run = chain_run
+
+    def __call__(self, step_result: Dict[str, Any], chain_context: Dict[str, Any]) -> None:
+        success = step_result.get('status') == 'success'
+        message = step_result.get('message')
+        db.session.add(ChainStepLog(
+            chain_run_id=self.chain_run.id,
+            step_id=step_result.get('step_id'),
+            endpoint_id=step_result.get('endpoint_id'),
+            step_order=step_result.get('step_order', 0),
+            step_name=(step_result.get('step_name') or step_result.get('endpoint_name') or '')[:100] or None,
+            status='success' if success else 'error',
+            status_code=step_result.get('response_status_code'),
+            latency_ms=step_result.get('latency_ms'),
+            response_preview=step_result.get('response_body_preview'),
+            extracted_preview=step_result.get('extracted_data_preview'),
+            error_message=message
+        ))
+
+        chain_run = self.chain_run
+        if success:
+            chain_run.completed_steps = (chain_run.completed_steps or 0) + 1
+            chain_run.last_completed_step_order = step_result.get('step_order')
+            # Round-trip through JSON so the saved context is exactly what a resume will load
+            chain_run.context = json.loads(json.dumps(chain_context, default=str))
+        else:
+            chain_run.failed_step_order = step_result.get('step_order')
+            chain_run.error_message = message
+        db.session.commit()
+
+
+def execute_chain_run(chain_run: ChainRun, executor: Optional[APIChainExecutor] = None) -> ChainRun:
+    """Execute the run (from its saved state when resumed) and record it. Commits as it goes."""
+    chain_run.status = 'running'
+    chain_run.started_at = datetime.utcnow()
+    chain_run.failed_step_order = None
+    chain_run.error_message = None
+    db.session.commit()
+
+    try:
+        plan = get_chain_plan(chain_run.chain_id)
+        if plan is None:
+            raise ChainExecutionError(f"APIChain with ID {chain_run.chain_id} not found.")
+        if chain_run.resumed_from_id and plan.steps_version != chain_run.steps_version:
+            raise ChainExecutionError("The chain's steps changed since the resumed run.")
+        chain_run.steps_version = plan.steps_version
+        chain_run.total_steps = len(plan.steps)
+        db.session.commit()
+
+        (executor or APIChainExecutor()).execute_chain(
+            chain_run.chain_id,
+            initial_context=chain_run.context or {},
+            plan=plan,
+            start_after_step_order=chain_run.last_completed_step_order,
+            on_step_finished=ChainRunRecorder(chain_run)
+        )
+        chain_run.status = 'completed'
+    except ChainExecutionError as e:
+        chain_run.status = 'failed'
+        # Step failures were recorded by the recorder; keep its message
+        chain_run.error_message = chain_run.error_message or str(e)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Chain run {chain_run.id} failed unexpectedly: {e}", exc_info=True)
+        chain_run.status = 'failed'
+        chain_run.error_message = f"Unexpected error: {e}"
+
+    chain_run.completed_at = datetime.utcnow()
+    db.session.commit()
+    logger.info(f"Chain run {chain_run.id} (chain {chain_run.chain_id}) {chain_run.status}: "
+                f"{chain_run.completed_steps}/{chain_run.total_steps} step(s).")
+    return chain_run
@@ -0,0 +1,134 @@
+# services/chains/shared_prefix.py
+"""
+Run the prompt-independent prefix of a chain once per run instead of once per case.
+
+Chains usually start with login or session-creation steps whose templates
+read none of the per-case variables (see ChainPlan.shared_prefix). Their
+outcome is the same for every case of a run, so each worker process runs
+the prefix once per (run, chain version), keeps the resulting context and
+starts every case's chain after the prefix with that context.
+
+An entry is kept for the run's TTL, or until shortly before the earliest
+JWT the prefix extracted expires, whichever comes first. A case whose step
+is rejected with 401/403 drops the entry so the next case logs in again.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from services.chain_execution_service import APIChainExecutor, ChainExecutionError
+from services.chains.execution_plan import CASE_VARIABLES, ChainPlan
+from services.common.jwt_utils import get_token_expiration
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 300
+# Refresh the prefix this long before a token it extracted expires
+TOKEN_REFRESH_MARGIN_SECONDS = 60
+AUTH_REJECTED_STATUSES = (401, 403)
+
+
+@dataclass(frozen=True)
+class _PrefixEntry:
+    context: Dict[str, Any]
+    step_results: List[Dict[str, Any]]
+    expires_at: float  # time.monotonic()
+
+
+# (run_id, chain_id, steps_version) -> prefix outcome in this process
+_prefix_cache: Dict[Tuple[int, int, int], _PrefixEntry] = {}
+_prefix_locks: Dict[Tuple[int, int, int], threading.Lock] = {}
+
+
+def _token_expiry(values: Iterable[Any]) -> Optional[datetime]:
+    """Earliest expiry among the JWTs (bare or 'Bearer ...') in the values."""
+    earliest = None
+    for value in values:
+        expires = get_token_expiration(value)
+        if expires and (earliest is None or expires < earliest):
+            earliest = expires
+    return earliest
+
+
+def _lifetime(context: Dict[str, Any], ttl_seconds: float) -> float:
+    """Seconds the prefix context stays usable."""
+    lifetime = float(ttl_seconds)
+    expires = _token_expiry(context.values())
+    if expires is not None:
+        token_seconds = (expires - datetime.now(timezone.utc)).total_seconds() - TOKEN_REFRESH_MARGIN_SECONDS
+        lifetime = min(lifetime, token_seconds)
+    return lifetime
+
+
+def _prune(now: float) -> None:
+    for key in [key for key, entry in _prefix_cache.items() if entry.expires_at <= now]:
+        _prefix_cache.pop(key, None)
+        _prefix_locks.pop(key, None)
+
+
+def _prefix_entry(executor: APIChainExecutor, plan: ChainPlan, key: Tuple[int, int, int],
+                  initial_context: Dict[str, Any], ttl_seconds: float,
+                  max_parallel_steps: int) -> Tuple[_PrefixEntry, bool]:
+    """The cached prefix outcome, running the prefix if needed. Returns (entry, ran_now)."""
+    entry = _prefix_cache.get(key)
+    if entry and entry.expires_at > time.monotonic():
+        return entry, False
+
+    # One thread runs the prefix, concurrent cases of the run wait for its context
+    with _prefix_locks.setdefault(key, threading.Lock()):
+        entry = _prefix_cache.get(key)
+        if entry and entry.expires_at > time.monotonic():
+            return entry, False
+
+        run_context = {name: value for name, value in initial_context.items() if name not in CASE_VARIABLES}
+        result = executor.execute_chain(plan.chain_id, execute_until_step_id=plan.shared_prefix[-1].step_id,
+                                        initial_context=run_context, plan=plan,
+                                        max_parallel_steps=max_parallel_steps)
+        now = time.monotonic()
+        lifetime = _lifetime(result['final_context'], ttl_seconds)
+        entry = _PrefixEntry(result['final_context'], result['step_results'], now + lifetime)
+        if lifetime > 0:
+            _prune(now)
+            _prefix_cache[key] = entry
+            logger.info(f"Chain {plan.chain_id} run {key[0]}: shared prefix of {len(entry.step_results)} step(s) "
+                        f"cached for {int(lifetime)}s.")
+        return entry, True
+
+
+def execute_with_shared_prefix(executor: APIChainExecutor, plan: ChainPlan, run_id: int,
+                               initial_context: Dict[str, Any],
+                               ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                               max_parallel_steps: int = 1) -> Dict[str, Any]:
+    """
+    Execute the chain for one case, reusing the run's prefix context when there
+    is one. Same result as APIChainExecutor.execute_chain; step results of a
+    prefix that ran for an earlier case are included with 'shared': True.
+    """
+    prefix = plan.shared_prefix
+    if not prefix or run_id is None:
+        return executor.execute_chain(plan.chain_id, initial_context=initial_context, plan=plan,
+                                      max_parallel_steps=max_parallel_steps)
+
+    key = (run_id, plan.chain_id, plan.steps_version)
+    entry, ran_now = _prefix_entry(executor, plan, key, initial_context, ttl_seconds, max_parallel_steps)
+    prefix_results = entry.step_results if ran_now else [dict(step, shared=True) for step in entry.step_results]
+
+    try:
+        result = executor.execute_chain(plan.chain_id, initial_context={**initial_context, **entry.context},
+                                        plan=plan, start_after_step_order=prefix[-1].step_order,
+                                        max_parallel_steps=max_parallel_steps)
+    except ChainExecutionError as e:
+        failed = e.step_results[-1] if e.step_results else {}
+        if failed.get('response_status_code') in AUTH_REJECTED_STATUSES:
+            logger.info(f"Chain {plan.chain_id} run {run_id}: step {failed.get('step_order')} was rejected "
+                        f"with {failed.get('response_status_code')}; the shared prefix will run again.")
+            _prefix_cache.pop(key, None)
+        e.step_results = prefix_results + e.step_results
+        raise
+
+    result['step_results'] = prefix_results + result['step_results']
+    return result
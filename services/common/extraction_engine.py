@@ -0,0 +1,194 @@
+# services/common/extraction_engine.py
+"""
+Parse-once evaluation of data extraction rules.
+
+`extract_data_from_response` handles one rule at a time: every `json_body`
+rule parses the whole response body again, splits its dotted path again and
+every `header` rule scans the headers linearly. An ExtractionProgram compiles
+a step's rules once (paths become JsonPath accessors) and evaluates all of
+them against a response in one pass, parsing the body at most once and
+building one case-insensitive header map.
+
+Paths keep the dotted form the rules already use ("data.items.0.id") and
+also accept JSONPath-style syntax: an optional leading "$", bracketed
+indexes and keys ("$.data['items'][0].id") and "*" / "[*]" wildcards, which
+match every key of an object or item of a list. A path with a wildcard
+yields the list of all matches instead of a single value.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from services.common.data_extraction_service import DataExtractionError
+
+_WILDCARD = object()
+_TOKEN_RE = re.compile(r"\[([^\]]*)\]|([^.\[\]]+)")
+_MISSING = object()
+
+
+class JsonPath:
+    """A dotted / JSONPath-style path compiled into segments."""
+
+    __slots__ = ('source', 'segments', 'has_wildcard')
+
+    def __init__(self, source: str):
+        self.source = source
+        path = source.strip()
+        # '$' is the root only on its own or before a segment; '$id' is a key
+        if path == '$' or path[:2] in ('$.', '$['):
+            path = path[1:]
+        segments = []
+        for bracketed, plain in _TOKEN_RE.findall(path):
+            token = plain if plain else bracketed.strip()
+            if token == '*':
+                segments.append(_WILDCARD)
+            elif bracketed and len(token) >= 2 and token[0] == token[-1] and token[0] in ('"', "'"):
+                segments.append(token[1:-1])  # quoted key, never an index
+            elif bracketed:
+                try:
+                    segments.append(int(token))
+                except ValueError:
+                    segments.append(token)
+            else:
+                segments.append(token)
+        self.segments = tuple(segments)
+        self.has_wildcard = any(segment is _WILDCARD for segment in segments)
+
+    @staticmethod
+    def _step(value: Any, segment: Any) -> Any:
+        """One level down, or _MISSING."""
+        if isinstance(value, list):
+            try:
+                return value[int(segment)]
+            except (IndexError, ValueError, TypeError):
+                return _MISSING
+        if isinstance(value, dict):
+            return value.get(segment if isinstance(segment, str) else str(segment), _MISSING)
+        return _MISSING
+
+    def resolve(self, document: Any, variable_name: str = 'N/A') -> Any:
+        """The value at the path; a list of every match for wildcard paths."""
+        if self.has_wildcard:
+            matches = [document]
+            for segment in self.segments:
+                if segment is _WILDCARD:
+                    matches = [child for value in matches
+                               for child in (value.values() if isinstance(value, dict)
+                                             else value if isinstance(value, list) else ())]
+                else:
+                    matches = [child for child in (self._step(value, segment) for value in matches)
+                               if child is not _MISSING]
+            return matches
+
+        current = document
+        for segment in self.segments:
+            found = self._step(current, segment)
+            if found is _MISSING:
+                if isinstance(current, (dict, list)):
+                    reason = f"Missing segment: '{segment}'"
+                else:
+                    reason = f"Path attempts to traverse a non-dict/list type ({type(current)}) at segment '{segment}'"
+                raise DataExtractionError(
+                    f"Rule for '{variable_name}': Key or path '{self.source}' not found in JSON response. {reason}")
+            current = found
+        return current
+
+
+class _Response:
+    """One response with its body parsed and its headers folded at most once."""
+
+    __slots__ = ('data', '_json', '_json_error', '_headers')
+
+    def __init__(self, response_data: Mapping[str, Any]):
+        self.data = response_data
+        self._json = _MISSING
+        self._json_error = None
+        self._headers = None
+
+    def json(self, variable_name: str) -> Any:
+        if self._json is _MISSING and self._json_error is None:
+            body = self.data.get('response_body', '')
+            if not body:
+                self._json_error = "Response body is empty, cannot parse as JSON."
+            else:
+                try:
+                    self._json = json.loads(body)
+                except json.JSONDecodeError as e:
+                    self._json_error = f"Response body is not valid JSON. Body: '{body[:100]}...'. Details: {e}"
+        if self._json_error is not None:
+            raise DataExtractionError(f"Rule for '{variable_name}': {self._json_error}")
+        return self._json
+
+    def header(self, name: str) -> Any:
+        if self._headers is None:
+            # HTTP headers are case-insensitive; the first spelling of a name wins
+            self._headers = {}
+            for key, value in (self.data.get('response_headers') or {}).items():
+                self._headers.setdefault(key.lower(), value)
+        return self._headers.get(name.lower())
+
+
+class _CompiledRule:
+    __slots__ = ('variable_name', 'source_type', 'source_identifier', 'path')
+
+    def __init__(self, rule: Mapping[str, Any]):
+        self.variable_name = rule.get('variable_name')
+        self.source_type = rule.get('source_type')
+        self.source_identifier = rule.get('source_identifier')
+        self.path = (JsonPath(self.source_identifier)
+                     if self.source_type == 'json_body' and self.source_identifier else None)
+
+    def evaluate(self, response: _Response) -> Any:
+        name = self.variable_name or 'N/A'
+        if self.source_type == 'status_code':
+            return response.data.get('status_code')
+        if self.source_type == 'raw_body':
+            return response.data.get('response_body', '')
+        if self.source_type == 'header':
+            if not self.source_identifier:
+                raise DataExtractionError(
+                    f"Rule for '{name}': source_identifier (header name) is required for source_type 'header'")
+            return response.header(self.source_identifier)
+        if self.source_type == 'json_body':
+            document = response.json(name)
+            return self.path.resolve(document, name) if self.path else document
+        raise DataExtractionError(f"Rule for '{name}': Unsupported source_type: {self.source_type}")
+
+
+class ExtractionProgram:
+    """A step's extraction rules compiled once; rules without a variable_name are ignored."""
+
+    __slots__ = ('rules',)
+
+    def __init__(self, rules: Optional[Iterable[Mapping[str, Any]]]):
+        self.rules = tuple(_CompiledRule(rule) for rule in (rules or [])
+                           if isinstance(rule, Mapping) and rule.get('variable_name'))
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    @property
+    def variable_names(self) -> Tuple[str, ...]:
+        return tuple(rule.variable_name for rule in self.rules)
+
+    def extract(self, response_data: Mapping[str, Any]) -> Dict[str, Any]:
+        """All variables in rule order. Raises DataExtractionError on the first rule that fails."""
+        response = _Response(response_data)
+        return {rule.variable_name: rule.evaluate(response) for rule in self.rules}
+
+    def extract_each(self, response_data: Mapping[str, Any]) -> Tuple[Dict[str, Any], Dict[str, DataExtractionError]]:
+        """(values, errors) by variable name; a failing rule does not stop the others."""
+        response = _Response(response_data)
+        values, errors = {}, {}
+        for rule in self.rules:
+            try:
+                values[rule.variable_name] = rule.evaluate(response)
+            except DataExtractionError as e:
+                errors[rule.variable_name] = e
+        return values, errors
+
+
+def extract_single(response_data: Mapping[str, Any], rule: Mapping[str, Any]) -> Any:
+    """Evaluate one rule (named or not) against a response."""
+    return _CompiledRule(rule).evaluate(_Response(response_data))
@@ -22,10 +22,12 @@ def _execute_request(
     payload_data: Union[str, bytes] = None,
     files: Dict[str, Any] = None,  # For future file/image/audio uploads
     timeout: int = 120,
-    verify: bool = True
+    verify: bool = True,
+    session: requests.Session = None
 ) -> Dict[str, Any]:
     """
     Internal function that directly executes an HTTP request with prepared data.
+    With a session, the request uses (and updates) the session's cookie jar.
     """
 
     logger.debug(f"Core executor: Making {method} request to {url}")
@@ -37,7 +39,7 @@ def _execute_request(
     print(f"CORE_EXECUTOR DEBUG: Data payload: {payload_data}")
     
     try:
-        resp = requests.request(
+        resp = (session or requests).request(
             method=method.upper(),
             url=url,
             headers=headers,
@@ -80,11 +82,13 @@ def execute_api_request(
     http_payload_as_string: str = None,
     files_to_upload: Dict[str, Any] = None,  # Ready for the future!
     timeout: int = 120,
-    verify: bool = True
+    verify: bool = True,
+    session: requests.Session = None
 ) -> Dict[str, Any]:
     """
     Prepares and executes an API request, handling complex inputs like header strings
     and string-based payloads. This is the primary interface for other services.
+    Pass a requests.Session to keep cookies the server sets across requests.
     """
     # --- Preparation Step 1: Headers and Cookies ---
     final_headers, cookies = {}, {}
@@ -149,7 +153,8 @@ def execute_api_request(
         payload_data=payload_data,
         files=files_to_upload,  # Pass files through
         timeout=timeout,
-        verify=verify
+        verify=verify,
+        session=session
     )
 
     # Add the request headers and cookies to the final result for debugging purposes
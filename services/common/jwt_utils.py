@@ -120,6 +120,22 @@ def extract_auth_token_from_header(auth_header: str) -> Optional[str]:
     
     return None
 
+def get_token_expiration(value: str) -> Optional[datetime]:
+    """
+    Expiration of the JWT in a header value or variable, bare or "Bearer <token>".
+    
+    Args:
+        value: Token or Authorization header value
+        
+    Returns:
+        Expiration datetime (UTC), or None if the value is not a JWT with an expiration claim
+    """
+    if not isinstance(value, str) or value.count('.') != 2:
+        return None
+    token = extract_auth_token_from_header(value) or value
+    exp_datetime, _, _ = get_jwt_expiration_info(token)
+    return exp_datetime
+
 def analyze_auth_headers(headers: Dict[str, str]) -> Dict[str, Any]:
     """
     Analyze headers for authentication tokens and provide expiration warnings.
@@ -30,6 +30,12 @@ def render_template_string(template_string: str, context: dict) -> str:
     template = _env.from_string(template_string)
     return template.render(context)
 
+def compile_template(template_string: str):
+    """
+    Compiles a Jinja2 template string once so it can be rendered many times.
+    """
+    return _env.from_string(template_string or "")
+
 def get_template_variables(template_string: str) -> set:
     """
     Parses a Jinja2 template string to find all declared variables.
@@ -0,0 +1,160 @@
+# services/endpoints/token_provider.py
+"""
+Per-run auth tokens for endpoints whose bearer token expires mid-run.
+
+An endpoint with a token refresh chain (Endpoint.token_refresh_chain_id)
+gets its token header filled in by this module instead of sending the
+static EndpointHeader value for the whole run. Each worker process keeps one
+token per (run, endpoint):
+
+- The configured header value is used as long as it is valid: JWTs until
+  shortly before their expiration claim, other tokens for DEFAULT_TTL_SECONDS.
+- Ahead of expiry the refresh chain runs and the token is read from its
+  token_refresh_variable. A refresh request is a one-step chain whose
+  extraction rule names the token.
+- Concurrent cases that find the token expiring wait for a single refresh
+  instead of each running the chain.
+- A token rejected with 401/403 before its expiry is refreshed once, however
+  many cases saw the rejection.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from services.chain_execution_service import APIChainExecutor, ChainExecutionError
+from services.common.jwt_utils import get_token_expiration
+
+logger = logging.getLogger(__name__)
+
+# Lifetime of tokens without an expiration claim
+DEFAULT_TTL_SECONDS = 300
+# Refresh this long before a JWT expires
+REFRESH_MARGIN_SECONDS = 60
+AUTH_REJECTED_STATUSES = (401, 403)
+DEFAULT_TOKEN_HEADER = 'Authorization'
+
+
+class TokenRefreshError(Exception):
+    """The refresh chain failed or did not produce a token."""
+    pass
+
+
+@dataclass(frozen=True)
+class _Token:
+    header_value: str
+    expires_at: float  # time.monotonic()
+
+
+# (run_id, endpoint_id) -> current token in this process
+_token_cache: Dict[Tuple[int, int], _Token] = {}
+_token_locks: Dict[Tuple[int, int], threading.Lock] = {}
+
+
+def has_token_refresh(endpoint) -> bool:
+    return bool(getattr(endpoint, 'token_refresh_chain_id', None))
+
+
+def _header_name(endpoint) -> str:
+    return endpoint.token_header or DEFAULT_TOKEN_HEADER
+
+
+def _header_value(endpoint, token: str) -> str:
+    """Authorization headers carry the token as a Bearer token unless it names its own scheme."""
+    if _header_name(endpoint).lower() == 'authorization' and ' ' not in token.strip():
+        return f"Bearer {token.strip()}"
+    return token
+
+
+def _get_header(headers: Dict[str, Any], name: str) -> Optional[str]:
+    return next((value for key, value in headers.items() if key.lower() == name.lower()), None)
+
+
+def _with_header(headers: Dict[str, Any], name: str, value: str) -> Dict[str, Any]:
+    updated = {key: v for key, v in headers.items() if key.lower() != name.lower()}
+    updated[name] = value
+    return updated
+
+
+def _lifetime(header_value: str) -> float:
+    """Seconds the token can still be sent."""
+    expires = get_token_expiration(header_value)
+    if expires is None:
+        return DEFAULT_TTL_SECONDS
+    return (expires - datetime.now(timezone.utc)).total_seconds() - REFRESH_MARGIN_SECONDS
+
+
+def _refresh(endpoint) -> str:
+    """Run the endpoint's refresh chain and return the new header value."""
+    variable = endpoint.token_refresh_variable
+    try:
+        result = APIChainExecutor().execute_chain(endpoint.token_refresh_chain_id)
+    except ChainExecutionError as e:
+        raise TokenRefreshError(f"Token refresh chain {endpoint.token_refresh_chain_id} failed: {e}") from e
+
+    token = result['final_context'].get(variable) if variable else None
+    if not token or not isinstance(token, str):
+        raise TokenRefreshError(f"Token refresh chain {endpoint.token_refresh_chain_id} "
+                                f"did not produce a token in '{variable}'.")
+    return _header_value(endpoint, token)
+
+
+def _current_token(endpoint, run_id: int, headers: Dict[str, Any], rejected: Optional[str] = None) -> str:
+    """The run's token, refreshing it when it is about to expire or was rejected."""
+    key = (run_id, endpoint.id)
+    entry = _token_cache.get(key)
+    if entry and entry.expires_at > time.monotonic() and entry.header_value != rejected:
+        return entry.header_value
+
+    # One thread refreshes, concurrent cases of the run wait for its token
+    with _token_locks.setdefault(key, threading.Lock()):
+        entry = _token_cache.get(key)
+        if entry and entry.expires_at > time.monotonic() and entry.header_value != rejected:
+            return entry.header_value
+
+        header_value = None
+        if entry is None and rejected is None:
+            # Until the first refresh, the configured header is used while it is valid
+            configured = _get_header(headers, _header_name(endpoint))
+            if configured and _lifetime(configured) > 0:
+                header_value = configured
+        if header_value is None:
+            header_value = _refresh(endpoint)
+            logger.info(f"Endpoint {endpoint.id} run {run_id}: refreshed token "
+                        f"(valid for {int(max(_lifetime(header_value), 0))}s).")
+
+        _token_cache[key] = _Token(header_value, time.monotonic() + _lifetime(header_value))
+        return header_value
+
+
+def apply_token(endpoint, run_id: int, headers: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The request headers with the run's current token in the endpoint's token
+    header. Headers are returned unchanged for endpoints without a refresh chain.
+    Raises TokenRefreshError when a needed refresh fails.
+    """
+    if not has_token_refresh(endpoint):
+        return headers
+    return _with_header(headers, _header_name(endpoint), _current_token(endpoint, run_id, headers))
+
+
+def renew_token(endpoint, run_id: int, headers: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Headers with a new token after `headers` were rejected with 401/403, or None
+    when there is no other token to try. Cases that saw the same rejected token
+    share one refresh.
+    """
+    if not has_token_refresh(endpoint):
+        return None
+    rejected = _get_header(headers, _header_name(endpoint))
+    try:
+        header_value = _current_token(endpoint, run_id, headers, rejected=rejected)
+    except TokenRefreshError as e:
+        logger.error(f"Endpoint {endpoint.id} run {run_id}: {e}")
+        return None
+    if header_value == rejected:
+        return None
+    return _with_header(headers, _header_name(endpoint), header_value)
@@ -12,6 +12,7 @@ from datetime import datetime
 
 from extensions import db
 from models import TestRun, ExecutionSession, ExecutionResult
+from services.results.dashboard_stats import invalidate_dashboard_stats
 from .engine import get_execution_engine, TestExecutionEngine
 from .controller import ExecutionController
 from .models import TaskResult, ExecutionState
@@ -111,6 +112,7 @@ class ExecutionIntegrationService:
             session = test_run.get_active_execution_session()
             if session:
                 session.complete_execution('cancelled')
+                invalidate_dashboard_stats(test_run.user_id)
                 db.session.commit()
     
     def get_execution_status(self, test_run_id: int) -> Optional[Dict[str, Any]]:
@@ -150,6 +152,7 @@ class ExecutionIntegrationService:
                         session.completed_cases = result.completed_cases
                         session.successful_cases = result.successful_cases
                         session.failed_cases = result.failed_cases
+                    invalidate_dashboard_stats(test_run.user_id)
                     
                     db.session.commit()
                 
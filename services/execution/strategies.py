@@ -8,6 +8,8 @@ import asyncio
 import time
 import uuid
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from typing import List, Dict, Any, Union, Optional, Iterator
 from datetime import datetime
 
@@ -15,6 +17,8 @@ from .models import (
     ExecutionContext, TaskResult, BatchResult, ExecutionState, RateAdjustment
 )
 from .config import AdaptiveConfig
+from services.chains.execution_plan import get_chain_plan
+from services.chains.instances import case_context, run_chain_instance
 
 logger = logging.getLogger(__name__)
 
@@ -556,7 +560,7 @@ class ChainExecutionStrategy(ExecutionStrategy):
     Characteristics:
     - Sequential step execution within each chain
     - Context passing between steps
-    - Optional parallel chain instances
+    - Optional parallel chain instances, each with its own session, cookie jar and context
     - Proper error handling and chain state management
     """
     
@@ -572,21 +576,41 @@ class ChainExecutionStrategy(ExecutionStrategy):
     
     def execute(self, test_cases: List, target) -> Iterator[BatchResult]:
         """Execute chains with proper step sequencing"""
-        config = self.controller.config if self.controller else AdaptiveConfig()
         chain = target
+        run_config = self._run_config()
+        
+        # The plan is looked up once here: instances run in worker threads without database access
+        plan = get_chain_plan(chain.id)
+        if plan is None:
+            raise ValueError(f"APIChain with ID {chain.id} not found")
         
         # Determine if parallel chain instances are allowed
-        allow_parallel = getattr(chain, 'allow_parallel_instances', False)
-        max_parallel = getattr(chain, 'max_parallel_instances', 1)
+        allow_parallel = getattr(chain, 'allow_parallel_instances', True)
+        max_parallel = int(run_config.get('chain_instance_concurrency')
+                           or getattr(chain, 'max_parallel_instances', 1) or 1)
         
         if allow_parallel and max_parallel > 1:
             # Execute multiple chain instances in parallel
-            yield from self._execute_parallel_chains(test_cases, chain, max_parallel)
+            yield from self._execute_parallel_chains(test_cases, chain, plan, max_parallel, run_config)
         else:
             # Execute chains sequentially
-            yield from self._execute_sequential_chains(test_cases, chain)
+            yield from self._execute_sequential_chains(test_cases, chain, plan, run_config)
+    
+    def _run_config(self) -> Dict[str, Any]:
+        """Execution config of the controller's test run"""
+        test_run = getattr(self.controller, 'test_run', None)
+        if test_run is not None and hasattr(test_run, 'get_execution_config'):
+            return test_run.get_execution_config()
+        return {}
+    
+    def _chain_delay(self, chain) -> float:
+        """Delay between chain instances (or batches of parallel instances)"""
+        chain_delay = getattr(chain, 'step_delay', 0.5)
+        if self.controller:
+            chain_delay = max(chain_delay, self.controller.config.current_delay)
+        return chain_delay
     
-    def _execute_sequential_chains(self, test_cases: List, chain) -> Iterator[BatchResult]:
+    def _execute_sequential_chains(self, test_cases: List, chain, plan, run_config: Dict[str, Any]) -> Iterator[BatchResult]:
         """Execute chain instances one at a time"""
         for batch_index, test_case in enumerate(test_cases):
             if self.is_cancelled:
@@ -598,7 +622,7 @@ class ChainExecutionStrategy(ExecutionStrategy):
             logger.info(f"Executing sequential chain {batch_index + 1}/{len(test_cases)}")
             
             # Execute single chain instance
-            chain_result = self._execute_single_chain(test_case, chain, batch_id, 0)
+            chain_result = self._execute_single_chain(test_case, plan, batch_id, 0, run_config)
             batch_result.results.append(chain_result)
             batch_result.completed_at = datetime.utcnow()
             batch_result.calculate_metrics()
@@ -609,114 +633,104 @@ class ChainExecutionStrategy(ExecutionStrategy):
             
             # Apply delay between chain instances
             if batch_index < len(test_cases) - 1 and not self.is_cancelled:
-                chain_delay = getattr(chain, 'step_delay', 0.5)
-                if self.controller:
-                    chain_delay = max(chain_delay, self.controller.config.current_delay)
-                self._apply_delay(chain_delay)
+                self._apply_delay(self._chain_delay(chain))
             
             yield batch_result
     
-    def _execute_parallel_chains(self, test_cases: List, chain, max_parallel: int) -> Iterator[BatchResult]:
-        """Execute multiple chain instances in parallel"""
-        # Create batches for parallel execution
-        batch_size = min(max_parallel, len(test_cases))
-        batches = [test_cases[i:i + batch_size] for i in range(0, len(test_cases), batch_size)]
+    def _execute_parallel_chains(self, test_cases: List, chain, plan, max_parallel: int,
+                                 run_config: Dict[str, Any]) -> Iterator[BatchResult]:
+        """
+        Execute chain instances concurrently, up to max_parallel at a time
         
-        for batch_index, batch in enumerate(batches):
-            if self.is_cancelled:
-                break
-            
+        Each instance runs in a worker thread with its own session, cookie jar
+        and chain context (see services/chains/instances.py). A new instance
+        starts as soon as a running one finishes. Results are reported to the
+        controller from this thread as they arrive and yielded in batches of
+        max_parallel, so pause and cancel take effect between batches.
+        """
+        max_parallel_steps = run_config.get('chain_step_concurrency') or 1
+        overrides = run_config.get('header_overrides') or {}
+        queue = deque(enumerate(test_cases))
+        running = {}
+        batch_index = 0
+        
+        def new_batch():
             batch_id = f"chain_parallel_{batch_index}_{int(time.time())}"
-            batch_result = self._create_batch_result(batch_id, batch)
-            
-            logger.info(f"Executing parallel chain batch {batch_index + 1}/{len(batches)} "
-                       f"with {len(batch)} instances")
-            
-            # Execute chain instances in parallel (simulated)
-            batch_results = []
-            for i, test_case in enumerate(batch):
-                if self.is_cancelled:
+            size = min(max_parallel, len(queue) + len(running))
+            return self._create_batch_result(batch_id, test_cases[:size])
+        
+        logger.info(f"Executing {len(test_cases)} chain instances with up to {max_parallel} in parallel")
+        batch_result = new_batch()
+        
+        with ThreadPoolExecutor(max_workers=max_parallel) as pool:
+            while queue or running:
+                while queue and len(running) < max_parallel and not self.is_cancelled:
+                    sequence_num, test_case = queue.popleft()
+                    context = self._create_execution_context(test_case, sequence_num)
+                    initial_context = case_context(getattr(test_case, 'prompt', ''), context.test_case_id,
+                                                   context.iteration_num, overrides)
+                    future = pool.submit(run_chain_instance, plan, initial_context, max_parallel_steps)
+                    running[future] = (context, datetime.utcnow())
+                if not running:
                     break
                 
-                chain_result = self._execute_single_chain(test_case, chain, batch_id, i)
-                batch_results.append(chain_result)
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    context, started_at = running.pop(future)
+                    context.batch_id = batch_result.batch_id
+                    chain_result = self._chain_task_result(context, future.result(), started_at)
+                    batch_result.results.append(chain_result)
+                    
+                    # Report individual results
+                    if self.controller:
+                        self.controller.record_task_result(chain_result)
                 
-                # Report individual results
-                if self.controller:
-                    self.controller.record_task_result(chain_result)
-            
-            batch_result.results.extend(batch_results)
-            batch_result.completed_at = datetime.utcnow()
-            batch_result.calculate_metrics()
-            
-            # Apply delay between parallel batches
-            if batch_index < len(batches) - 1 and not self.is_cancelled:
-                chain_delay = getattr(chain, 'step_delay', 0.5)
-                if self.controller:
-                    chain_delay = max(chain_delay, self.controller.config.current_delay)
-                self._apply_delay(chain_delay)
-            
-            yield batch_result
-    
-    def _execute_single_chain(self, test_case, chain, batch_id: str, sequence_num: int) -> TaskResult:
+                exhausted = not running and (not queue or self.is_cancelled)
+                if len(batch_result.results) >= max_parallel or exhausted:
+                    batch_result.batch_size = len(batch_result.results)
+                    batch_result.completed_at = datetime.utcnow()
+                    batch_result.calculate_metrics()
+                    yield batch_result
+                    
+                    if exhausted:
+                        break
+                    # Apply delay between parallel batches (running instances keep going)
+                    if queue and not self.is_cancelled:
+                        self._apply_delay(self._chain_delay(chain))
+                    batch_index += 1
+                    batch_result = new_batch()
+    
+    def _execute_single_chain(self, test_case, plan, batch_id: str, sequence_num: int,
+                              run_config: Dict[str, Any]) -> TaskResult:
         """Execute a single chain instance with all steps"""
         context = self._create_execution_context(test_case, sequence_num)
         context.batch_id = batch_id
         
         start_time = datetime.utcnow()
+        initial_context = case_context(getattr(test_case, 'prompt', ''), context.test_case_id,
+                                       context.iteration_num, run_config.get('header_overrides'))
+        outcome = run_chain_instance(plan, initial_context, run_config.get('chain_step_concurrency') or 1)
+        return self._chain_task_result(context, outcome, start_time)
+    
+    def _chain_task_result(self, context: ExecutionContext, outcome: Dict[str, Any],
+                           start_time: datetime) -> TaskResult:
+        """TaskResult for a finished chain instance (see run_chain_instance)"""
+        if outcome['success']:
+            logger.debug(f"Chain instance for test case {context.test_case_id} completed "
+                         f"{len(outcome['step_results'])} steps")
+        else:
+            logger.error(f"Chain execution failed for test case {context.test_case_id}: {outcome['error_message']}")
         
-        # Simulate chain execution with multiple steps
-        # In actual implementation, this would execute each step in sequence
-        # with proper context passing between steps
-        
-        try:
-            # Simulate step execution
-            steps = getattr(chain, 'steps', [])
-            total_response_time = 0.0
-            chain_context = {}  # Context passed between steps
-            
-            for step_index, step in enumerate(steps):
-                if self.is_cancelled:
-                    break
-                
-                # Apply step delay
-                step_delay = getattr(chain, 'step_delay', 0.3)
-                if step_index > 0:
-                    self._apply_delay(step_delay)
-                
-                # Simulate step execution
-                step_response_time = 0.8  # Simulated step response time
-                total_response_time += step_response_time
-                
-                # Update chain context (simulated)
-                chain_context[f'step_{step_index}_result'] = f"Step {step_index} result"
-            
-            # Create successful result
-            return TaskResult(
-                execution_id=context.execution_id,
-                test_case_id=context.test_case_id,
-                sequence_num=context.sequence_num,
-                iteration_num=context.iteration_num,
-                status_code=200,
-                response_body=f"Chain execution completed with {len(steps)} steps",
-                response_time=total_response_time,
-                success=True,
-                started_at=start_time,
-                completed_at=datetime.utcnow()
-            )
-            
-        except Exception as e:
-            logger.error(f"Chain execution failed: {e}")
-            return TaskResult(
-                execution_id=context.execution_id,
-                test_case_id=context.test_case_id,
-                sequence_num=context.sequence_num,
-                iteration_num=context.iteration_num,
-                status_code=500,
-                response_body=f"Chain execution error: {str(e)}",
-                response_time=0.0,
-                success=False,
-                error_message=str(e),
-                started_at=start_time,
-                completed_at=datetime.utcnow()
-            )
\ No newline at end of file
+        return TaskResult(
+            execution_id=context.execution_id,
+            test_case_id=context.test_case_id,
+            sequence_num=context.sequence_num,
+            iteration_num=context.iteration_num,
+            status_code=outcome['status_code'],
+            response_body=outcome['response_body'],
+            response_time=outcome['response_time'],
+            success=outcome['success'],
+            error_message=outcome['error_message'],
+            started_at=start_time,
+            completed_at=datetime.utcnow()
+        )
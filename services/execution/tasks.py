@@ -15,7 +15,8 @@ from typing import Dict, Any, Optional
 import celery
 from celery import Task
 
-from ..chain_execution_service import ChainExecutionService
+from ..chains.execution_plan import get_chain_plan
+from ..chains.instances import case_context, run_chain_instance
 from ..http_request_service import HTTPRequestService  
 from .models import ExecutionContext, TaskResult
 
@@ -203,7 +204,7 @@ def execute_chain_instance(self, context_dict: Dict[str, Any], chain_dict: Dict[
     
     Args:
         context_dict: ExecutionContext as dictionary
-        chain_dict: Chain configuration and steps
+        chain_dict: Chain data (its id)
         test_case_dict: Test case data
         
     Returns:
@@ -222,39 +223,26 @@ def execute_chain_instance(self, context_dict: Dict[str, Any], chain_dict: Dict[
             logger.debug(f"Applying delay of {delay}s before chain execution")
             time.sleep(delay)
         
-        # Execute chain using existing chain execution service
-        chain_service = ChainExecutionService()
-        
-        # Convert dictionaries back to objects (simplified)
-        # In actual implementation, these would be proper model objects
-        class MockChain:
-            def __init__(self, chain_dict):
-                self.id = chain_dict.get('id', 0)
-                self.steps = chain_dict.get('steps', [])
-                self.step_delay = chain_dict.get('step_delay', 0.3)
-        
-        class MockTestCase:
-            def __init__(self, test_case_dict):
-                self.id = test_case_dict.get('id', 0)
-                self.payload = test_case_dict.get('payload', {})
-                self.headers = test_case_dict.get('headers', {})
-        
-        chain = MockChain(chain_dict)
-        test_case = MockTestCase(test_case_dict)
-        
-        # Execute the chain
-        chain_result = chain_service.execute_chain(
-            chain=chain,
-            test_case=test_case,
-            context=context_dict
+        # Execute the chain with its own session, cookie jar and context
+        plan = get_chain_plan(chain_dict.get('id', 0))
+        if plan is None:
+            raise ValueError(f"APIChain with ID {chain_dict.get('id')} not found")
+        
+        request_config = context_dict.get('request_config') or {}
+        initial_context = case_context(
+            test_case_dict.get('prompt', ''),
+            test_case_id,
+            context_dict.get('iteration_num', 1),
+            request_config.get('header_overrides')
         )
+        chain_result = run_chain_instance(plan, initial_context, request_config.get('chain_step_concurrency') or 1)
         
         # Extract chain execution results
-        success = chain_result.get('success', False)
-        status_code = chain_result.get('final_status_code', 200 if success else 500)
-        response_body = chain_result.get('final_response', '')
-        total_response_time = chain_result.get('total_execution_time', 0.0)
-        error_message = chain_result.get('error_message')
+        success = chain_result['success']
+        status_code = chain_result['status_code']
+        response_body = chain_result['response_body']
+        total_response_time = chain_result['response_time']
+        error_message = chain_result['error_message']
         
         completed_at = datetime.utcnow()
         
@@ -274,7 +262,7 @@ def execute_chain_instance(self, context_dict: Dict[str, Any], chain_dict: Dict[
         )
         
         logger.info(f"Chain execution completed for test case {test_case_id}: "
-                   f"success={success}, time={total_response_time:.2f}s, steps={len(chain.steps)}")
+                   f"success={success}, time={total_response_time:.2f}s, steps={len(chain_result['step_results'])}")
         
         return {
             'execution_id': result.execution_id,
@@ -0,0 +1,134 @@
+"""
+Vectorised prompt permutations for Best-of-N.
+
+The prompt is turned into one row of code points and tiled into an
+(n, len(prompt)) matrix; each selected augmentation is then applied to all
+rows at once with a numpy Generator, in the same order and with the same
+per-sample semantics as the original character loops:
+
+- rearrange: shuffle the middle letters of one word longer than 3 characters
+- capitalization: toggle the case of each letter with probability 0.5
+- substitute: replace one letter with a random ASCII letter
+- typo: replace one letter with a QWERTY neighbour (keeping its case)
+
+Rows are deduplicated by hash, so a sweep never sends the same permutation
+twice; short prompts with fewer distinct permutations than requested yield
+fewer samples. The same seed always produces the same permutations.
+"""
+
+import re
+import string
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# How many extra generation rounds to spend on replacing duplicates
+MAX_DEDUPE_ROUNDS = 8
+
+KEYBOARD_ADJACENT = {
+    'q': 'wa', 'w': 'qeas', 'e': 'wrsd', 'r': 'etdf', 't': 'ryfg', 'y': 'tugh',
+    'u': 'yihj', 'i': 'uojk', 'o': 'ipkl', 'p': 'ol', 'a': 'qwsz', 's': 'awedzx',
+    'd': 'serfxc', 'f': 'drtgcv', 'g': 'ftyhvb', 'h': 'gyujbn', 'j': 'huiknm',
+    'k': 'jiolm', 'l': 'kop', 'z': 'asx', 'x': 'zsdc', 'c': 'xdfv', 'v': 'cfgb',
+    'b': 'vghn', 'n': 'bhjm', 'm': 'njk',
+}
+
+_ASCII_LETTERS = np.array([ord(ch) for ch in string.ascii_letters], dtype=np.uint32)
+# Row k: neighbours of chr(ord('a') + k), padded; _NEIGHBOUR_COUNTS[k] of them are valid
+_NEIGHBOUR_COUNTS = np.array([len(KEYBOARD_ADJACENT[ch]) for ch in string.ascii_lowercase])
+_NEIGHBOURS = np.zeros((26, _NEIGHBOUR_COUNTS.max()), dtype=np.uint32)
+for _k, _ch in enumerate(string.ascii_lowercase):
+    _NEIGHBOURS[_k, :len(KEYBOARD_ADJACENT[_ch])] = [ord(c) for c in KEYBOARD_ADJACENT[_ch]]
+
+
+def _char_tables(codes: np.ndarray):
+    """Sorted distinct code points with their isalpha flags and case-swapped code points."""
+    distinct = np.unique(codes)
+    chars = [chr(code) for code in distinct.tolist()]
+    is_alpha = np.array([ch.isalpha() for ch in chars], dtype=bool)
+    # Characters whose case change is not a single character (e.g. 'ß') keep their case
+    swapped = np.array([ord(s) if len(s := ch.swapcase()) == 1 else ord(ch) for ch in chars], dtype=np.uint32)
+    return distinct, is_alpha, swapped
+
+
+def _pick_letter(rng: np.random.Generator, alpha: np.ndarray):
+    """(rows, columns) of one uniformly chosen letter per row, for rows that have one."""
+    counts = alpha.sum(axis=1)
+    rows = np.flatnonzero(counts)
+    if rows.size == 0:
+        return rows, rows
+    nth = (rng.random(rows.size) * counts[rows]).astype(np.int64)
+    columns = (np.cumsum(alpha[rows], axis=1, dtype=np.int32) > nth[:, None]).argmax(axis=1)
+    return rows, columns
+
+
+def _rearrange(rng: np.random.Generator, matrix: np.ndarray, prompt: str) -> None:
+    words = [(m.start(), m.end()) for m in re.finditer(r'\S+', prompt) if m.end() - m.start() > 3]
+    if not words:
+        return
+    choice = rng.integers(len(words), size=matrix.shape[0])
+    for w, (start, end) in enumerate(words):
+        rows = np.flatnonzero(choice == w)
+        if rows.size == 0:
+            continue
+        # Independent shuffle of the word's middle for each row choosing it
+        order = rng.random((rows.size, end - start - 2)).argsort(axis=1)
+        middle = matrix[rows, start + 1:end - 1]
+        matrix[rows, start + 1:end - 1] = np.take_along_axis(middle, order, axis=1)
+
+
+def _generate(rng: np.random.Generator, prompt: str, codes: np.ndarray, options: Dict[str, bool],
+              n: int) -> List[str]:
+    matrix = np.tile(codes, (n, 1))
+    distinct, is_alpha, swapped = _char_tables(codes)
+
+    if options.get("rearrange"):
+        _rearrange(rng, matrix, prompt)
+
+    # Rearranging only moves characters, so every code point is still one of the prompt's
+    positions = np.searchsorted(distinct, matrix)
+    alpha = is_alpha[positions]
+
+    if options.get("capitalization"):
+        toggle = alpha & (rng.random(matrix.shape, dtype=np.float32) < 0.5)
+        matrix[toggle] = swapped[positions[toggle]]
+
+    # Both substitutions replace a letter with a letter, so the letter mask stays valid
+    if options.get("substitute"):
+        rows, columns = _pick_letter(rng, alpha)
+        matrix[rows, columns] = _ASCII_LETTERS[rng.integers(_ASCII_LETTERS.size, size=rows.size)]
+
+    if options.get("typo"):
+        rows, columns = _pick_letter(rng, alpha)
+        current = matrix[rows, columns]
+        upper = (current >= ord('A')) & (current <= ord('Z'))
+        lower = np.where(upper, current + 32, current)
+        on_keyboard = (lower >= ord('a')) & (lower <= ord('z'))
+        key = np.where(on_keyboard, lower - ord('a'), 0).astype(np.int64)
+        neighbour = _NEIGHBOURS[key, (rng.random(rows.size) * _NEIGHBOUR_COUNTS[key]).astype(np.int64)]
+        neighbour = np.where(upper, neighbour - 32, neighbour)
+        random_letter = _ASCII_LETTERS[rng.integers(_ASCII_LETTERS.size, size=rows.size)]
+        matrix[rows, columns] = np.where(on_keyboard, neighbour, random_letter)
+
+    # Each row of UTF-32 code points is one fixed-width numpy string
+    return np.ascontiguousarray(matrix, dtype='<u4').view(f'<U{codes.size}').ravel().tolist()
+
+
+def generate_permutations(prompt: str, options: Dict[str, bool], n: int, seed: Optional[int] = None) -> List[str]:
+    """Up to n distinct permutations of the prompt using the selected options, reproducible by seed."""
+    if n < 1:
+        return []
+    if not prompt:
+        return [prompt]
+    rng = np.random.default_rng(seed)
+    codes = np.array([ord(ch) for ch in prompt], dtype=np.uint32)
+
+    unique = dict.fromkeys(_generate(rng, prompt, codes, options, n))
+    rounds = 0
+    while len(unique) < n and rounds < MAX_DEDUPE_ROUNDS:
+        before = len(unique)
+        unique.update(dict.fromkeys(_generate(rng, prompt, codes, options, 2 * (n - len(unique)))))
+        rounds += 1
+        if len(unique) == before:
+            break  # The prompt has no more distinct permutations to find
+    return list(unique)[:n]
@@ -0,0 +1,292 @@
+# services/results/archive.py
+"""
+Parquet archival of completed execution sessions.
+
+Results of sessions that finished more than N days ago are written to a
+hive-partitioned Parquet dataset on local disk:
+
+    <archive root>/test_run_id=<run>/session_id=<session>/results.parquet
+
+and then deleted from `execution_results`. The ExecutionSession row stays in
+SQL with its counters plus an `archive_rollup`, so run lists and reports keep
+working without touching the files. Archived rows are read back through
+memory-mapped Arrow tables when a session is viewed. The session also keeps
+the id range of its archived results, so a single result is read from the
+one file that holds it.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from flask import current_app
+from sqlalchemy import case, func
+from sqlalchemy.orm import lazyload
+
+from extensions import db
+from models.model_ExecutionSession import ExecutionSession, ExecutionResult
+from services.results.response_store import load_response_bodies, prune_orphaned_response_bodies
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FILE_NAME = 'results.parquet'
+COMPLETED_STATES = ('completed', 'failed', 'cancelled')
+
+# Partition keys (test_run_id, session_id) live in the directory names only
+RESULT_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('test_case_id', pa.int64()),
+    ('sequence_number', pa.int32()),
+    ('iteration_number', pa.int32()),
+    ('batch_id', pa.string()),
+    ('success', pa.bool_()),
+    ('status_code', pa.int32()),
+    ('response_time_ms', pa.int32()),
+    ('error_message', pa.string()),
+    ('processed_prompt', pa.string()),
+    ('request_data', pa.string()),   # JSON text
+    ('response_data', pa.string()),
+    ('started_at', pa.timestamp('us')),
+    ('executed_at', pa.timestamp('us')),
+])
+
+
+def get_archive_root() -> str:
+    return current_app.config['ARCHIVE_FOLDER']
+
+
+def session_archive_path(session: ExecutionSession, root: Optional[str] = None) -> str:
+    return os.path.join(
+        root or get_archive_root(),
+        f"test_run_id={session.test_run_id}",
+        f"session_id={session.id}",
+        ARCHIVE_FILE_NAME
+    )
+
+
+def _as_text(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def _batch_to_table(results: List[ExecutionResult], manifest: Optional[Dict]) -> pa.Table:
+    bodies = load_response_bodies(r.response_body_hash for r in results)
+    columns = {name: [] for name in RESULT_SCHEMA.names}
+    for r in results:
+        columns['id'].append(r.id)
+        columns['test_case_id'].append(r.test_case_id)
+        columns['sequence_number'].append(r.sequence_number)
+        columns['iteration_number'].append(r.iteration_number)
+        columns['batch_id'].append(r.batch_id)
+        columns['success'].append(r.success)
+        columns['status_code'].append(r.status_code)
+        columns['response_time_ms'].append(r.response_time_ms)
+        columns['error_message'].append(r.error_message)
+        columns['processed_prompt'].append(r.processed_prompt)
+        columns['request_data'].append(_as_text(r.get_request_data(manifest)))
+        columns['response_data'].append(_as_text(
+            bodies.get(r.response_body_hash) if r.response_body_hash else r.response_data
+        ))
+        columns['started_at'].append(r.started_at)
+        columns['executed_at'].append(r.executed_at)
+    return pa.Table.from_pydict(columns, schema=RESULT_SCHEMA)
+
+
+def _build_rollup(session_id: int) -> Dict[str, Any]:
+    """Aggregates kept in SQL once the individual rows are gone."""
+    status_rows = db.session.query(
+        ExecutionResult.status_code, func.count(ExecutionResult.id)
+    ).filter(ExecutionResult.session_id == session_id).group_by(ExecutionResult.status_code).all()
+
+    totals = db.session.query(
+        func.count(ExecutionResult.id),
+        func.sum(case((ExecutionResult.success.is_(True), 1), else_=0)),
+        func.avg(ExecutionResult.response_time_ms)
+    ).filter(ExecutionResult.session_id == session_id).one()
+
+    return {
+        'result_count': totals[0] or 0,
+        'successful': int(totals[1] or 0),
+        'failed': (totals[0] or 0) - int(totals[1] or 0),
+        'avg_response_time_ms': int(totals[2]) if totals[2] is not None else None,
+        'status_codes': {str(code) if code is not None else 'none': count for code, count in status_rows}
+    }
+
+
+def archive_session(session: ExecutionSession, root: Optional[str] = None, batch_size: int = 1000) -> int:
+    """
+    Write one session's results to Parquet and remove them from SQL.
+
+    Returns the number of archived rows. The caller commits.
+    """
+    path = session_archive_path(session, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+
+    manifest = session.request_manifest
+    query = (ExecutionResult.query
+             .filter(ExecutionResult.session_id == session.id)
+             .options(lazyload('*'))
+             .order_by(ExecutionResult.sequence_number, ExecutionResult.id)
+             .yield_per(batch_size))
+
+    archived = 0
+    min_id = max_id = None
+    batch: List[ExecutionResult] = []
+    with pq.ParquetWriter(tmp_path, RESULT_SCHEMA, compression='zstd') as writer:
+        for result in query:
+            min_id = result.id if min_id is None else min(min_id, result.id)
+            max_id = result.id if max_id is None else max(max_id, result.id)
+            batch.append(result)
+            if len(batch) >= batch_size:
+                writer.write_table(_batch_to_table(batch, manifest))
+                archived += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(_batch_to_table(batch, manifest))
+            archived += len(batch)
+
+    # Only replace the file once it is complete
+    os.replace(tmp_path, path)
+
+    session.archive_rollup = _build_rollup(session.id)
+    ExecutionResult.query.filter(
+        ExecutionResult.session_id == session.id
+    ).delete(synchronize_session=False)
+    session.archive_path = path
+    session.archived_min_result_id = min_id
+    session.archived_max_result_id = max_id
+    session.archived_at = datetime.utcnow()
+
+    logger.info(f"ResultArchive: archived {archived} results of session {session.id} to {path}")
+    return archived
+
+
+def archive_completed_sessions(older_than_days: int, root: Optional[str] = None,
+                               limit: Optional[int] = None) -> List[int]:
+    """Archive every completed, not yet archived session that finished before the cutoff."""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    query = (ExecutionSession.query
+             .filter(ExecutionSession.state.in_(COMPLETED_STATES),
+                     ExecutionSession.completed_at < cutoff,
+                     ExecutionSession.archived_at.is_(None))
+             .order_by(ExecutionSession.completed_at))
+    if limit:
+        query = query.limit(limit)
+
+    archived_ids = []
+    for session in query.all():
+        try:
+            archive_session(session, root)
+            db.session.commit()
+            archived_ids.append(session.id)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"ResultArchive: failed to archive session {session.id}: {e}", exc_info=True)
+
+    if archived_ids:
+        prune_orphaned_response_bodies()
+        db.session.commit()
+    return archived_ids
+
+
+def index_archived_sessions() -> int:
+    """Record the result id range of sessions archived before ranges were kept. Returns sessions indexed."""
+    sessions = ExecutionSession.query.filter(
+        ExecutionSession.archived_at.isnot(None),
+        ExecutionSession.archived_min_result_id.is_(None)
+    ).all()
+    indexed = 0
+    for session in sessions:
+        if not session.archive_path or not os.path.exists(session.archive_path):
+            continue
+        ids = pq.read_table(session.archive_path, columns=['id'], memory_map=True).column('id')
+        if len(ids) == 0:
+            continue
+        bounds = pc.min_max(ids)
+        session.archived_min_result_id = bounds['min'].as_py()
+        session.archived_max_result_id = bounds['max'].as_py()
+        indexed += 1
+    return indexed
+
+
+def _rows_from_table(table: pa.Table, session_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    rows = table.to_pylist()
+    for row in rows:
+        if session_id is not None:
+            row['session_id'] = session_id
+        if row.get('request_data'):
+            try:
+                row['request_data'] = json.loads(row['request_data'])
+            except ValueError:
+                pass
+    return rows
+
+
+def load_archived_results(session: ExecutionSession) -> List[Dict[str, Any]]:
+    """All archived result rows for a session, ordered by sequence number."""
+    if not session.archive_path or not os.path.exists(session.archive_path):
+        logger.warning(f"ResultArchive: archive for session {session.id} not found at {session.archive_path}")
+        return []
+    table = pq.read_table(session.archive_path, memory_map=True)
+    return _rows_from_table(table, session.id)
+
+
+def find_archived_result(result_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Look up a single archived result by its original ExecutionResult id.
+
+    Only the files of archived sessions whose result id range covers the id
+    are read (usually one; ranges of concurrent sessions can overlap).
+    """
+    candidates = (ExecutionSession.query
+                  .filter(ExecutionSession.archived_at.isnot(None),
+                          ExecutionSession.archived_min_result_id <= result_id,
+                          ExecutionSession.archived_max_result_id >= result_id)
+                  .order_by(ExecutionSession.id)
+                  .all())
+    for session in candidates:
+        if not session.archive_path or not os.path.exists(session.archive_path):
+            continue
+        table = pq.read_table(session.archive_path, filters=[('id', '=', result_id)], memory_map=True)
+        if table.num_rows:
+            return _rows_from_table(table, session.id)[0]
+    return None
+
+
+def archived_result_to_dict(row: Dict[str, Any], include_detailed_data: bool = False) -> Dict[str, Any]:
+    """Same shape as ExecutionResult.to_dict() for an archived row."""
+    response_data = row.get('response_data')
+    response_time_ms = row.get('response_time_ms')
+    started_at, executed_at = row.get('started_at'), row.get('executed_at')
+    data = {
+        'id': row['id'],
+        'session_id': row.get('session_id'),
+        'test_case_id': row.get('test_case_id'),
+        'sequence_number': row.get('sequence_number'),
+        'iteration_number': row.get('iteration_number'),
+        'batch_id': row.get('batch_id'),
+        'success': row.get('success'),
+        'status_code': row.get('status_code'),
+        'response_time_ms': response_time_ms,
+        'response_time_seconds': response_time_ms / 1000.0 if response_time_ms else 0.0,
+        'error_message': row.get('error_message'),
+        'response_preview': response_data[:200] if response_data else None,
+        'executed_at': executed_at.isoformat() if executed_at else None,
+        'duration_seconds': (executed_at - started_at).total_seconds() if started_at and executed_at else 0.0,
+        'archived': True
+    }
+    if include_detailed_data:
+        data.update({
+            'request_data': row.get('request_data'),
+            'processed_prompt': row.get('processed_prompt'),
+            'response_data': response_data,
+            'started_at': started_at.isoformat() if started_at else None
+        })
+    return data
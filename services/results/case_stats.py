@@ -0,0 +1,127 @@
+# services/results/case_stats.py
+"""
+Per-(test case, endpoint) pass/fail history.
+
+Each endpoint execution bumps one row of `test_case_endpoint_stats` with an
+atomic upsert, so concurrent workers never lose counts. The orchestrator
+reads the smoothed failure probabilities to dispatch likely failures first.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from models.model_ExecutionSession import ExecutionSession, ExecutionResult
+from models.model_TestCaseEndpointStats import TestCaseEndpointStats
+from models.model_TestRun import TestRun
+
+logger = logging.getLogger(__name__)
+
+# Failure probability assumed for a case with no history on the endpoint
+PRIOR_FAILURE_PROBABILITY = 0.5
+
+
+def record_case_outcome(test_case_id: int, endpoint_id: int, success: bool,
+                        executed_at: Optional[datetime] = None) -> None:
+    """Count one execution (and failure) for the pair. The caller commits."""
+    if not test_case_id or not endpoint_id:
+        return
+    executed_at = executed_at or datetime.utcnow()
+    failed = 0 if success else 1
+    table = TestCaseEndpointStats.__table__
+    values = {
+        'test_case_id': test_case_id,
+        'endpoint_id': endpoint_id,
+        'executions': 1,
+        'failures': failed,
+        'last_success': bool(success),
+        'last_executed_at': executed_at,
+        'updated_at': datetime.utcnow()
+    }
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        stmt = (postgresql.insert(table) if dialect == 'postgresql' else sqlite.insert(table)).values(**values)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['test_case_id', 'endpoint_id'],
+            set_={
+                'executions': table.c.executions + 1,
+                'failures': table.c.failures + failed,
+                'last_success': stmt.excluded.last_success,
+                'last_executed_at': stmt.excluded.last_executed_at,
+                'updated_at': stmt.excluded.updated_at
+            }
+        ))
+        return
+
+    # Other backends: read-modify-write
+    row = db.session.get(TestCaseEndpointStats, (test_case_id, endpoint_id))
+    if row is None:
+        db.session.add(TestCaseEndpointStats(**values))
+    else:
+        row.executions += 1
+        row.failures += failed
+        row.last_success = bool(success)
+        row.last_executed_at = executed_at
+
+
+def failure_probabilities(case_ids: Iterable[int], endpoint_id: int) -> Dict[int, float]:
+    """Smoothed failure probability for each case that has history on the endpoint."""
+    case_ids = list({cid for cid in case_ids if cid})
+    if not case_ids or not endpoint_id:
+        return {}
+    probabilities = {}
+    # Chunk the IN list to stay under driver parameter limits
+    for start in range(0, len(case_ids), 5000):
+        chunk = case_ids[start:start + 5000]
+        rows = db.session.execute(
+            select(TestCaseEndpointStats.test_case_id, TestCaseEndpointStats.failures,
+                   TestCaseEndpointStats.executions)
+            .where(TestCaseEndpointStats.endpoint_id == endpoint_id,
+                   TestCaseEndpointStats.test_case_id.in_(chunk))
+        ).all()
+        probabilities.update({cid: (failures + 1) / (executions + 2) for cid, failures, executions in rows})
+    return probabilities
+
+
+def order_by_failure_probability(base_cases: List[Tuple[int, str]], endpoint_id: int) -> List[Tuple[int, str]]:
+    """Most likely failures first; ties keep suite order (the sort is stable)."""
+    probabilities = failure_probabilities((case_id for case_id, _ in base_cases), endpoint_id)
+    return sorted(base_cases,
+                  key=lambda item: -probabilities.get(item[0], PRIOR_FAILURE_PROBABILITY))
+
+
+def rebuild_case_stats() -> int:
+    """
+    Recompute every row from the execution results still in SQL (archived
+    sessions are not counted; last_success is left empty). Results copied by
+    delta runs are skipped, as record_case_outcome never counts them. Returns
+    rows written.
+    """
+    TestCaseEndpointStats.query.delete(synchronize_session=False)
+    source = (
+        select(
+            ExecutionResult.test_case_id,
+            TestRun.endpoint_id,
+            func.count(ExecutionResult.id),
+            func.sum(case((ExecutionResult.success.is_(False), 1), else_=0)),
+            func.max(ExecutionResult.executed_at),
+            func.current_timestamp()
+        )
+        .join(ExecutionSession, ExecutionSession.id == ExecutionResult.session_id)
+        .join(TestRun, TestRun.id == ExecutionSession.test_run_id)
+        .where(ExecutionResult.test_case_id.isnot(None), TestRun.endpoint_id.isnot(None),
+               ExecutionResult.reused_from_id.is_(None))
+        .group_by(ExecutionResult.test_case_id, TestRun.endpoint_id)
+    )
+    result = db.session.execute(
+        insert(TestCaseEndpointStats).from_select(
+            ['test_case_id', 'endpoint_id', 'executions', 'failures', 'last_executed_at', 'updated_at'],
+            source
+        )
+    )
+    return result.rowcount or 0
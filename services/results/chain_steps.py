@@ -0,0 +1,156 @@
+# services/results/chain_steps.py
+"""
+Persisted chain step outcomes and the grouped queries over them.
+
+The chain execution task writes one ChainStepResult row per executed step
+next to the chain's ExecutionResult. Step success rates, latencies and
+waterfalls then come from GROUP BY queries on indexed columns instead
+of loading every chain result and walking its embedded `step_results` JSON.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import case, func, select
+
+from extensions import db
+from models.model_ChainStepResult import ChainStepResult
+from models.model_ExecutionSession import ExecutionSession, ExecutionResult
+from models.model_TestRun import TestRun
+
+logger = logging.getLogger(__name__)
+
+
+def _step_row(step: Dict[str, Any], execution_result_id: int, test_run_id: Optional[int], chain_id: int,
+              executed_at: datetime) -> Dict[str, Any]:
+    message = step.get('message')
+    return {
+        'execution_result_id': execution_result_id,
+        'test_run_id': test_run_id,
+        'chain_id': chain_id,
+        'step_id': step.get('step_id'),
+        'endpoint_id': step.get('endpoint_id'),
+        'step_order': step.get('step_order', 0),
+        'step_name': (step.get('step_name') or step.get('endpoint_name') or '')[:100] or None,
+        'success': step.get('status') == 'success',
+        'status_code': step.get('response_status_code'),
+        'latency_ms': step.get('latency_ms'),
+        'extracted_count': step.get('extracted_count') or len(step.get('extracted_data_preview') or {}),
+        'error_message': message[:500] if message else None,
+        'started_offset_ms': step.get('started_offset_ms'),
+        'executed_at': executed_at
+    }
+
+
+def record_chain_steps(execution_result: ExecutionResult, test_run_id: Optional[int], chain_id: int,
+                       step_results: Iterable[Dict[str, Any]]) -> int:
+    """
+    Insert one row per step for a flushed chain ExecutionResult. Steps reused
+    from a shared chain prefix are skipped, they were recorded by the case
+    that ran them. The caller commits.
+    """
+    rows = [_step_row(step, execution_result.id, test_run_id, chain_id,
+                      execution_result.executed_at or datetime.utcnow())
+            for step in step_results or [] if not step.get('shared')]
+    if rows:
+        db.session.execute(ChainStepResult.__table__.insert(), rows)
+    return len(rows)
+
+
+def chain_step_analysis(chain_id: Optional[int] = None, since: Optional[datetime] = None,
+                        user_id: Optional[int] = None) -> Dict[str, Any]:
+    """Per-step success counts and latency, plus chain-level totals, in two grouped queries."""
+    conditions = []
+    if chain_id is not None:
+        conditions.append(ChainStepResult.chain_id == chain_id)
+    if since is not None:
+        conditions.append(ChainStepResult.executed_at >= since)
+    if user_id is not None:
+        conditions.append(ChainStepResult.test_run_id.in_(select(TestRun.id).where(TestRun.user_id == user_id)))
+
+    succeeded = func.sum(case((ChainStepResult.success.is_(True), 1), else_=0))
+    rows = db.session.execute(
+        select(
+            ChainStepResult.chain_id,
+            ChainStepResult.step_order,
+            func.max(ChainStepResult.step_name),
+            func.count(ChainStepResult.id),
+            succeeded,
+            func.avg(ChainStepResult.latency_ms),
+            func.max(ChainStepResult.latency_ms),
+            func.avg(ChainStepResult.extracted_count)
+        )
+        .where(*conditions)
+        .group_by(ChainStepResult.chain_id, ChainStepResult.step_order)
+        .order_by(ChainStepResult.chain_id, ChainStepResult.step_order)
+    ).all()
+
+    step_data = []
+    for chain, order, name, total, success, avg_latency, max_latency, avg_extracted in rows:
+        success = int(success or 0)
+        step_data.append({
+            'chain_id': chain,
+            'step_order': order,
+            'step_name': name or f'Step {order}',
+            'success_rate': success / total * 100 if total else 0,
+            'total_executions': total,
+            'success_count': success,
+            'failure_count': total - success,
+            'avg_latency_ms': float(avg_latency) if avg_latency is not None else None,
+            'max_latency_ms': max_latency,
+            'avg_extracted_variables': float(avg_extracted) if avg_extracted is not None else 0
+        })
+
+    executions = (select(ChainStepResult.execution_result_id).where(*conditions)
+                  .group_by(ChainStepResult.execution_result_id).subquery())
+    total, successful = db.session.execute(
+        select(func.count(ExecutionResult.id), func.sum(case((ExecutionResult.success.is_(True), 1), else_=0)))
+        .join(executions, executions.c.execution_result_id == ExecutionResult.id)
+    ).one()
+
+    return {
+        'step_analysis': step_data,
+        'total_chain_executions': total or 0,
+        'overall_success_rate': (int(successful or 0) / total * 100) if total else 0
+    }
+
+
+def chain_step_waterfall(execution_result_id: int) -> List[Dict[str, Any]]:
+    """The steps of one chain execution in order, with start offsets and durations."""
+    steps = db.session.scalars(
+        select(ChainStepResult)
+        .where(ChainStepResult.execution_result_id == execution_result_id)
+        .order_by(ChainStepResult.step_order, ChainStepResult.id)
+    ).all()
+    return [step.to_dict() for step in steps]
+
+
+def backfill_chain_steps(batch_size: int = 500) -> int:
+    """
+    Create step rows for chain results recorded before step rows existed, from
+    the `step_results` kept in their request_data. Returns the rows written.
+    """
+    has_rows = select(ChainStepResult.id).where(ChainStepResult.execution_result_id == ExecutionResult.id).exists()
+    written, last_id = 0, 0
+    while True:
+        batch = db.session.execute(
+            select(ExecutionResult, TestRun.id, TestRun.chain_id)
+            .join(ExecutionSession, ExecutionSession.id == ExecutionResult.session_id)
+            .join(TestRun, TestRun.id == ExecutionSession.test_run_id)
+            .where(TestRun.target_type == 'chain', TestRun.chain_id.isnot(None),
+                   ExecutionResult.id > last_id, ~has_rows)
+            .order_by(ExecutionResult.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return written
+        rows = []
+        for result, run_id, chain_id in batch:
+            summary = result.request_data if isinstance(result.request_data, dict) else {}
+            rows.extend(_step_row(step, result.id, run_id, summary.get('chain_id') or chain_id, result.executed_at)
+                        for step in summary.get('step_results') or [] if not step.get('shared'))
+        if rows:
+            db.session.execute(ChainStepResult.__table__.insert(), rows)
+            written += len(rows)
+        last_id = batch[-1][0].id
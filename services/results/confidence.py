@@ -0,0 +1,118 @@
+# services/results/confidence.py
+"""
+Failure-rate estimates with confidence intervals for sample runs.
+
+A stratified sample run draws cases from each (attack_type, nist_risk)
+stratum in proportion to its size. The run-wide failure rate is the
+population-weighted mean of the per-stratum rates; its variance is the
+weighted sum of the per-stratum binomial variances. Per-stratum rates use
+the Agresti-Coull adjustment (x + z²/2) / (n + z²) so a stratum with no
+failures yet does not report zero variance.
+"""
+
+import math
+from statistics import NormalDist
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import case, func
+
+from extensions import db
+from models.model_ExecutionSession import ExecutionResult
+from models.model_TestCase import TestCase
+from services.test_cases.sampling import stratum_key
+
+
+def z_score(confidence: float) -> float:
+    """Two-sided critical value, e.g. 1.96 for 0.95."""
+    return NormalDist().inv_cdf(0.5 + confidence / 2.0)
+
+
+def wilson_interval(failures: int, n: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """Wilson score interval for a single binomial proportion."""
+    if n <= 0:
+        return 0.0, 1.0
+    z = z_score(confidence)
+    p = failures / n
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def stratified_failure_estimate(strata: Dict[str, Dict[str, int]], confidence: float = 0.95) -> Dict[str, Any]:
+    """
+    Combine per-stratum counts into a run-wide failure rate and interval.
+
+    `strata` maps a stratum key to {'population', 'completed', 'failed'}.
+    Strata without completed results are left out of the estimate and their
+    population weight is reported as 'unobserved_weight'.
+    """
+    z = z_score(confidence)
+    total_population = sum(s.get('population', 0) for s in strata.values()) or 1
+    observed_population = sum(s.get('population', 0) for s in strata.values() if s.get('completed'))
+
+    rate = 0.0
+    variance = 0.0
+    per_stratum = {}
+    for key, counts in strata.items():
+        n = counts.get('completed', 0)
+        failed = counts.get('failed', 0)
+        if not n:
+            per_stratum[key] = {**counts, 'failure_rate': None}
+            continue
+        weight = counts.get('population', 0) / (observed_population or 1)
+        p = failed / n
+        p_adjusted = (failed + z * z / 2) / (n + z * z)
+        rate += weight * p
+        variance += weight * weight * p_adjusted * (1 - p_adjusted) / (n + z * z)
+        low, high = wilson_interval(failed, n, confidence)
+        per_stratum[key] = {**counts, 'failure_rate': p, 'ci_low': low, 'ci_high': high}
+
+    completed = sum(s.get('completed', 0) for s in strata.values())
+    if not completed:
+        low, high = 0.0, 1.0
+    else:
+        margin = z * math.sqrt(variance)
+        low, high = max(0.0, rate - margin), min(1.0, rate + margin)
+
+    return {
+        'confidence': confidence,
+        'completed': completed,
+        'failed': sum(s.get('failed', 0) for s in strata.values()),
+        'failure_rate': rate if completed else None,
+        'ci_low': low,
+        'ci_high': high,
+        'ci_width': high - low,
+        'unobserved_weight': 1 - observed_population / total_population,
+        'strata': per_stratum
+    }
+
+
+def sample_run_estimate(session, confidence: float = 0.95) -> Dict[str, Any]:
+    """
+    Current estimate for a stratified sample session, from one grouped query
+    over its results. Only strata the plan drew cases from are included.
+    """
+    plan = session.sample_plan or {}
+    fields = plan.get('fields') or []
+    columns = [getattr(TestCase, field) for field in fields]
+
+    rows = db.session.query(
+        *columns,
+        func.count(ExecutionResult.id),
+        func.sum(case((ExecutionResult.success.is_(False), 1), else_=0))
+    ).join(
+        TestCase, TestCase.id == ExecutionResult.test_case_id
+    ).filter(
+        ExecutionResult.session_id == session.id
+    ).group_by(*columns).all()
+    observed = {stratum_key(row[:len(columns)]): (row[-2], int(row[-1] or 0)) for row in rows}
+
+    strata = {}
+    for key, info in (plan.get('strata') or {}).items():
+        if not info.get('planned'):
+            continue
+        completed, failed = observed.get(key, (0, 0))
+        strata[key] = {'population': info['population'], 'planned': info['planned'],
+                       'completed': completed, 'failed': failed}
+    return stratified_failure_estimate(strata, confidence)
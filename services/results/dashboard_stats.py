@@ -0,0 +1,157 @@
+# services/results/dashboard_stats.py
+"""
+Per-user dashboard statistics for the landing page.
+
+Every scalar on the dashboard (entity counts, execution totals, the 24h
+response time and the session summaries) is computed in a single SELECT of
+correlated aggregates, and the health breakdown in one GROUP BY. The result
+is cached per process for DASHBOARD_STATS_TTL seconds.
+
+Sessions complete in Celery workers, i.e. in other processes, so a local
+cache entry cannot simply be dropped from there. Instead completion bumps
+`User.stats_version`; the web process already has the user row loaded for
+the request and treats an entry cached under an older version as stale.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Tuple
+
+from flask import current_app
+from sqlalchemy import case, func, select, true
+
+from extensions import db
+from models.model_APIChain import APIChain
+from models.model_Endpoints import Endpoint
+from models.model_ExecutionSession import ExecutionSession, ExecutionResult
+from models.model_TestRun import TestRun
+from models.model_TestSuite import TestSuite
+from models.model_User import User
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 30
+ACTIVE_STATES = ('pending', 'running', 'paused')
+
+# user_id -> (stats_version, expires_at, stats)
+_stats_cache: Dict[int, Tuple[int, float, Dict[str, Any]]] = {}
+
+
+def _count(model, user_id: int):
+    return select(func.count(model.id)).where(model.user_id == user_id).scalar_subquery()
+
+
+def _compute(user_id: int) -> Dict[str, Any]:
+    recent_cutoff = datetime.utcnow() - timedelta(hours=24)
+    is_recent = ExecutionSession.started_at >= recent_cutoff
+
+    results = (
+        select(
+            func.count(ExecutionResult.id).label('executed'),
+            func.sum(case((ExecutionResult.success.is_(True), 1), else_=0)).label('successful'),
+            func.avg(case(
+                (ExecutionResult.executed_at >= recent_cutoff, ExecutionResult.response_time_ms),
+                else_=None
+            )).label('avg_response')
+        )
+        .join(ExecutionSession, ExecutionSession.id == ExecutionResult.session_id)
+        .join(TestRun, TestRun.id == ExecutionSession.test_run_id)
+        .where(TestRun.user_id == user_id)
+        .subquery('results')
+    )
+    sessions = (
+        select(
+            func.sum(case((ExecutionSession.state.in_(ACTIVE_STATES), 1), else_=0)).label('active'),
+            func.sum(case((is_recent, 1), else_=0)).label('recent'),
+            func.sum(case((is_recent, ExecutionSession.completed_test_cases), else_=0)).label('recent_completed'),
+            func.avg(case(
+                (is_recent, case(
+                    (ExecutionSession.completed_test_cases > 0,
+                     ExecutionSession.successful_test_cases * 1.0 / ExecutionSession.completed_test_cases),
+                    else_=0.0
+                )),
+                else_=None
+            )).label('recent_success_rate')
+        )
+        .join(TestRun, TestRun.id == ExecutionSession.test_run_id)
+        .where(TestRun.user_id == user_id)
+        .subquery('sessions')
+    )
+
+    row = db.session.execute(
+        select(
+            _count(TestRun, user_id).label('runs'),
+            _count(TestSuite, user_id).label('suites'),
+            _count(Endpoint, user_id).label('endpoints'),
+            _count(APIChain, user_id).label('chains'),
+            results.c.executed, results.c.successful, results.c.avg_response,
+            sessions.c.active, sessions.c.recent, sessions.c.recent_completed, sessions.c.recent_success_rate
+        ).select_from(results).join(sessions, true())
+    ).one()
+
+    health_rows = db.session.execute(
+        select(ExecutionSession.health_status, func.count(ExecutionSession.id))
+        .join(TestRun, TestRun.id == ExecutionSession.test_run_id)
+        .where(TestRun.user_id == user_id)
+        .group_by(ExecutionSession.health_status)
+    ).all()
+    health_summary: Dict[str, int] = {}
+    for health, count in health_rows:
+        key = health or 'unknown'
+        health_summary[key] = health_summary.get(key, 0) + count
+
+    executed = row.executed or 0
+    successful = int(row.successful or 0)
+    avg_response = float(row.avg_response) if row.avg_response is not None else 0
+    recent_performance = None
+    if executed > 0 and row.recent:
+        recent_performance = {
+            'total_cases_executed': int(row.recent_completed or 0),
+            'success_rate': float(row.recent_success_rate or 0.0),
+            'avg_response_time_ms': avg_response,
+            'sessions_count': int(row.recent)
+        }
+
+    return {
+        'stats': {
+            'total_test_runs': row.runs,
+            'total_test_suites': row.suites,
+            'total_endpoints': row.endpoints,
+            'total_chains': row.chains,
+            'total_test_cases_executed': executed,
+            'successful_executions': successful,
+            'overall_success_rate': successful / executed if executed > 0 else 0,
+            'active_executions': int(row.active or 0),
+            'avg_response_time_ms': avg_response
+        },
+        'recent_performance': recent_performance,
+        'health_summary': health_summary
+    }
+
+
+def get_dashboard_stats(user) -> Dict[str, Any]:
+    """
+    {'stats', 'recent_performance', 'health_summary'} for the user, from the
+    cache when fresh. `user` is the loaded User (its stats_version is read).
+    """
+    version = user.stats_version or 0
+    cached = _stats_cache.get(user.id)
+    now = time.monotonic()
+    if cached and cached[0] == version and cached[1] > now:
+        return cached[2]
+
+    stats = _compute(user.id)
+    ttl = current_app.config.get('DASHBOARD_STATS_TTL', DEFAULT_TTL_SECONDS)
+    _stats_cache[user.id] = (version, now + ttl, stats)
+    return stats
+
+
+def invalidate_dashboard_stats(user_id: int) -> None:
+    """Mark the user's cached stats stale in every process. The caller commits."""
+    if not user_id:
+        return
+    _stats_cache.pop(user_id, None)
+    db.session.query(User).filter(User.id == user_id).update(
+        {User.stats_version: User.stats_version + 1}, synchronize_session=False
+    )
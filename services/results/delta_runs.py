@@ -0,0 +1,136 @@
+# services/results/delta_runs.py
+"""
+Delta runs: skip (case, transformation, endpoint) combinations that already
+have a recent result.
+
+Every endpoint result stores a run fingerprint, the hash of
+    - the test case prompt (exact content, not the normalised fingerprint),
+    - the transformation chain applied to it,
+    - the payload template version (the request manifest hash),
+    - the endpoint config: method, URL, headers and the run's header overrides.
+Two results with the same fingerprint sent byte-identical requests. A delta
+run computes the fingerprint of each planned combination up front, copies
+the newest recent result for it into the new session (pointing back at the
+original through `reused_from_id`; bodies are content-addressed so nothing
+is duplicated) and only dispatches the combinations left over.
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import xxhash
+from sqlalchemy import insert, select
+
+from extensions import db
+from models.model_ExecutionSession import ExecutionSession, ExecutionResult
+from models.model_TestRun import TestRun
+from services.results.request_manifest import build_request_manifest
+
+logger = logging.getLogger(__name__)
+
+# Results older than this are executed again
+DEFAULT_MAX_AGE_HOURS = 168
+
+# Columns copied from the reused result into the new session
+_COPIED_COLUMNS = (
+    'test_case_id', 'iteration_number', 'success', 'status_code', 'response_time_ms', 'error_message',
+    'request_data', 'response_data', 'processed_prompt', 'request_manifest_hash', 'response_body_hash',
+    'response_preview', 'started_at', 'executed_at', 'run_fingerprint'
+)
+
+
+def _hash(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return xxhash.xxh3_128_hexdigest(raw.encode('utf-8'))
+
+
+def target_fingerprint(endpoint, exec_config: Dict[str, Any]) -> str:
+    """Hash of everything except the prompt that shapes the request sent for a case."""
+    return _hash({
+        'transformations': exec_config.get('transformations') or [],
+        'template': build_request_manifest(endpoint)['hash'],
+        'method': endpoint.method,
+        'url': f"{endpoint.base_url.rstrip('/')}/{endpoint.path.lstrip('/')}",
+        'headers': sorted((h.key, h.value) for h in (endpoint.headers or [])),
+        'header_overrides': exec_config.get('header_overrides') or {}
+    })
+
+
+def run_fingerprint(target_fp: str, prompt: Optional[str]) -> str:
+    """Fingerprint of one (case content, target) combination."""
+    content_hash = xxhash.xxh3_128_hexdigest((prompt or '').encode('utf-8'))
+    return xxhash.xxh3_128_hexdigest(f'{target_fp}:{content_hash}'.encode('ascii'))
+
+
+def _reusable_results(run: TestRun, fingerprints: Sequence[str], cutoff: datetime) -> Dict[Tuple[str, int], ExecutionResult]:
+    """Newest reusable result per (fingerprint, iteration) among the user's runs since cutoff."""
+    latest: Dict[Tuple[str, int], ExecutionResult] = {}
+    fingerprints = list(set(fingerprints))
+    for start in range(0, len(fingerprints), 5000):
+        chunk = fingerprints[start:start + 5000]
+        rows = db.session.scalars(
+            select(ExecutionResult)
+            .join(ExecutionSession, ExecutionSession.id == ExecutionResult.session_id)
+            .join(TestRun, TestRun.id == ExecutionSession.test_run_id)
+            .where(
+                ExecutionResult.run_fingerprint.in_(chunk),
+                ExecutionResult.executed_at >= cutoff,
+                TestRun.user_id == run.user_id,
+                # Connection errors, throttling and server errors say nothing about the prompt
+                ExecutionResult.status_code.isnot(None),
+                ExecutionResult.status_code < 500,
+                ExecutionResult.status_code != 429
+            )
+            .order_by(ExecutionResult.executed_at.desc(), ExecutionResult.id.desc())
+        )
+        for row in rows:
+            latest.setdefault((row.run_fingerprint, row.iteration_number or 1), row)
+    return latest
+
+
+def link_recent_results(run: TestRun, session: ExecutionSession,
+                        planned: List[Tuple[int, int, str, int]],
+                        exec_config: Dict[str, Any]) -> Set[int]:
+    """
+    Copy recent results into the session for the planned combinations that have one.
+
+    `planned` holds (sequence_number, case_id, prompt, iteration). The session's
+    progress counters are advanced for the copied results. Returns the
+    sequence numbers that no longer need to be executed.
+    """
+    if not planned or run.target_type != 'endpoint' or not run.endpoint:
+        return set()
+    target_fp = target_fingerprint(run.endpoint, exec_config)
+    fingerprints = {case_id: run_fingerprint(target_fp, prompt) for _, case_id, prompt, _ in planned}
+    max_age = exec_config.get('delta_max_age_hours') or DEFAULT_MAX_AGE_HOURS
+    latest = _reusable_results(run, list(fingerprints.values()), datetime.utcnow() - timedelta(hours=max_age))
+
+    rows, reused = [], set()
+    for seq, case_id, _, iteration in planned:
+        source = latest.get((fingerprints[case_id], iteration))
+        if source is None:
+            continue
+        row = {column: getattr(source, column) for column in _COPIED_COLUMNS}
+        row.update({
+            'session_id': session.id,
+            'test_case_id': case_id,
+            'sequence_number': seq,
+            # Always point at the result that was actually executed
+            'reused_from_id': source.reused_from_id or source.id
+        })
+        rows.append(row)
+        reused.add(seq)
+
+    if rows:
+        db.session.execute(insert(ExecutionResult), rows)
+        successful = sum(1 for row in rows if row['success'])
+        session.reused_test_cases = len(rows)
+        session.completed_test_cases = (session.completed_test_cases or 0) + len(rows)
+        session.successful_test_cases = (session.successful_test_cases or 0) + successful
+        session.failed_test_cases = (session.failed_test_cases or 0) + len(rows) - successful
+    logger.info(f"DeltaRun TR_ID:{run.id}: reused {len(rows)} of {len(planned)} combination(s) "
+                f"executed within the last {max_age}h.")
+    return reused
+
@@ -0,0 +1,221 @@
+# services/results/export.py
+"""
+Streaming export of execution results as CSV, NDJSON or Parquet.
+
+Rows are read with server-side cursors (`yield_per`) for live sessions and
+with Parquet record batches for archived ones, and are written out chunk by
+chunk, so memory stays bounded no matter how many results a run has.
+"""
+
+import csv
+import io
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy.orm import lazyload
+
+from models.model_ExecutionSession import ExecutionSession, ExecutionResult
+from models.model_TestCase import TestCase
+from services.results.response_store import load_response_bodies
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+DEFAULT_BATCH_SIZE = 1000
+
+# Column name -> Arrow type (also defines the default column order)
+EXPORT_COLUMNS = {
+    'id': pa.int64(),
+    'session_id': pa.int64(),
+    'test_case_id': pa.int64(),
+    'sequence_number': pa.int32(),
+    'iteration_number': pa.int32(),
+    'success': pa.bool_(),
+    'status_code': pa.int32(),
+    'response_time_ms': pa.int32(),
+    'error_message': pa.string(),
+    'prompt': pa.string(),
+    'processed_prompt': pa.string(),
+    'request_data': pa.string(),
+    'response_data': pa.string(),
+    'started_at': pa.timestamp('us'),
+    'executed_at': pa.timestamp('us'),
+}
+# Full request payloads are opt-in; they are large and rebuilt per row
+DEFAULT_COLUMNS = [c for c in EXPORT_COLUMNS if c != 'request_data']
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class ExportError(ValueError):
+    """Raised for invalid export parameters."""
+
+
+def parse_columns(columns: Optional[Iterable[str]]) -> List[str]:
+    """Validate a requested column list, falling back to the defaults."""
+    if not columns:
+        return list(DEFAULT_COLUMNS)
+    columns = [c.strip() for c in columns if c and c.strip()]
+    unknown = [c for c in columns if c not in EXPORT_COLUMNS]
+    if unknown:
+        raise ExportError(f"Unknown export column(s): {', '.join(unknown)}")
+    return columns
+
+
+def parse_filters(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract supported filters (success, status_code, iteration) from request args or CLI options."""
+    filters = {}
+    success = args.get('success')
+    if success not in (None, ''):
+        filters['success'] = str(success).lower() in ('1', 'true', 'yes', 'pass', 'passed')
+    for key in ('status_code', 'iteration'):
+        value = args.get(key)
+        if value not in (None, ''):
+            try:
+                filters[key] = int(value)
+            except (TypeError, ValueError):
+                raise ExportError(f"Filter '{key}' must be an integer")
+    return filters
+
+
+def _as_text(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def _prompt_map(case_ids: Iterable[int]) -> Dict[int, str]:
+    case_ids = {cid for cid in case_ids if cid}
+    if not case_ids:
+        return {}
+    rows = TestCase.query.with_entities(TestCase.id, TestCase.prompt).filter(TestCase.id.in_(case_ids)).all()
+    return dict(rows)
+
+
+def _live_batches(session: ExecutionSession, filters: Dict[str, Any], columns: List[str],
+                  batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    query = (ExecutionResult.query
+             .filter(ExecutionResult.session_id == session.id)
+             .options(lazyload('*'))
+             .order_by(ExecutionResult.sequence_number, ExecutionResult.id))
+    if 'success' in filters:
+        query = query.filter(ExecutionResult.success.is_(filters['success']))
+    if 'status_code' in filters:
+        query = query.filter(ExecutionResult.status_code == filters['status_code'])
+    if 'iteration' in filters:
+        query = query.filter(ExecutionResult.iteration_number == filters['iteration'])
+
+    manifest = session.request_manifest
+    batch: List[ExecutionResult] = []
+
+    def convert(results):
+        bodies = load_response_bodies(r.response_body_hash for r in results) if 'response_data' in columns else {}
+        prompts = _prompt_map(r.test_case_id for r in results) if 'prompt' in columns else {}
+        rows = []
+        for r in results:
+            row = {
+                'id': r.id,
+                'session_id': r.session_id,
+                'test_case_id': r.test_case_id,
+                'sequence_number': r.sequence_number,
+                'iteration_number': r.iteration_number,
+                'success': r.success,
+                'status_code': r.status_code,
+                'response_time_ms': r.response_time_ms,
+                'error_message': r.error_message,
+                'prompt': prompts.get(r.test_case_id),
+                'processed_prompt': r.processed_prompt,
+                'started_at': r.started_at,
+                'executed_at': r.executed_at,
+            }
+            if 'request_data' in columns:
+                row['request_data'] = _as_text(r.get_request_data(manifest))
+            if 'response_data' in columns:
+                row['response_data'] = _as_text(
+                    bodies.get(r.response_body_hash) if r.response_body_hash else r.response_data
+                )
+            rows.append({c: row.get(c) for c in columns})
+        return rows
+
+    for result in query.yield_per(batch_size):
+        batch.append(result)
+        if len(batch) >= batch_size:
+            yield convert(batch)
+            batch = []
+    if batch:
+        yield convert(batch)
+
+
+def _archived_batches(session: ExecutionSession, filters: Dict[str, Any], columns: List[str],
+                      batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    if not session.archive_path:
+        return
+    parquet_file = pq.ParquetFile(session.archive_path, memory_map=True)
+    available = set(parquet_file.schema_arrow.names)
+    read_columns = [c for c in columns if c in available]
+    read_columns += [c for c in ('success', 'status_code', 'iteration_number', 'test_case_id')
+                     if c not in read_columns]
+
+    for record_batch in parquet_file.iter_batches(batch_size=batch_size, columns=read_columns):
+        rows = record_batch.to_pylist()
+        if 'success' in filters:
+            rows = [r for r in rows if r['success'] is filters['success']]
+        if 'status_code' in filters:
+            rows = [r for r in rows if r['status_code'] == filters['status_code']]
+        if 'iteration' in filters:
+            rows = [r for r in rows if r['iteration_number'] == filters['iteration']]
+        if not rows:
+            continue
+        prompts = _prompt_map(r['test_case_id'] for r in rows) if 'prompt' in columns else {}
+        for r in rows:
+            r['session_id'] = session.id
+            r['prompt'] = prompts.get(r['test_case_id'])
+        yield [{c: r.get(c) for c in columns} for r in rows]
+
+
+def iter_result_batches(sessions: Iterable[ExecutionSession], columns: List[str],
+                        filters: Optional[Dict[str, Any]] = None,
+                        batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Yield lists of export rows for the given sessions, live or archived."""
+    filters = filters or {}
+    for session in sessions:
+        source = _archived_batches if session.is_archived else _live_batches
+        yield from source(session, filters, columns, batch_size)
+
+
+def stream_csv(batches: Iterable[List[Dict[str, Any]]], columns: List[str]) -> Iterator[str]:
+    """Yield CSV text, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    yield buffer.getvalue()
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            writer.writerow({k: v.isoformat() if hasattr(v, 'isoformat') else v for k, v in row.items()})
+        yield buffer.getvalue()
+
+
+def stream_jsonl(batches: Iterable[List[Dict[str, Any]]]) -> Iterator[str]:
+    """Yield newline-delimited JSON, one chunk per batch."""
+    for rows in batches:
+        yield ''.join(json.dumps(row, default=str) + '\n' for row in rows)
+
+
+def write_parquet(batches: Iterable[List[Dict[str, Any]]], columns: List[str], sink) -> int:
+    """Write batches to a Parquet file or file-like sink. Returns rows written."""
+    schema = pa.schema([(c, EXPORT_COLUMNS[c]) for c in columns])
+    written = 0
+    with pq.ParquetWriter(sink, schema, compression='zstd') as writer:
+        for rows in batches:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            written += len(rows)
+    return written
@@ -0,0 +1,80 @@
+# services/results/request_manifest.py
+"""
+Delta storage for rendered request payloads.
+
+For an endpoint run every request is the same payload template rendered with
+a different prompt. The template (and its fixed render context) is captured
+once per ExecutionSession as a "request manifest"; each ExecutionResult then
+stores only the processed prompt and the manifest hash it was rendered with.
+The full payload is rebuilt on read by rendering the manifest again.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import xxhash
+
+from services.common.templating_service import render_template_string
+
+logger = logging.getLogger(__name__)
+
+# Fixed (prompt-independent) variables available to payload templates
+DEFAULT_RENDER_CONTEXT = {
+    "MODEL_NAME": "gemma-3-12b-it"  # USED FOR LOCAL TESTING ONLY
+}
+
+
+def _manifest_hash(template: Optional[str], context: Dict[str, Any]) -> str:
+    key = json.dumps({'template': template, 'context': context}, sort_keys=True)
+    return xxhash.xxh3_128_hexdigest(key.encode('utf-8'))
+
+
+def build_request_manifest(endpoint) -> Dict[str, Any]:
+    """Snapshot of everything needed to re-render an endpoint's payload."""
+    payload_template = getattr(endpoint, 'payload_template', None)
+    template = payload_template.template if payload_template else None
+    context = dict(DEFAULT_RENDER_CONTEXT)
+    return {
+        'payload_template_id': payload_template.id if payload_template else None,
+        'template': template,
+        'context': context,
+        'hash': _manifest_hash(template, context)
+    }
+
+
+def manifest_matches(manifest: Optional[Dict[str, Any]], endpoint) -> bool:
+    """True when the endpoint still renders exactly as the manifest describes."""
+    if not manifest:
+        return False
+    payload_template = getattr(endpoint, 'payload_template', None)
+    template = payload_template.template if payload_template else None
+    return manifest.get('hash') == _manifest_hash(template, manifest.get('context') or {})
+
+
+def render_payload(template: Optional[str], prompt: str, context: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Render a request payload string for a prompt.
+
+    Without a template the payload falls back to a single user 'messages' array.
+    """
+    if not template:
+        return json.dumps({"messages": [{"role": "user", "content": prompt}]})
+
+    render_context = dict(context if context is not None else DEFAULT_RENDER_CONTEXT)
+    render_context.update({
+        "INJECT_PROMPT": prompt,
+        "INJECT_PROMPT_JSON": json.dumps(prompt)[1:-1]  # JSON-escaped without quotes
+    })
+    return render_template_string(template, render_context)
+
+
+def reconstruct_request_data(manifest: Optional[Dict[str, Any]], prompt: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Rebuild the payload dict a delta-stored result was sent with."""
+    if manifest is None or prompt is None:
+        return None
+    try:
+        return json.loads(render_payload(manifest.get('template'), prompt, manifest.get('context')))
+    except Exception as e:
+        logger.warning(f"RequestManifest: could not reconstruct payload: {e}")
+        return None
@@ -0,0 +1,267 @@
+# services/results/response_search.py
+"""
+Full-text search over execution response text.
+
+The assistant text extracted at ingest (ResponseBody.response_text) is
+indexed once per unique body: a GIN tsvector index on Postgres, a standalone
+FTS5 table on SQLite, ILIKE elsewhere. Matching bodies are joined back to
+their execution results, scoped by run, endpoint, session or date range, and
+paginated newest first with an id keyset cursor. Highlighted snippets are
+computed by the database for the returned page only, so no response body is
+loaded into Python.
+
+Results of archived sessions live in Parquet and are not searched here.
+"""
+
+import html
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, func, literal_column, select, text
+
+from extensions import db
+from models.model_ExecutionSession import ExecutionSession, ExecutionResult
+from models.model_ResponseBody import ResponseBody
+from models.model_TestRun import TestRun
+from services.test_cases.search import SearchError, fts5_match_query, like_pattern
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+SNIPPET_WORDS = 24
+
+FTS_TABLE = 'response_bodies_fts'
+PG_TSVECTOR_INDEX = 'ix_response_bodies_text_tsv'
+
+_PG_VECTOR = "to_tsvector('english'::regconfig, coalesce(response_bodies.response_text, ''))"
+
+# Highlight markers that cannot occur in response text; swapped for <mark> after escaping
+_MARK_START, _MARK_END = '\x02', '\x03'
+
+_backend_cache: Dict[str, str] = {}
+
+
+# ---------------------------------------------------------------------------
+# Index management
+# ---------------------------------------------------------------------------
+
+def create_response_search_index(connection) -> None:
+    """Create the response text index for the connection's dialect (idempotent)."""
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {PG_TSVECTOR_INDEX} ON response_bodies "
+            f"USING gin (to_tsvector('english'::regconfig, coalesce(response_text, '')))"
+        ))
+    elif dialect == 'sqlite':
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"content_hash UNINDEXED, response_text, tokenize='unicode61 remove_diacritics 2')"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS response_bodies_fts_ai AFTER INSERT ON response_bodies "
+            f"WHEN new.response_text IS NOT NULL BEGIN "
+            f"INSERT INTO {FTS_TABLE}(content_hash, response_text) VALUES (new.content_hash, new.response_text); END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS response_bodies_fts_ad AFTER DELETE ON response_bodies BEGIN "
+            f"DELETE FROM {FTS_TABLE} WHERE content_hash = old.content_hash; END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS response_bodies_fts_au AFTER UPDATE OF response_text ON response_bodies BEGIN "
+            f"DELETE FROM {FTS_TABLE} WHERE content_hash = old.content_hash; "
+            f"INSERT INTO {FTS_TABLE}(content_hash, response_text) "
+            f"SELECT new.content_hash, new.response_text WHERE new.response_text IS NOT NULL; END"
+        ))
+        connection.execute(text(f"DELETE FROM {FTS_TABLE}"))
+        connection.execute(text(
+            f"INSERT INTO {FTS_TABLE}(content_hash, response_text) "
+            f"SELECT content_hash, response_text FROM response_bodies WHERE response_text IS NOT NULL"
+        ))
+    else:
+        logger.warning(f"ResponseSearch: no search index available for dialect '{dialect}'")
+    _backend_cache.clear()
+
+
+def drop_response_search_index(connection) -> None:
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        connection.execute(text(f"DROP INDEX IF EXISTS {PG_TSVECTOR_INDEX}"))
+    elif dialect == 'sqlite':
+        for trigger in ('response_bodies_fts_ai', 'response_bodies_fts_ad', 'response_bodies_fts_au'):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+    _backend_cache.clear()
+
+
+def get_response_search_backend() -> str:
+    """'postgres', 'fts5' or 'like', depending on the dialect and whether the index exists."""
+    bind = db.session.get_bind()
+    key = str(bind.url)
+    if key in _backend_cache:
+        return _backend_cache[key]
+
+    backend = 'like'
+    try:
+        if bind.dialect.name == 'postgresql':
+            found = db.session.execute(
+                text("SELECT 1 FROM pg_indexes WHERE indexname = :name"), {'name': PG_TSVECTOR_INDEX}
+            ).first()
+            backend = 'postgres' if found else 'like'
+        elif bind.dialect.name == 'sqlite':
+            found = db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE}
+            ).first()
+            backend = 'fts5' if found else 'like'
+    except Exception as e:
+        logger.warning(f"ResponseSearch: could not detect search index, using ILIKE: {e}")
+
+    if backend == 'like':
+        logger.info("ResponseSearch: index not found, falling back to ILIKE (run `flask rebuild-search-index`)")
+    _backend_cache[key] = backend
+    return backend
+
+
+# ---------------------------------------------------------------------------
+# Snippets
+# ---------------------------------------------------------------------------
+
+def _render_snippet(raw: Optional[str]) -> Optional[str]:
+    """HTML-escape a marked snippet and turn the markers into <mark> tags."""
+    if raw is None:
+        return None
+    return html.escape(raw).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def _python_snippet(response_text: Optional[str], query: str, width: int = 80) -> Optional[str]:
+    """Window around the first case-insensitive occurrence (ILIKE fallback)."""
+    if not response_text:
+        return None
+    position = response_text.lower().find(query.lower())
+    if position < 0:
+        return _render_snippet(response_text[:width * 2])
+    start = max(0, position - width)
+    end = min(len(response_text), position + len(query) + width)
+    marked = (('…' if start else '') + response_text[start:position] + _MARK_START
+              + response_text[position:position + len(query)] + _MARK_END
+              + response_text[position + len(query):end] + ('…' if end < len(response_text) else ''))
+    return _render_snippet(marked)
+
+
+def _snippets(backend: str, query: str, hashes: List[str]) -> Dict[str, Optional[str]]:
+    if not hashes:
+        return {}
+
+    if backend == 'postgres':
+        ts_query = func.websearch_to_tsquery(literal_column("'english'::regconfig"), query)
+        options = (f"StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords={SNIPPET_WORDS}, "
+                   f"MinWords=8, MaxFragments=2, FragmentDelimiter=\" … \"")
+        rows = db.session.execute(
+            select(ResponseBody.content_hash,
+                   func.ts_headline(literal_column("'english'::regconfig"),
+                                    ResponseBody.response_text, ts_query, options))
+            .where(ResponseBody.content_hash.in_(hashes))
+        ).all()
+        return {h: _render_snippet(s) for h, s in rows}
+
+    if backend == 'fts5':
+        rows = db.session.execute(
+            text(f"SELECT content_hash, snippet({FTS_TABLE}, 1, :start, :end, '…', :words) "
+                 f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match AND content_hash IN :hashes")
+            .bindparams(bindparam('hashes', expanding=True)),
+            {'start': _MARK_START, 'end': _MARK_END, 'words': SNIPPET_WORDS,
+             'match': fts5_match_query(query), 'hashes': hashes}
+        ).all()
+        return {h: _render_snippet(s) for h, s in rows}
+
+    rows = db.session.execute(
+        select(ResponseBody.content_hash, ResponseBody.response_text)
+        .where(ResponseBody.content_hash.in_(hashes))
+    ).all()
+    return {h: _python_snippet(t, query) for h, t in rows}
+
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+
+def search_responses(query: str, run_id: Optional[int] = None, endpoint_id: Optional[int] = None,
+                     session_id: Optional[int] = None, since: Optional[datetime] = None,
+                     until: Optional[datetime] = None, user_id: Optional[int] = None,
+                     cursor: Optional[int] = None, limit: int = DEFAULT_LIMIT) -> Dict[str, Any]:
+    """
+    Execution results whose response text matches the query, newest first.
+
+    `user_id` restricts the search to that user's runs. `cursor` is the
+    `next_cursor` of the previous page (the last result id seen).
+    Returns {'items': [...], 'next_cursor', 'backend'}.
+    """
+    query = (query or '').strip()
+    if not query:
+        raise SearchError("A search query is required")
+    limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+    backend = get_response_search_backend()
+
+    stmt = (select(ExecutionResult.id, ExecutionResult.session_id, ExecutionResult.test_case_id,
+                   ExecutionResult.success, ExecutionResult.status_code, ExecutionResult.executed_at,
+                   ExecutionResult.response_body_hash, ExecutionSession.test_run_id)
+            .join(ExecutionSession, ExecutionSession.id == ExecutionResult.session_id))
+
+    if backend == 'postgres':
+        ts_query = func.websearch_to_tsquery(literal_column("'english'::regconfig"), query)
+        stmt = (stmt.join(ResponseBody, ResponseBody.content_hash == ExecutionResult.response_body_hash)
+                .where(literal_column(_PG_VECTOR).op('@@')(ts_query)))
+    elif backend == 'fts5':
+        match = fts5_match_query(query)
+        if match is None:
+            return {'items': [], 'next_cursor': None, 'backend': backend}
+        matches = (text(f"SELECT content_hash FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match")
+                   .bindparams(match=match).columns(content_hash=db.String).subquery('fts'))
+        stmt = stmt.join(matches, matches.c.content_hash == ExecutionResult.response_body_hash)
+    else:
+        stmt = (stmt.join(ResponseBody, ResponseBody.content_hash == ExecutionResult.response_body_hash)
+                .where(ResponseBody.response_text.ilike(like_pattern(query), escape='\\')))
+
+    if run_id is not None:
+        stmt = stmt.where(ExecutionSession.test_run_id == run_id)
+    if session_id is not None:
+        stmt = stmt.where(ExecutionResult.session_id == session_id)
+    if endpoint_id is not None or user_id is not None:
+        stmt = stmt.join(TestRun, TestRun.id == ExecutionSession.test_run_id)
+        if endpoint_id is not None:
+            stmt = stmt.where(TestRun.endpoint_id == endpoint_id)
+        if user_id is not None:
+            stmt = stmt.where(TestRun.user_id == user_id)
+    if since is not None:
+        stmt = stmt.where(ExecutionResult.executed_at >= since)
+    if until is not None:
+        stmt = stmt.where(ExecutionResult.executed_at < until)
+    if cursor is not None:
+        stmt = stmt.where(ExecutionResult.id < cursor)
+
+    rows = db.session.execute(stmt.order_by(ExecutionResult.id.desc()).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].id
+
+    snippets = _snippets(backend, query, list({r.response_body_hash for r in rows}))
+    return {
+        'items': [
+            {
+                'result_id': r.id,
+                'session_id': r.session_id,
+                'test_run_id': r.test_run_id,
+                'test_case_id': r.test_case_id,
+                'success': r.success,
+                'status_code': r.status_code,
+                'executed_at': r.executed_at.isoformat() if r.executed_at else None,
+                'snippet': snippets.get(r.response_body_hash)
+            }
+            for r in rows
+        ],
+        'next_cursor': next_cursor,
+        'backend': backend
+    }
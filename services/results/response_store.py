@@ -0,0 +1,150 @@
+# services/results/response_store.py
+"""
+Content-addressed response body store.
+
+Response bodies are hashed with xxh3-128, compressed with zlib and written
+once to the `response_bodies` table. Callers keep only the hash (and a short
+preview) on their own rows and resolve the body lazily on read.
+"""
+
+import logging
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+import xxhash
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from models.model_ResponseBody import ResponseBody
+from services.results.response_text import extract_response_text
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_LENGTH = 200
+COMPRESSION_LEVEL = 6
+
+# Bodies are immutable once stored, so a per-process cache is always safe.
+_BODY_CACHE_SIZE = 512
+_body_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+def hash_response_body(body: str) -> str:
+    """Return the content hash used as the storage key for a body."""
+    return xxhash.xxh3_128_hexdigest(body.encode('utf-8'))
+
+
+def make_preview(body: Optional[str], length: int = PREVIEW_LENGTH) -> Optional[str]:
+    """Short, display-only prefix of a response body."""
+    if body is None:
+        return None
+    return body[:length] + ("..." if len(body) > length else "")
+
+
+def _cache_put(content_hash: str, body: str) -> None:
+    _body_cache[content_hash] = body
+    _body_cache.move_to_end(content_hash)
+    while len(_body_cache) > _BODY_CACHE_SIZE:
+        _body_cache.popitem(last=False)
+
+
+def _insert_ignore(values: dict):
+    """Dialect-aware INSERT ... ON CONFLICT DO NOTHING for response_bodies."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        stmt = postgresql.insert(ResponseBody.__table__).values(**values)
+    elif dialect == 'sqlite':
+        stmt = sqlite.insert(ResponseBody.__table__).values(**values)
+    else:
+        # Fallback for other backends: check first, then insert
+        if db.session.get(ResponseBody, values['content_hash']) is None:
+            db.session.add(ResponseBody(**values))
+            db.session.flush()
+        return
+    db.session.execute(stmt.on_conflict_do_nothing(index_elements=['content_hash']))
+
+
+def store_response_body(body: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Store a response body (if not already present) and return (hash, preview).
+
+    Safe to call concurrently from several workers: duplicate inserts are
+    ignored by the database.
+    """
+    if body is None:
+        return None, None
+
+    body = str(body)
+    raw = body.encode('utf-8')
+    content_hash = xxhash.xxh3_128_hexdigest(raw)
+
+    # Always issue the (no-op on conflict) insert rather than trusting the
+    # cache: the surrounding transaction may have been rolled back.
+    compressed = zlib.compress(raw, COMPRESSION_LEVEL)
+    _insert_ignore({
+        'content_hash': content_hash,
+        'body_compressed': compressed,
+        'compression': 'zlib',
+        'size_bytes': len(raw),
+        'compressed_size_bytes': len(compressed),
+        'response_text': extract_response_text(body)
+    })
+    _cache_put(content_hash, body)
+
+    return content_hash, make_preview(body)
+
+
+def decompress_body(row: ResponseBody) -> str:
+    if row.compression == 'zlib':
+        return zlib.decompress(row.body_compressed).decode('utf-8')
+    return row.body_compressed.decode('utf-8')
+
+
+def load_response_body(content_hash: Optional[str]) -> Optional[str]:
+    """Resolve a single body by hash (cached)."""
+    if not content_hash:
+        return None
+    if content_hash in _body_cache:
+        _body_cache.move_to_end(content_hash)
+        return _body_cache[content_hash]
+
+    row = db.session.get(ResponseBody, content_hash)
+    if row is None:
+        logger.warning(f"ResponseStore: body {content_hash} referenced but not found.")
+        return None
+    body = decompress_body(row)
+    _cache_put(content_hash, body)
+    return body
+
+
+def load_response_bodies(content_hashes: Iterable[str]) -> Dict[str, str]:
+    """
+    Resolve many bodies in a single query. Use this before rendering lists of
+    results to avoid one lookup per row.
+    """
+    wanted = {h for h in content_hashes if h}
+    found = {h: _body_cache[h] for h in wanted if h in _body_cache}
+    missing = wanted - found.keys()
+
+    if missing:
+        rows = ResponseBody.query.filter(ResponseBody.content_hash.in_(missing)).all()
+        for row in rows:
+            body = decompress_body(row)
+            _cache_put(row.content_hash, body)
+            found[row.content_hash] = body
+
+    return found
+
+
+def prune_orphaned_response_bodies() -> int:
+    """Delete bodies no longer referenced by any ExecutionResult. Returns rows deleted."""
+    from models.model_ExecutionSession import ExecutionResult
+
+    referenced = db.session.query(ExecutionResult.response_body_hash).filter(
+        ExecutionResult.response_body_hash.isnot(None)
+    )
+    deleted = ResponseBody.query.filter(
+        ~ResponseBody.content_hash.in_(referenced)
+    ).delete(synchronize_session=False)
+    _body_cache.clear()
+    return deleted
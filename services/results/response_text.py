@@ -0,0 +1,144 @@
+# services/results/response_text.py
+"""
+Assistant text extraction from raw LLM response bodies.
+
+Endpoints answer in many JSON shapes (OpenAI chat/completions/responses,
+Anthropic messages, Gemini, Ollama, Cohere, Hugging Face, ad-hoc wrappers)
+or as server-sent event streams. The extracted text is what gets indexed
+for response search, so it should contain the model's words and not the
+envelope around them. Bodies in an unknown shape are indexed as-is.
+"""
+
+import json
+from typing import Any, List, Optional
+
+# Upper bound on indexed text per body; the full body is always kept in the store
+MAX_TEXT_LENGTH = 100_000
+
+# Plain string fields used by simpler APIs and custom wrappers, in priority order
+_TEXT_KEYS = ('output_text', 'completion', 'generated_text', 'response', 'output', 'answer',
+              'reply', 'result', 'text', 'content', 'data')
+
+
+def _content_text(content: Any) -> List[str]:
+    """Text from a 'content' value: a string or a list of typed parts."""
+    if isinstance(content, str):
+        return [content]
+    parts = []
+    if isinstance(content, list):
+        for part in content:
+            if isinstance(part, str):
+                parts.append(part)
+            elif isinstance(part, dict) and isinstance(part.get('text'), str):
+                parts.append(part['text'])
+    return parts
+
+
+def _from_json(data: Any) -> List[str]:
+    if isinstance(data, list):
+        # Hugging Face text-generation: [{"generated_text": ...}]
+        texts = []
+        for item in data:
+            texts.extend(_from_json(item))
+        return texts
+    if not isinstance(data, dict):
+        return [data] if isinstance(data, str) else []
+
+    # OpenAI chat / completions (and streamed deltas)
+    if isinstance(data.get('choices'), list):
+        texts = []
+        for choice in data['choices']:
+            if not isinstance(choice, dict):
+                continue
+            for key in ('message', 'delta'):
+                if isinstance(choice.get(key), dict):
+                    texts.extend(_content_text(choice[key].get('content')))
+            if isinstance(choice.get('text'), str):
+                texts.append(choice['text'])
+        return texts
+
+    # Gemini
+    if isinstance(data.get('candidates'), list):
+        texts = []
+        for candidate in data['candidates']:
+            content = candidate.get('content') if isinstance(candidate, dict) else None
+            if isinstance(content, dict):
+                texts.extend(_content_text(content.get('parts')))
+        return texts
+
+    # OpenAI responses API
+    if isinstance(data.get('output'), list):
+        texts = []
+        for item in data['output']:
+            if isinstance(item, dict):
+                texts.extend(_content_text(item.get('content')))
+        if texts:
+            return texts
+
+    # Anthropic messages, Cohere v2
+    if isinstance(data.get('content'), list):
+        return _content_text(data['content'])
+    if isinstance(data.get('message'), dict):
+        return _content_text(data['message'].get('content'))
+
+    # Cohere generate
+    if isinstance(data.get('generations'), list):
+        return [g['text'] for g in data['generations'] if isinstance(g, dict) and isinstance(g.get('text'), str)]
+
+    for key in _TEXT_KEYS:
+        value = data.get(key)
+        if isinstance(value, str):
+            return [value]
+        if isinstance(value, (dict, list)):
+            nested = _from_json(value)
+            if nested:
+                return nested
+
+    # Error envelopes: {"error": {"message": ...}}
+    error = data.get('error')
+    if isinstance(error, dict) and isinstance(error.get('message'), str):
+        return [error['message']]
+    if isinstance(error, str):
+        return [error]
+    return []
+
+
+def _from_event_stream(body: str) -> Optional[List[str]]:
+    """Concatenate the text of 'data:' events, or None if this is not an SSE body."""
+    lines = [line[5:].strip() for line in body.splitlines() if line.startswith('data:')]
+    if not lines:
+        return None
+    texts = []
+    for payload in lines:
+        if not payload or payload == '[DONE]':
+            continue
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            continue
+        # Anthropic streams text as content_block_delta events
+        if isinstance(data, dict) and isinstance(data.get('delta'), dict) and 'text' in data['delta']:
+            texts.append(str(data['delta']['text']))
+        else:
+            texts.extend(_from_json(data))
+    return [''.join(texts)]
+
+
+def extract_response_text(body: Optional[str]) -> Optional[str]:
+    """Best-effort assistant text for a raw response body."""
+    if body is None:
+        return None
+    body = str(body)
+    stripped = body.lstrip()
+
+    texts = None
+    if stripped.startswith(('{', '[')):
+        try:
+            texts = _from_json(json.loads(stripped))
+        except ValueError:
+            texts = None
+    elif stripped.startswith(('data:', 'event:')):
+        texts = _from_event_stream(stripped)
+
+    text = '\n'.join(t for t in texts if t) if texts else body
+    return text[:MAX_TEXT_LENGTH]
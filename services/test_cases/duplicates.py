@@ -0,0 +1,70 @@
+# services/test_cases/duplicates.py
+"""
+Duplicate prompt clusters: test cases that share a normalised prompt fingerprint.
+"""
+
+from typing import Any, Dict, List
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+
+from extensions import db
+from models.model_TestCase import TestCase
+
+
+def count_duplicate_clusters() -> Dict[str, int]:
+    """Number of clusters and the number of redundant cases they contain."""
+    cluster_sizes = (
+        select(func.count(TestCase.id).label('size'))
+        .where(TestCase.prompt_fingerprint.isnot(None))
+        .group_by(TestCase.prompt_fingerprint)
+        .having(func.count(TestCase.id) > 1)
+        .subquery()
+    )
+    clusters, cases = db.session.execute(
+        select(func.count(), func.coalesce(func.sum(cluster_sizes.c.size), 0))
+    ).one()
+    return {'clusters': clusters, 'redundant_cases': int(cases) - clusters}
+
+
+def get_duplicate_clusters(page: int = 1, per_page: int = 25) -> List[Dict[str, Any]]:
+    """Largest clusters first, each with its cases and the suites they belong to."""
+    clusters = db.session.execute(
+        select(TestCase.prompt_fingerprint, func.count(TestCase.id).label('size'))
+        .where(TestCase.prompt_fingerprint.isnot(None))
+        .group_by(TestCase.prompt_fingerprint)
+        .having(func.count(TestCase.id) > 1)
+        .order_by(func.count(TestCase.id).desc(), TestCase.prompt_fingerprint)
+        .limit(per_page)
+        .offset((page - 1) * per_page)
+    ).all()
+    if not clusters:
+        return []
+
+    fingerprints = [fp for fp, _ in clusters]
+    cases = (TestCase.query
+             .options(selectinload(TestCase.test_suites))
+             .filter(TestCase.prompt_fingerprint.in_(fingerprints))
+             .order_by(TestCase.id)
+             .all())
+    by_fp: Dict[str, List[TestCase]] = {}
+    for case in cases:
+        by_fp.setdefault(case.prompt_fingerprint, []).append(case)
+
+    return [
+        {
+            'fingerprint': fp,
+            'size': size,
+            'prompt': by_fp[fp][0].prompt if by_fp.get(fp) else '',
+            'cases': [
+                {
+                    'id': case.id,
+                    'prompt': case.prompt,
+                    'source': case.source,
+                    'suites': [{'id': s.id, 'description': s.description} for s in case.test_suites]
+                }
+                for case in by_fp.get(fp, [])
+            ]
+        }
+        for fp, size in clusters
+    ]
@@ -0,0 +1,40 @@
+# services/test_cases/fingerprint.py
+"""
+Prompt hashes and normalised prompt fingerprints.
+
+The prompt hash covers the exact prompt text (only leading and trailing
+whitespace is ignored). It is the key for deduplicating imports and runs:
+case and spacing variants of a prompt are different attacks and are kept.
+
+Two prompts that differ only in Unicode form, letter case or whitespace get
+the same fingerprint. Fingerprints are only used to report near-duplicate
+clusters (services/test_cases/duplicates.py), never to drop or merge cases.
+"""
+
+import re
+import unicodedata
+from typing import Optional
+
+import xxhash
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_prompt(prompt: str) -> str:
+    """NFKC, case-folded, with all whitespace runs collapsed to one space."""
+    text = unicodedata.normalize('NFKC', prompt)
+    return _WHITESPACE.sub(' ', text.casefold()).strip()
+
+
+def prompt_hash(prompt: Optional[str]) -> Optional[str]:
+    """xxh3-128 hex digest of the exact prompt, stripped of surrounding whitespace (32 chars)."""
+    if prompt is None:
+        return None
+    return xxhash.xxh3_128_hexdigest(prompt.strip().encode('utf-8'))
+
+
+def prompt_fingerprint(prompt: Optional[str]) -> Optional[str]:
+    """xxh3-128 hex digest of the normalised prompt (32 chars)."""
+    if prompt is None:
+        return None
+    return xxhash.xxh3_128_hexdigest(normalize_prompt(prompt).encode('utf-8'))
@@ -0,0 +1,233 @@
+# services/test_cases/sampling.py
+"""
+Random test case sampling in SQL.
+
+Only ids are read from the `test_suite_cases` association table, never full
+TestCase rows, so picking a preview prompt or a sample of N cases from a
+huge suite costs an index scan instead of loading the suite into memory.
+
+- One case: a random OFFSET into the (test_suite_id, test_case_id) primary
+  key of the selected suites.
+- A few cases: several random offsets, re-drawn when a case is shared by
+  more than one selected suite.
+- Many cases: `TABLESAMPLE BERNOULLI ... REPEATABLE(seed)` on Postgres, and
+  `ORDER BY random() LIMIT n` over case ids elsewhere.
+
+Stratified plans group the cases by attack_type / nist_risk with one GROUP
+BY and sample each stratum in proportion to its size.
+"""
+
+import logging
+import random
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import bindparam, func, select, text
+
+from extensions import db
+from models.associations import test_suite_cases
+from models.model_TestCase import TestCase
+from models.model_TestSuite import TestSuite
+
+logger = logging.getLogger(__name__)
+
+# Up to this many cases are drawn with individual random offsets
+OFFSET_SAMPLE_MAX = 32
+# Below this many association rows, TABLESAMPLE is not worth it
+TABLESAMPLE_MIN_ROWS = 50_000
+# Rows sampled per wanted case, to absorb variance and shared cases
+TABLESAMPLE_OVERSAMPLE = 3.0
+
+
+def owned_suite_ids(suite_ids: Sequence[int], user_id: Optional[int] = None) -> List[int]:
+    """The subset of suite_ids that exist (and belong to user_id, if given), sorted."""
+    query = select(TestSuite.id).where(TestSuite.id.in_(list(suite_ids)))
+    if user_id is not None:
+        query = query.where(TestSuite.user_id == user_id)
+    return sorted(db.session.scalars(query).all())
+
+
+def suite_case_count(suite_ids: Sequence[int]) -> int:
+    """Number of (suite, case) memberships across the suites; a shared case counts once per suite."""
+    if not suite_ids:
+        return 0
+    return db.session.scalar(
+        select(func.count()).select_from(test_suite_cases)
+        .where(test_suite_cases.c.test_suite_id.in_(list(suite_ids)))
+    ) or 0
+
+
+def _case_id_at(suite_ids: Sequence[int], offset: int) -> Optional[int]:
+    return db.session.scalar(
+        select(test_suite_cases.c.test_case_id)
+        .where(test_suite_cases.c.test_suite_id.in_(list(suite_ids)))
+        .order_by(test_suite_cases.c.test_suite_id, test_suite_cases.c.test_case_id)
+        .offset(offset)
+        .limit(1)
+    )
+
+
+def random_case_id(suite_ids: Sequence[int], rng: Optional[random.Random] = None) -> Optional[int]:
+    """A uniformly chosen case id from the suites (per membership), or None if they are empty."""
+    total = suite_case_count(suite_ids)
+    if not total:
+        return None
+    return _case_id_at(suite_ids, (rng or random).randrange(total))
+
+
+def _all_case_ids(suite_ids: Sequence[int]) -> List[int]:
+    return list(db.session.scalars(
+        select(test_suite_cases.c.test_case_id)
+        .where(test_suite_cases.c.test_suite_id.in_(list(suite_ids)))
+        .distinct()
+        .order_by(test_suite_cases.c.test_case_id)
+    ))
+
+
+def _offset_sample(suite_ids: Sequence[int], n: int, total: int, rng: random.Random) -> List[int]:
+    chosen: List[int] = []
+    seen, tried = set(), set()
+    while len(chosen) < n and len(tried) < total:
+        offset = rng.randrange(total)
+        if offset in tried:
+            continue
+        tried.add(offset)
+        case_id = _case_id_at(suite_ids, offset)
+        if case_id is not None and case_id not in seen:
+            seen.add(case_id)
+            chosen.append(case_id)
+    return chosen
+
+
+def _tablesample(suite_ids: Sequence[int], n: int, total: int, seed: int) -> List[int]:
+    percent = min(100.0, 100.0 * n * TABLESAMPLE_OVERSAMPLE / total)
+    stmt = text(
+        "SELECT DISTINCT test_case_id FROM test_suite_cases "
+        "TABLESAMPLE BERNOULLI (:percent) REPEATABLE (:seed) "
+        "WHERE test_suite_id IN :suite_ids"
+    ).bindparams(bindparam('suite_ids', expanding=True))
+    return list(db.session.scalars(stmt, {'percent': percent, 'seed': seed, 'suite_ids': list(suite_ids)}))
+
+
+def sample_case_ids(suite_ids: Sequence[int], n: int, seed: Optional[int] = None) -> List[int]:
+    """
+    Up to n distinct case ids drawn without replacement from the suites.
+
+    The same seed gives the same sample as long as the suites are unchanged.
+    Returns every case (shuffled) when the suites hold n cases or fewer.
+    """
+    if n <= 0 or not suite_ids:
+        return []
+    total = suite_case_count(suite_ids)
+    if not total:
+        return []
+    rng = random.Random(seed)
+
+    if n >= total:
+        case_ids = _all_case_ids(suite_ids)
+        rng.shuffle(case_ids)
+        return case_ids[:n]
+
+    if n <= OFFSET_SAMPLE_MAX:
+        return _offset_sample(suite_ids, n, total, rng)
+
+    if db.session.get_bind().dialect.name == 'postgresql' and total >= TABLESAMPLE_MIN_ROWS:
+        sampled = _tablesample(suite_ids, n, total, seed if seed is not None else rng.randrange(2 ** 31))
+        if len(sampled) >= n:
+            sampled.sort()
+            return rng.sample(sampled, n)
+        logger.debug(f"Sampling: TABLESAMPLE returned {len(sampled)} of {n} cases, falling back to random()")
+
+    if seed is not None:
+        # SQL random() cannot be seeded portably; sample the (integer-only) id list instead
+        return rng.sample(_all_case_ids(suite_ids), n)
+
+    return list(db.session.scalars(
+        select(test_suite_cases.c.test_case_id)
+        .where(test_suite_cases.c.test_suite_id.in_(list(suite_ids)))
+        .group_by(test_suite_cases.c.test_case_id)
+        .order_by(func.random())
+        .limit(n)
+    ))
+
+
+# ---------------------------------------------------------------------------
+# Stratified samples
+# ---------------------------------------------------------------------------
+
+STRATIFY_FIELDS = ('attack_type', 'nist_risk')
+
+
+def stratum_key(values: Sequence[Optional[str]]) -> str:
+    return '|'.join(v if v else 'none' for v in values)
+
+
+def _allocate(populations: Dict[str, int], total: int) -> Dict[str, int]:
+    """Proportional allocation (largest remainder), at least one case per stratum when possible."""
+    population = sum(populations.values())
+    if total >= population:
+        return dict(populations)
+    allocation = {k: min(p, 1) for k, p in populations.items()} if total >= len(populations) else {k: 0 for k in populations}
+    remaining = total - sum(allocation.values())
+    if remaining <= 0:
+        return allocation
+
+    quotas = {k: remaining * p / population for k, p in populations.items()}
+    for key, quota in quotas.items():
+        allocation[key] = min(populations[key], allocation[key] + int(quota))
+    leftover = total - sum(allocation.values())
+    by_remainder = sorted(quotas, key=lambda k: quotas[k] - int(quotas[k]), reverse=True)
+    while leftover > 0:
+        progressed = False
+        for key in by_remainder:
+            if leftover and allocation[key] < populations[key]:
+                allocation[key] += 1
+                leftover -= 1
+                progressed = True
+        if not progressed:
+            break
+    return allocation
+
+
+def stratified_sample_plan(suite_ids: Sequence[int], max_cases: int, fields: Sequence[str] = STRATIFY_FIELDS,
+                           seed: Optional[int] = None) -> Dict:
+    """
+    A proportional stratified sample of up to max_cases distinct cases.
+
+    Returns {'fields', 'strata': {key: {'population', 'planned'}}, 'order': [[case_id, key], ...]}
+    where 'order' interleaves the strata so that any prefix of it is itself
+    close to proportional; sample runs dispatch it in waves and may stop early.
+    """
+    columns = [getattr(TestCase, field) for field in fields]
+    member_ids = (select(test_suite_cases.c.test_case_id)
+                  .where(test_suite_cases.c.test_suite_id.in_(list(suite_ids))))
+    rows = db.session.execute(
+        select(*columns, func.count(TestCase.id))
+        .where(TestCase.id.in_(member_ids))
+        .group_by(*columns)
+    ).all()
+    populations = {stratum_key(row[:-1]): row[-1] for row in rows}
+    values_by_key = {stratum_key(row[:-1]): row[:-1] for row in rows}
+    allocation = _allocate(populations, max_cases)
+
+    rng = random.Random(seed)
+    keyed = []
+    for key, planned in allocation.items():
+        if not planned:
+            continue
+        conditions = [col.is_(None) if value is None else col == value
+                      for col, value in zip(columns, values_by_key[key])]
+        stratum_ids = select(TestCase.id).where(TestCase.id.in_(member_ids), *conditions)
+        if seed is not None:
+            ids = rng.sample(sorted(db.session.scalars(stratum_ids)), planned)
+        else:
+            ids = list(db.session.scalars(stratum_ids.order_by(func.random()).limit(planned)))
+        # Systematic interleave: the j-th case of a stratum sits at position (j + u) / planned
+        offset = rng.random()
+        keyed.extend(((j + offset) / planned, case_id, key) for j, case_id in enumerate(ids))
+    keyed.sort()
+
+    return {
+        'fields': list(fields),
+        'strata': {key: {'population': populations[key], 'planned': allocation[key]} for key in populations},
+        'order': [[case_id, key] for _, case_id, key in keyed]
+    }
@@ -0,0 +1,285 @@
+# services/test_cases/search.py
+"""
+Indexed search over test case prompts.
+
+Postgres uses a GIN index on to_tsvector('english', prompt) for ranked word
+matches and a pg_trgm GIN index so substring matches (ILIKE) are index scans
+as well. SQLite uses an external-content FTS5 table kept in sync by triggers.
+Other databases, or a database where the index has not been created, fall
+back to a plain ILIKE scan.
+
+Results are ordered by relevance and paginated with an opaque keyset cursor
+(score, id), so deep pages cost the same as the first one.
+"""
+
+import base64
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, literal_column, or_, select, text
+from sqlalchemy.orm import selectinload
+
+from extensions import db
+from models.model_TestCase import TestCase
+
+logger = logging.getLogger(__name__)
+
+FACET_FIELDS = ('attack_type', 'nist_risk')
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 200
+
+FTS_TABLE = 'test_cases_fts'
+PG_TSVECTOR_INDEX = 'ix_test_cases_prompt_tsv'
+PG_TRGM_INDEX = 'ix_test_cases_prompt_trgm'
+
+# Must match the index expression exactly for Postgres to use it
+_PG_VECTOR = "to_tsvector('english'::regconfig, coalesce(test_cases.prompt, ''))"
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_backend_cache: Dict[str, str] = {}
+
+
+class SearchError(ValueError):
+    """Raised for invalid search parameters (bad cursor or facet)."""
+
+
+# ---------------------------------------------------------------------------
+# Index management
+# ---------------------------------------------------------------------------
+
+def create_search_index(connection) -> None:
+    """Create the search index for the connection's dialect (idempotent)."""
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {PG_TSVECTOR_INDEX} ON test_cases "
+            f"USING gin (to_tsvector('english'::regconfig, coalesce(prompt, '')))"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {PG_TRGM_INDEX} ON test_cases USING gin (prompt gin_trgm_ops)"
+        ))
+    elif dialect == 'sqlite':
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"prompt, content='test_cases', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS test_cases_fts_ai AFTER INSERT ON test_cases BEGIN "
+            f"INSERT INTO {FTS_TABLE}(rowid, prompt) VALUES (new.id, new.prompt); END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS test_cases_fts_ad AFTER DELETE ON test_cases BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, prompt) VALUES ('delete', old.id, old.prompt); END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS test_cases_fts_au AFTER UPDATE OF prompt ON test_cases BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, prompt) VALUES ('delete', old.id, old.prompt); "
+            f"INSERT INTO {FTS_TABLE}(rowid, prompt) VALUES (new.id, new.prompt); END"
+        ))
+        connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    else:
+        logger.warning(f"PromptSearch: no search index available for dialect '{dialect}'")
+    _backend_cache.clear()
+
+
+def drop_search_index(connection) -> None:
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        connection.execute(text(f"DROP INDEX IF EXISTS {PG_TRGM_INDEX}"))
+        connection.execute(text(f"DROP INDEX IF EXISTS {PG_TSVECTOR_INDEX}"))
+    elif dialect == 'sqlite':
+        for trigger in ('test_cases_fts_ai', 'test_cases_fts_ad', 'test_cases_fts_au'):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+    _backend_cache.clear()
+
+
+def get_search_backend() -> str:
+    """'postgres', 'fts5' or 'like', depending on the dialect and whether the index exists."""
+    bind = db.session.get_bind()
+    key = str(bind.url)
+    if key in _backend_cache:
+        return _backend_cache[key]
+
+    backend = 'like'
+    try:
+        if bind.dialect.name == 'postgresql':
+            found = db.session.execute(
+                text("SELECT 1 FROM pg_indexes WHERE indexname = :name"), {'name': PG_TSVECTOR_INDEX}
+            ).first()
+            backend = 'postgres' if found else 'like'
+        elif bind.dialect.name == 'sqlite':
+            found = db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE}
+            ).first()
+            backend = 'fts5' if found else 'like'
+    except Exception as e:
+        logger.warning(f"PromptSearch: could not detect search index, using ILIKE: {e}")
+
+    if backend == 'like':
+        logger.info("PromptSearch: search index not found, falling back to ILIKE (run `flask rebuild-search-index`)")
+    _backend_cache[key] = backend
+    return backend
+
+
+# ---------------------------------------------------------------------------
+# Cursors
+# ---------------------------------------------------------------------------
+
+def encode_cursor(score: Optional[float], case_id: int) -> str:
+    raw = json.dumps([score, case_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[Optional[float], int]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        score, case_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return (float(score) if score is not None else None), int(case_id)
+    except (ValueError, TypeError):
+        raise SearchError("Invalid cursor")
+
+
+# ---------------------------------------------------------------------------
+# Query building
+# ---------------------------------------------------------------------------
+
+def like_pattern(query: str) -> str:
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def fts5_match_query(query: str) -> Optional[str]:
+    """Quote each word and prefix-match the last one: foo ba -> "foo" "ba"*"""
+    tokens = _TOKEN_RE.findall(query)
+    if not tokens:
+        return None
+    quoted = [f'"{t}"' for t in tokens]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def _facet_conditions(facets: Dict[str, Any], skip: Optional[str] = None) -> List:
+    conditions = []
+    for field, value in facets.items():
+        if field == skip or value in (None, '', []):
+            continue
+        if field not in FACET_FIELDS:
+            raise SearchError(f"Unknown facet '{field}'")
+        values = value if isinstance(value, (list, tuple)) else [value]
+        conditions.append(getattr(TestCase, field).in_(values))
+    return conditions
+
+
+def _scored_select(query: str, backend: str):
+    """
+    Select (id, score) for cases matching the query, or None if nothing can match.
+    Higher scores are better.
+    """
+    if not query:
+        return select(TestCase.id.label('id'), literal_column('NULL').label('score'))
+
+    if backend == 'postgres':
+        vector = literal_column(_PG_VECTOR)
+        ts_query = func.websearch_to_tsquery(literal_column("'english'::regconfig"), query)
+        score = (func.ts_rank_cd(vector, ts_query) + func.word_similarity(query, TestCase.prompt))
+        return (select(TestCase.id.label('id'), score.label('score'))
+                .where(or_(vector.op('@@')(ts_query),
+                           TestCase.prompt.ilike(like_pattern(query), escape='\\'))))
+
+    if backend == 'fts5':
+        match = fts5_match_query(query)
+        if match is None:
+            return None
+        fts = text(
+            f"SELECT rowid AS id, -bm25({FTS_TABLE}) AS score FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+        ).bindparams(match=match).columns(id=db.Integer, score=db.Float).subquery('fts')
+        return select(fts.c.id, fts.c.score).join(TestCase, TestCase.id == fts.c.id)
+
+    return (select(TestCase.id.label('id'), literal_column('NULL').label('score'))
+            .where(TestCase.prompt.ilike(like_pattern(query), escape='\\')))
+
+
+def search_test_cases(query: str = '', facets: Optional[Dict[str, Any]] = None,
+                      cursor: Optional[str] = None, limit: int = DEFAULT_LIMIT,
+                      include_facets: bool = False) -> Dict[str, Any]:
+    """
+    Ranked, faceted search with keyset pagination.
+
+    Returns {'items': [TestCase], 'scores': {id: score}, 'next_cursor', 'backend', 'facets'}.
+    Without a query the cases are listed newest first.
+    """
+    query = (query or '').strip()
+    facets = facets or {}
+    limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+    backend = get_search_backend()
+
+    scored = _scored_select(query, backend)
+    if scored is None:
+        return {'items': [], 'scores': {}, 'next_cursor': None, 'backend': backend,
+                'facets': {f: {} for f in FACET_FIELDS} if include_facets else None}
+
+    conditions = _facet_conditions(facets)
+    ranked = scored.where(*conditions).subquery('ranked') if conditions else scored.subquery('ranked')
+    has_score = bool(query) and backend != 'like'
+
+    stmt = select(ranked.c.id, ranked.c.score)
+    after = decode_cursor(cursor)
+    if after is not None:
+        last_score, last_id = after
+        if has_score and last_score is not None:
+            stmt = stmt.where(or_(ranked.c.score < last_score,
+                                  and_(ranked.c.score == last_score, ranked.c.id < last_id)))
+        else:
+            stmt = stmt.where(ranked.c.id < last_id)
+    if has_score:
+        stmt = stmt.order_by(ranked.c.score.desc(), ranked.c.id.desc())
+    else:
+        stmt = stmt.order_by(ranked.c.id.desc())
+
+    rows = db.session.execute(stmt.limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.score if has_score else None, last.id)
+
+    ids = [row.id for row in rows]
+    cases = {c.id: c for c in TestCase.query.options(selectinload(TestCase.test_suites))
+             .filter(TestCase.id.in_(ids)).all()} if ids else {}
+
+    return {
+        'items': [cases[i] for i in ids if i in cases],
+        'scores': {row.id: row.score for row in rows} if has_score else {},
+        'next_cursor': next_cursor,
+        'backend': backend,
+        'facets': facet_counts(query, facets, backend) if include_facets else None
+    }
+
+
+def facet_counts(query: str, facets: Dict[str, Any], backend: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """Counts per facet value among matching cases, applying every other facet's filter."""
+    backend = backend or get_search_backend()
+    scored = _scored_select((query or '').strip(), backend)
+    counts: Dict[str, Dict[str, int]] = {}
+    for field in FACET_FIELDS:
+        if scored is None:
+            counts[field] = {}
+            continue
+        matching = scored.where(*_facet_conditions(facets, skip=field)).subquery('matching')
+        column = getattr(TestCase, field)
+        rows = db.session.execute(
+            select(column, func.count())
+            .select_from(TestCase)
+            .join(matching, matching.c.id == TestCase.id)
+            .group_by(column)
+            .order_by(func.count().desc())
+        ).all()
+        counts[field] = {value if value is not None else 'none': count for value, count in rows}
+    return counts
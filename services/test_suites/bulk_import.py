@@ -0,0 +1,407 @@
+# services/test_suites/bulk_import.py
+"""
+Bulk import of test suites.
+
+Supported inputs:
+  * v1.0 JSON   - {"version": "1.0", "test_suites": [{..., "test_cases": [...]}]}
+  * JSONL       - one test case per line: {"prompt": ..., "suite": ..., "behavior": ..., ...}
+  * CSV         - header row with the same column names as JSONL
+
+JSONL and CSV are parsed incrementally. Test cases and their suite
+association rows are inserted with multi-row INSERTs in batches instead of
+one ORM object at a time. A row whose exact prompt (ignoring surrounding
+whitespace) and metadata match a case already in one of the importing user's
+suites is linked to that TestCase instead of being stored again.
+"""
+
+import csv
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select, tuple_
+
+from extensions import db
+from models.associations import test_suite_cases
+from models.model_TestCase import TestCase
+from models.model_TestSuite import TestSuite
+from services.test_cases.fingerprint import prompt_fingerprint, prompt_hash
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ('json', 'jsonl', 'csv')
+DEFAULT_BATCH_SIZE = 2000
+
+SUITE_COLUMNS = ('suite', 'description', 'suite_description')  # accepted names for the suite column
+# A row is only linked to an existing case when all of these match
+LINK_COLUMNS = ('prompt_hash', 'source', 'attack_type', 'data_type', 'nist_risk', 'reviewed')
+
+
+class ImportFormatError(ValueError):
+    """Raised when an import file cannot be parsed."""
+
+
+class DuplicateSuitesError(Exception):
+    """Raised when suites in the import already exist and force was not requested."""
+
+    def __init__(self, duplicates: List[Dict[str, Any]]):
+        super().__init__(f"{len(duplicates)} duplicate test suite(s) found")
+        self.duplicates = duplicates
+
+
+def detect_format(filename: str) -> Optional[str]:
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    extension = {'ndjson': 'jsonl'}.get(extension, extension)
+    return extension if extension in IMPORT_FORMATS else None
+
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y')
+
+
+def _case_values(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Normalise a raw row into TestCase column values; None if it has no prompt."""
+    prompt = data.get('prompt')
+    if prompt is None or not str(prompt).strip():
+        return None
+    return {
+        'prompt': str(prompt),
+        'prompt_hash': prompt_hash(str(prompt)),
+        'prompt_fingerprint': prompt_fingerprint(str(prompt)),
+        'source': data.get('source') or None,
+        'attack_type': data.get('attack_type') or None,
+        'data_type': data.get('data_type') or None,
+        'nist_risk': data.get('nist_risk') or None,
+        'reviewed': _as_bool(data.get('reviewed', False))
+    }
+
+
+def _suite_key(data: Dict[str, Any], default_description: Optional[str]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    description = next((data[c] for c in SUITE_COLUMNS if data.get(c)), None) or default_description
+    return description, data.get('behavior') or None, data.get('objective') or None
+
+
+# --- Parsers: each yields (suite_key, raw_case_dict) -------------------------
+
+def iter_v1_json(import_data: Dict[str, Any]) -> Iterator[Tuple[tuple, Dict[str, Any]]]:
+    """Rows from an already-parsed v1.0 document ('test_suites' array or single 'test_suite')."""
+    if import_data.get('version') != '1.0':
+        raise ImportFormatError('Unsupported file version')
+    if 'test_suites' in import_data:
+        suites = import_data['test_suites']
+    elif 'test_suite' in import_data:
+        suites = [import_data['test_suite']]
+    else:
+        raise ImportFormatError('Invalid file format')
+
+    for suite_data in suites:
+        if not suite_data.get('description'):
+            raise ImportFormatError('Every test suite needs a description')
+        key = (suite_data['description'], suite_data.get('behavior'), suite_data.get('objective'))
+        for case_data in suite_data.get('test_cases', []):
+            yield key, case_data
+
+
+def iter_jsonl(lines: Iterable[str], default_description: Optional[str]) -> Iterator[Tuple[tuple, Dict[str, Any]]]:
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ImportFormatError(f"Line {line_no}: invalid JSON ({e.msg})")
+        if not isinstance(data, dict):
+            raise ImportFormatError(f"Line {line_no}: expected a JSON object")
+        yield _suite_key(data, default_description), data
+
+
+def iter_csv(lines: Iterable[str], default_description: Optional[str]) -> Iterator[Tuple[tuple, Dict[str, Any]]]:
+    reader = csv.DictReader(lines)
+    if not reader.fieldnames or 'prompt' not in reader.fieldnames:
+        raise ImportFormatError("CSV file needs a header row with a 'prompt' column")
+    for data in reader:
+        yield _suite_key(data, default_description), data
+
+
+def _link_key(values: Dict[str, Any]) -> tuple:
+    return tuple(values[column] for column in LINK_COLUMNS)
+
+
+def suite_prompt_hashes(suites: Iterable[Dict[str, Any]]) -> List[Tuple[str, Optional[str], List[Optional[str]]]]:
+    """(description, behavior, prompt hashes) for each suite of a v1.0 document."""
+    return [
+        (s.get('description'), s.get('behavior'),
+         [prompt_hash(str(c['prompt'])) for c in s.get('test_cases', []) if c.get('prompt')])
+        for s in suites
+    ]
+
+
+# --- Bulk writer ---------------------------------------------------------------
+
+class BulkSuiteImporter:
+    """
+    Resolves suites (creating them once) and inserts cases in batches.
+
+    The caller owns the transaction; flush_batch() is the natural commit point.
+    """
+
+    def __init__(self, user_id: int, force: bool = False, batch_size: int = DEFAULT_BATCH_SIZE,
+                 dedupe: bool = True):
+        self.user_id = user_id
+        self.force = force
+        self.batch_size = batch_size
+        self.dedupe = dedupe
+        self.suite_ids: Dict[tuple, Optional[int]] = {}  # (description, behavior) -> id (None = skipped duplicate)
+        self.created_suite_ids: List[int] = []
+        self.duplicates: List[Dict[str, Any]] = []
+        self.pending: List[Tuple[int, Dict[str, Any]]] = []
+        self.cases_imported = 0
+        self.cases_reused = 0
+        self.rows_skipped = 0
+
+    def check_duplicates(self, keys: Iterable[tuple]) -> List[Dict[str, Any]]:
+        """Existing suites matching any (description, behavior) pair, in a single query."""
+        pairs = {(k[0], k[1]) for k in keys}
+        if not pairs:
+            return []
+        existing = TestSuite.query.with_entities(
+            TestSuite.id, TestSuite.description, TestSuite.behavior
+        ).filter(tuple_(TestSuite.description, TestSuite.behavior).in_(list(pairs))).all()
+        # NULL behaviors never match an IN list; look those up separately
+        null_descriptions = [d for d, b in pairs if b is None]
+        if null_descriptions:
+            existing += TestSuite.query.with_entities(
+                TestSuite.id, TestSuite.description, TestSuite.behavior
+            ).filter(TestSuite.description.in_(null_descriptions), TestSuite.behavior.is_(None)).all()
+        return [{'description': d, 'behavior': b, 'existing_id': i} for i, d, b in existing]
+
+    def check_content_duplicates(self, suites: Iterable[Tuple[str, Optional[str], Iterable[Optional[str]]]]) -> List[Dict[str, Any]]:
+        """
+        Existing suites holding exactly the same set of prompts as an imported
+        suite, whatever their description. suites: (description, behavior, prompt hashes).
+        """
+        wanted = [(d, b, frozenset(f for f in fps if f)) for d, b, fps in suites]
+        wanted = [w for w in wanted if w[2]]
+        all_fps = set().union(*(fps for _, _, fps in wanted)) if wanted else set()
+        if not all_fps:
+            return []
+
+        # Suites whose cases cover some of the prompts: how many distinct ones, and which
+        rows = db.session.execute(
+            select(test_suite_cases.c.test_suite_id, TestCase.prompt_hash)
+            .join(TestCase, TestCase.id == test_suite_cases.c.test_case_id)
+            .where(TestCase.prompt_hash.in_(all_fps))
+        ).all()
+        suite_fps: Dict[int, set] = {}
+        for suite_id, fp in rows:
+            suite_fps.setdefault(suite_id, set()).add(fp)
+        if not suite_fps:
+            return []
+
+        # ...and their total size, so a superset suite does not count as a duplicate
+        sizes = dict(db.session.execute(
+            select(test_suite_cases.c.test_suite_id, func.count(test_suite_cases.c.test_case_id))
+            .where(test_suite_cases.c.test_suite_id.in_(list(suite_fps)))
+            .group_by(test_suite_cases.c.test_suite_id)
+        ).all())
+
+        duplicates = []
+        for description, behavior, fps in wanted:
+            for suite_id, existing_fps in suite_fps.items():
+                if existing_fps == fps and sizes.get(suite_id) == len(fps):
+                    duplicates.append({
+                        'description': description,
+                        'behavior': behavior,
+                        'existing_id': suite_id,
+                        'match': 'content'
+                    })
+                    break
+        return duplicates
+
+    def resolve_suite(self, key: tuple) -> Optional[int]:
+        """
+        Suite id for a (description, behavior, objective) key, creating the suite on first use.
+
+        Suites are identified by (description, behavior); the objective of the first row wins.
+        """
+        description, behavior, objective = key
+        if (description, behavior) in self.suite_ids:
+            return self.suite_ids[(description, behavior)]
+
+        if not description:
+            raise ImportFormatError("Row has no suite description and no default suite was given")
+
+        if not self.force:
+            duplicates = self.check_duplicates([key])
+            if duplicates:
+                self.duplicates.extend(duplicates)
+                self.suite_ids[(description, behavior)] = None
+                return None
+
+        suite = TestSuite(description=description, behavior=behavior, objective=objective, user_id=self.user_id)
+        db.session.add(suite)
+        db.session.flush()
+        self.suite_ids[(description, behavior)] = suite.id
+        self.created_suite_ids.append(suite.id)
+        return suite.id
+
+    def add(self, key: tuple, raw_case: Dict[str, Any]) -> bool:
+        """Queue one case; returns True when a batch is ready to flush."""
+        suite_id = self.resolve_suite(key)
+        values = _case_values(raw_case)
+        if suite_id is None or values is None:
+            self.rows_skipped += 1
+            return False
+        self.pending.append((suite_id, values))
+        return len(self.pending) >= self.batch_size
+
+    def flush_batch(self) -> int:
+        """
+        INSERT the queued cases and their association rows. Returns cases written.
+
+        With dedupe enabled, a row whose exact prompt and metadata (LINK_COLUMNS)
+        match a case in one of the user's suites, or an earlier row of this
+        import, is linked to that TestCase instead. Rows that differ in any of
+        them become new cases, so no imported prompt or metadata is dropped.
+        """
+        if not self.pending:
+            return 0
+
+        existing: Dict[tuple, int] = {}
+        if self.dedupe:
+            hashes = {values['prompt_hash'] for _, values in self.pending}
+            user_cases = (
+                select(test_suite_cases.c.test_case_id)
+                .join(TestSuite, TestSuite.id == test_suite_cases.c.test_suite_id)
+                .where(TestSuite.user_id == self.user_id)
+            )
+            rows = db.session.execute(
+                select(TestCase.id, *(getattr(TestCase, column) for column in LINK_COLUMNS))
+                .where(TestCase.prompt_hash.in_(hashes), TestCase.id.in_(user_cases))
+                .order_by(TestCase.id)
+            ).all()
+            for case_id, *key in rows:
+                existing.setdefault(tuple(key), case_id)
+
+        new_rows, seen = [], set()
+        for _, values in self.pending:
+            key = _link_key(values)
+            if self.dedupe and (key in existing or key in seen):
+                continue
+            seen.add(key)
+            new_rows.append(values)
+
+        new_ids = []
+        if new_rows:
+            new_ids = db.session.scalars(
+                insert(TestCase).returning(TestCase.id, sort_by_parameter_order=True),
+                new_rows
+            ).all()
+
+        links, reused_pairs = [], set()
+        if self.dedupe:
+            reused_keys = set(existing)
+            existing.update((_link_key(values), case_id) for values, case_id in zip(new_rows, new_ids))
+            pairs = []
+            for suite_id, values in self.pending:
+                key = _link_key(values)
+                pairs.append((suite_id, existing[key]))
+                if key in reused_keys:
+                    reused_pairs.add((suite_id, existing[key]))
+            # Reused cases may already be linked to the suite
+            if reused_pairs:
+                already_linked = set(db.session.execute(
+                    select(test_suite_cases.c.test_suite_id, test_suite_cases.c.test_case_id)
+                    .where(tuple_(test_suite_cases.c.test_suite_id, test_suite_cases.c.test_case_id).in_(list(reused_pairs)))
+                ).all())
+            else:
+                already_linked = set()
+            linked = set(already_linked)
+            for pair in pairs:
+                if pair not in linked:
+                    linked.add(pair)
+                    links.append(pair)
+        else:
+            links = [(suite_id, case_id) for (suite_id, _), case_id in zip(self.pending, new_ids)]
+
+        if links:
+            db.session.execute(
+                insert(test_suite_cases),
+                [{'test_suite_id': s, 'test_case_id': c} for s, c in links]
+            )
+
+        written = len(new_ids)
+        self.cases_imported += written
+        self.cases_reused += len(self.pending) - written
+        self.pending = []
+        return written
+
+
+def import_rows(rows: Iterable[Tuple[tuple, Dict[str, Any]]], importer: BulkSuiteImporter,
+                on_batch: Optional[Callable[[BulkSuiteImporter], None]] = None) -> BulkSuiteImporter:
+    """Feed parsed rows through the importer, calling on_batch after every flushed batch."""
+    for key, raw_case in rows:
+        if importer.add(key, raw_case):
+            importer.flush_batch()
+            if on_batch:
+                on_batch(importer)
+    importer.flush_batch()
+    if on_batch:
+        on_batch(importer)
+    return importer
+
+
+def _counting_lines(binary_file, counter: List[int]) -> Iterator[str]:
+    """Decode a binary file line by line while tracking bytes consumed."""
+    first = True
+    for raw_line in binary_file:
+        counter[0] += len(raw_line)
+        line = raw_line.decode('utf-8-sig' if first else 'utf-8')
+        first = False
+        yield line
+
+
+def import_file(file_path: str, file_format: str, importer: BulkSuiteImporter,
+                default_description: Optional[str] = None,
+                on_progress: Optional[Callable[[BulkSuiteImporter, int], None]] = None) -> BulkSuiteImporter:
+    """
+    Import a file from disk. on_progress(importer, bytes_read) is called after each batch.
+
+    v1.0 JSON has no incremental parser in our dependencies, so it is loaded in
+    one go; JSONL and CSV stream line by line.
+    """
+    bytes_read = [0]
+
+    def on_batch(imp):
+        if on_progress:
+            on_progress(imp, bytes_read[0])
+
+    with open(file_path, 'rb') as f:
+        if file_format == 'json':
+            raw = f.read()
+            bytes_read[0] = len(raw)
+            try:
+                import_data = json.loads(raw)
+            except json.JSONDecodeError:
+                raise ImportFormatError('Invalid JSON file')
+            del raw
+            if not importer.force:
+                suites = import_data.get('test_suites', [import_data.get('test_suite', {})])
+                duplicates = importer.check_duplicates((s.get('description'), s.get('behavior')) for s in suites)
+                duplicates += importer.check_content_duplicates(suite_prompt_hashes(suites))
+                if duplicates:
+                    raise DuplicateSuitesError(duplicates)
+                # Checked up front; suites repeated within the file are merged, not skipped
+                importer.force = True
+            rows = iter_v1_json(import_data)
+        elif file_format == 'jsonl':
+            rows = iter_jsonl(_counting_lines(f, bytes_read), default_description)
+        elif file_format == 'csv':
+            rows = iter_csv(_counting_lines(f, bytes_read), default_description)
+        else:
+            raise ImportFormatError(f"Unsupported import format '{file_format}'")
+
+        return import_rows(rows, importer, on_batch)
@@ -0,0 +1,118 @@
+# services/test_suites/export.py
+"""
+Streaming export of test suites.
+
+All suites and their cases are read with one outer-join query using
+`yield_per`, and written out incrementally as the v1.0 JSON document or as
+JSONL (one test case per line, the same shape bulk_import accepts).
+"""
+
+import json
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import select
+
+from extensions import db
+from models.associations import test_suite_cases
+from models.model_TestCase import TestCase
+from models.model_TestSuite import TestSuite
+
+DEFAULT_BATCH_SIZE = 1000
+
+CASE_COLUMNS = ('prompt', 'source', 'attack_type', 'data_type', 'nist_risk', 'reviewed')
+
+
+def iter_suite_case_rows(suite_ids: Optional[Iterable[int]] = None, batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    Yield flat (suite..., case...) rows ordered by suite, using a server-side cursor.
+
+    Suites without cases appear once with all case columns set to None.
+    """
+    stmt = (
+        select(
+            TestSuite.id, TestSuite.description, TestSuite.behavior, TestSuite.objective,
+            TestCase.id.label('case_id'),
+            *(getattr(TestCase, c) for c in CASE_COLUMNS)
+        )
+        .select_from(TestSuite)
+        .outerjoin(test_suite_cases, test_suite_cases.c.test_suite_id == TestSuite.id)
+        .outerjoin(TestCase, TestCase.id == test_suite_cases.c.test_case_id)
+        .order_by(TestSuite.id, TestCase.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if suite_ids is not None:
+        stmt = stmt.where(TestSuite.id.in_(list(suite_ids)))
+    yield from db.session.execute(stmt)
+
+
+def _case_dict(row) -> dict:
+    return {c: getattr(row, c) for c in CASE_COLUMNS}
+
+
+def stream_v1_json(rows) -> Iterator[str]:
+    """Write the v1.0 export document ('test_suites' array) chunk by chunk."""
+    yield '{"version": "1.0", "exported_at": %s, "test_suites": [' % json.dumps(datetime.utcnow().isoformat())
+
+    current_suite_id = None
+    first_case = True
+    for row in rows:
+        if row.id != current_suite_id:
+            prefix = ']},' if current_suite_id is not None else ''
+            suite_header = json.dumps({
+                'description': row.description,
+                'behavior': row.behavior,
+                'objective': row.objective
+            })[:-1]  # reopen the object to append test_cases
+            yield f'{prefix}{suite_header}, "test_cases": ['
+            current_suite_id = row.id
+            first_case = True
+        if row.case_id is not None:
+            yield ('' if first_case else ',') + json.dumps(_case_dict(row))
+            first_case = False
+
+    if current_suite_id is not None:
+        yield ']}'
+    yield ']}'
+
+
+def stream_jsonl(rows) -> Iterator[str]:
+    """One test case per line with its suite fields; suites without cases are omitted."""
+    for row in rows:
+        if row.case_id is None:
+            continue
+        data = _case_dict(row)
+        data.update({'suite': row.description, 'behavior': row.behavior, 'objective': row.objective})
+        yield json.dumps(data) + '\n'
+
+
+def gzip_stream(chunks: Iterable[str], min_chunk_bytes: int = 64 * 1024) -> Iterator[bytes]:
+    """gzip-compress a text stream incrementally, emitting roughly min_chunk_bytes at a time."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    buffered = []
+    size = 0
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            buffered.append(data)
+            size += len(data)
+        if size >= min_chunk_bytes:
+            yield b''.join(buffered)
+            buffered, size = [], 0
+    buffered.append(compressor.flush())
+    yield b''.join(buffered)
+
+
+def batch_text(chunks: Iterable[str], min_chunk_chars: int = 64 * 1024) -> Iterator[str]:
+    """Coalesce many small text chunks so the response is not one write per case."""
+    buffered = []
+    size = 0
+    for chunk in chunks:
+        buffered.append(chunk)
+        size += len(chunk)
+        if size >= min_chunk_chars:
+            yield ''.join(buffered)
+            buffered, size = [], 0
+    if buffered:
+        yield ''.join(buffered)
@@ -139,8 +139,14 @@ $(document).ready(function(){
         // If the final event, show a final message and close.
         if (data.final) {
            var finalMsg = `Process completed. Best result from ${data.attempts_log ? data.attempts_log.length : 'N/A'} attempts.`;
+           if (data.seed !== undefined) {
+               finalMsg += ` Seed: ${data.seed}.`;
+           }
+           if (data.stopped_early) {
+               finalMsg += ' Stopped early after reaching the success score.';
+           }
            if(data.best_prompt && data.best_response) {
-               finalMsg += `<br><br><strong>Best Prompt:</strong><pre>${data.best_prompt}</pre><strong>Best Response:</strong><pre>${data.best_response}</pre>`;
+               finalMsg += `<br><br><strong>Best Prompt (score ${data.best_score}):</strong><pre>${escapeHtml(data.best_prompt)}</pre><strong>Best Response:</strong><pre>${escapeHtml(data.best_response)}</pre>`;
            }
            $('#chat_log').append(`<div class="chat-row left"><div class="chat-bubble final-message">${finalMsg}</div></div>`);
            closeEventSource(); // Close the connection
@@ -158,7 +164,8 @@ $(document).ready(function(){
             chatHtml += '<div class="chat-row left"><div class="chat-bubble"><strong>Sent (Prompt):</strong><pre>' + escapeHtml(data.prompt) + '</pre></div></div>';
         }
         if (data.response !== undefined) {
-             chatHtml += '<div class="chat-row right"><div class="chat-bubble"><strong>Received (Response):</strong><pre>' + escapeHtml(data.response) + '</pre></div></div>';
+             var scoreText = data.score !== undefined ? ' (score ' + data.score + ')' : '';
+             chatHtml += '<div class="chat-row right"><div class="chat-bubble' + (data.is_successful ? ' success' : '') + '"><strong>Received (Response)' + scoreText + ':</strong><pre>' + escapeHtml(data.response) + '</pre></div></div>';
         }
 
         if (chatHtml) { // Only append if there's content
@@ -5,6 +5,9 @@
 
 let importData = null; // Holds the data from the imported JSON file
 
+// JSON files above this size (and all JSONL/CSV files) are imported as a background job
+const BACKGROUND_IMPORT_THRESHOLD_BYTES = 5 * 1024 * 1024;
+
 document.addEventListener('DOMContentLoaded', function() {
   // Initialize filter config for the suites table
   // Assumes filterCommon.js is loaded and window.initializeFilter is available
@@ -77,6 +80,13 @@ function handleFileSelect(inputElement) {
   }
 
   const file = inputElement.files[0];
+  const extension = file.name.split('.').pop().toLowerCase();
+  if (extension !== 'json' || file.size > BACKGROUND_IMPORT_THRESHOLD_BYTES) {
+    startBackgroundImport(file);
+    inputElement.value = '';
+    return;
+  }
+
   const reader = new FileReader();
 
   reader.onload = function(e) {
@@ -237,4 +247,65 @@ async function importSelectedSuites() {
   } finally {
     closeImportModal();
   }
-}
\ No newline at end of file
+}
+
+async function startBackgroundImport(file) {
+  const formData = new FormData();
+  formData.append('file', file);
+
+  const extension = file.name.split('.').pop().toLowerCase();
+  if (extension !== 'json') {
+    const suiteDescription = prompt(
+      'Suite name for rows without a "suite" column (leave empty if every row has one):',
+      file.name.replace(/\.[^.]+$/, '')
+    );
+    if (suiteDescription === null) {
+      return; // Cancelled
+    }
+    formData.append('suite_description', suiteDescription);
+  }
+
+  try {
+    const response = await fetch('/test_suites/import_jobs', {
+      method: 'POST',
+      headers: { 'X-CSRFToken': csrfToken },
+      body: formData
+    });
+    const result = await response.json();
+    if (!response.ok) {
+      alert(`Error starting import: ${result.message || result.error || 'An unknown error occurred.'}`);
+      return;
+    }
+    pollImportJob(result.status_url);
+  } catch (error) {
+    alert('An error occurred while uploading the file: ' + error.message);
+    console.error("Background import upload error:", error);
+  }
+}
+
+async function pollImportJob(statusUrl) {
+  try {
+    const response = await fetch(statusUrl);
+    const job = await response.json();
+
+    if (job.status === 'completed') {
+      let message = `Imported ${job.cases_imported} test case(s) into ${job.suite_ids.length} suite(s).`;
+      if (job.duplicates.length) {
+        message += `\nSkipped ${job.duplicates.length} suite(s) that already exist.`;
+      }
+      alert(message);
+      window.location.reload();
+      return;
+    }
+    if (job.status === 'failed') {
+      alert(`Import failed: ${job.error_message || 'Unknown error'}`);
+      return;
+    }
+
+    console.log(`Import ${job.id}: ${job.progress_percentage}% (${job.cases_imported} cases)`);
+    setTimeout(() => pollImportJob(statusUrl), 2000);
+  } catch (error) {
+    console.error("Import status polling error:", error);
+    setTimeout(() => pollImportJob(statusUrl), 5000);
+  }
+}
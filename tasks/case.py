@@ -4,7 +4,8 @@
 import json
 import logging
 import traceback 
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 
 from celery_app import celery 
 from tasks.base import ContextTask 
@@ -16,9 +17,16 @@ from models.model_TestRun import TestRun
 from models.model_Endpoints import Endpoint
 from models.model_APIChain import APIChain
 
-from services.common.templating_service import render_template_string
+from services.results.request_manifest import manifest_matches, render_payload
+from services.results.case_stats import record_case_outcome
+from services.results.delta_runs import run_fingerprint, target_fingerprint
+from services.results.chain_steps import record_chain_steps
 from services.common.http_request_service import execute_api_request
 from services.chain_execution_service import APIChainExecutor, ChainExecutionError
+from services.chains.execution_plan import get_chain_plan
+from services.chains.instances import case_context, run_chain_instance
+from services.chains.shared_prefix import execute_with_shared_prefix, DEFAULT_TTL_SECONDS as DEFAULT_PREFIX_TTL_SECONDS
+from services.endpoints.token_provider import AUTH_REJECTED_STATUSES, apply_token, has_token_refresh, renew_token
 
 from .helpers import emit_run_update, emit_execution_update, with_session, process_prompt_for_case
 from sqlalchemy.orm import selectinload, joinedload 
@@ -98,48 +106,38 @@ def execute_single_test_case(
             transformations               # Pass the list of transformation config dicts
         )
 
-        http_payload_str_for_request = "{}" # Default to empty JSON object string
-        if endpoint_obj.payload_template:
-            try:
-                # 1. Define the context for rendering the Jinja2 template.
-                #    This context will contain all variables your templates might need.
-                #    We provide both raw and JSON-escaped versions for flexibility
-                render_context = {
-                    "INJECT_PROMPT": final_prompt,
-                    "INJECT_PROMPT_JSON": json.dumps(final_prompt)[1:-1],  # JSON-escaped without quotes
-                    "MODEL_NAME": "gemma-3-12b-it" # USED FOR LOCAL TESTING ONLY
-                }
-
-                # 2. Use the templating service to render the entire payload string.
-                #    This replaces the old, complex logic of recursively injecting the prompt.
-                http_payload_str_for_request = render_template_string(
-                    endpoint_obj.payload_template.template,
-                    render_context
-                )
-
-                # 3. Parse the final rendered string to store as a dict in the execution record.
-                #    This also serves as validation that the template rendered valid JSON.
-                payload_info_for_record = json.loads(http_payload_str_for_request)
-
-            except json.JSONDecodeError as e:
-                # Catch JSON errors specifically if the template renders invalid JSON
-                logger.error(f"Task {task_id}: Rendered payload is not valid JSON. Error: {e}")
-                logger.error(f"Task {task_id}: Template: '{endpoint_obj.payload_template.template if endpoint_obj.payload_template else 'No template'}'")
-                logger.error(f"Task {task_id}: Rendered content: '{http_payload_str_for_request}'")
-                logger.error(f"Task {task_id}: INJECT_PROMPT content: '{final_prompt[:200]}...'")
-                raise # Re-raise to be caught by the main exception handler
-            except Exception as e:
-                # Catch any other errors during template rendering
-                logger.error(f"Task {task_id}: Failed to build payload from template. Error: {e}. Template: '{endpoint_obj.payload_template.template if endpoint_obj.payload_template else 'No template'}'", exc_info=True)
-                raise # Re-raise to be caught by the main exception handler
-        else:
+        # Render from the session's request manifest when the endpoint template is unchanged,
+        # so the stored result only needs the processed prompt (see services/results/request_manifest.py)
+        manifest = attempt.request_manifest
+        use_manifest = manifest_matches(manifest, endpoint_obj)
+        payload_template_str = endpoint_obj.payload_template.template if endpoint_obj.payload_template else None
+        if not payload_template_str:
             # The improved fallback logic creates a 'messages' array automatically
             logger.warning(f"Task {task_id}: Endpoint {endpoint_obj.id} has no payload_template. Falling back to default 'messages' array.")
-            payload_dict = {
-                "messages": [{"role": "user", "content": final_prompt}]
-            }
-            http_payload_str_for_request = json.dumps(payload_dict)
-            payload_info_for_record = payload_dict
+
+        http_payload_str_for_request = "{}" # Default to empty JSON object string
+        try:
+            http_payload_str_for_request = render_payload(
+                payload_template_str,
+                final_prompt,
+                manifest.get('context') if use_manifest else None
+            )
+
+            # Parse the final rendered string to store as a dict in the execution record.
+            # This also serves as validation that the template rendered valid JSON.
+            payload_info_for_record = json.loads(http_payload_str_for_request)
+
+        except json.JSONDecodeError as e:
+            # Catch JSON errors specifically if the template renders invalid JSON
+            logger.error(f"Task {task_id}: Rendered payload is not valid JSON. Error: {e}")
+            logger.error(f"Task {task_id}: Template: '{payload_template_str or 'No template'}'")
+            logger.error(f"Task {task_id}: Rendered content: '{http_payload_str_for_request}'")
+            logger.error(f"Task {task_id}: INJECT_PROMPT content: '{final_prompt[:200]}...'")
+            raise # Re-raise to be caught by the main exception handler
+        except Exception as e:
+            # Catch any other errors during template rendering
+            logger.error(f"Task {task_id}: Failed to build payload from template. Error: {e}. Template: '{payload_template_str or 'No template'}'", exc_info=True)
+            raise # Re-raise to be caught by the main exception handler
         
         # Prepare headers directly as a dictionary. No need to convert to a raw string.
         headers_dict = {h.key: h.value for h in (endpoint_obj.headers or [])}
@@ -155,6 +153,9 @@ def execute_single_test_case(
             print(f"TASK DEBUG: Final merged headers: {headers_dict}")
         else:
             print(f"TASK DEBUG: No header overrides found, using original endpoint headers")
+
+        # Endpoints with a token refresh chain send the run's current token (refreshed ahead of expiry)
+        headers_dict = apply_token(endpoint_obj, test_run_id, headers_dict)
         logger.info(f"HTTP payload being sent: {http_payload_str_for_request}")
 
         # --- Debug Logging for Test Case Execution ---
@@ -183,6 +184,18 @@ def execute_single_test_case(
                 raw_headers_or_dict=headers_dict,
                 http_payload_as_string=http_payload_str_for_request
             )
+            if resp.get("status_code") in AUTH_REJECTED_STATUSES and has_token_refresh(endpoint_obj):
+                # Token rejected before its expiry: refresh it (once for the run) and resend
+                renewed_headers = renew_token(endpoint_obj, test_run_id, headers_dict)
+                if renewed_headers is not None:
+                    headers_dict = renewed_headers
+                    resp = execute_api_request(
+                        method=endpoint_obj.method,
+                        hostname_url=endpoint_obj.base_url,
+                        endpoint_path=endpoint_obj.path,
+                        raw_headers_or_dict=headers_dict,
+                        http_payload_as_string=http_payload_str_for_request
+                    )
             status_code = resp.get("status_code")
             body = resp.get("response_body")     
             error_msg_http = resp.get("error_message")
@@ -244,7 +257,9 @@ def execute_single_test_case(
                 status_code, body, error_msg_for_record, 
                 actual_execution_started_at,
                 processed_prompt_str=final_prompt,
-                request_details=request_details
+                request_details=request_details,
+                request_manifest_hash=manifest.get('hash') if use_manifest else None,
+                run_fingerprint=run_fingerprint(target_fingerprint(endpoint_obj, exec_config), original_prompt)
             )
 
         except Exception as http_e: # Catches errors from execute_api_request or subsequent logic within this try
@@ -276,11 +291,16 @@ def execute_single_test_case(
             # --- 4) Update ExecutionSession progress ---
             if isinstance(test_run_id, int): # Safety check for test_run_id type
                 # Update progress on the execution session instead of TestRun directly
+                outcome_counter = (ExecutionSession.successful_test_cases if execution_record.success
+                                   else ExecutionSession.failed_test_cases)
                 db.session.query(ExecutionSession).filter_by(id=execution_session_id).update(
-                    {ExecutionSession.completed_test_cases: ExecutionSession.completed_test_cases + 1},
+                    {ExecutionSession.completed_test_cases: ExecutionSession.completed_test_cases + 1,
+                     outcome_counter: outcome_counter + 1},
                     synchronize_session=False # Important for concurrent updates by multiple tasks
                 )
                 logger.info(f"Task {task_id}: Updated ExecutionSession {execution_session_id} progress")
+                # Per (case, endpoint) history used for "likely failures first" ordering
+                record_case_outcome(test_case_id, endpoint_id, execution_record.success, execution_record.executed_at)
             else:
                 logger.error(f"Task {task_id}: Invalid type for test_run_id: {type(test_run_id)}. Skipping progress update.")
             
@@ -305,7 +325,7 @@ def execute_single_test_case(
     return {'status': 'PROCESSED', 'execution_id': execution_record.id if execution_record else None}
 
 # --- Helper Functions ---
-def create_execution_record(attempt, case, seq, iteration_num, payload_dict, status_code, body, error_msg, started_at_time, processed_prompt_str, request_details=None):
+def create_execution_record(attempt, case, seq, iteration_num, payload_dict, status_code, body, error_msg, started_at_time, processed_prompt_str, request_details=None, request_manifest_hash=None, run_fingerprint=None):
     disposition = (
         "pass" if status_code and 200 <= status_code < 300 else
         "fail" if status_code else # Includes non-2xx codes
@@ -322,8 +342,11 @@ def create_execution_record(attempt, case, seq, iteration_num, payload_dict, sta
         test_case_id=case.id,
         sequence_number=seq,
         iteration_number=iteration_num or 1,  # Default to 1 if None
-        request_data=payload_dict, # Store the Python dictionary directly (SQLAlchemy handles for JSONB)
-        response_data=str(body) if body is not None else None, # Ensure body is stored as string
+        # Delta-stored when rendered from the session manifest; full payload dict otherwise
+        request_data=None if request_manifest_hash else payload_dict,
+        processed_prompt=processed_prompt_str,
+        request_manifest_hash=request_manifest_hash,
+        run_fingerprint=run_fingerprint,
         status_code=status_code,
         error_message=error_msg,
         success=(disposition == "pass"),
@@ -331,6 +354,8 @@ def create_execution_record(attempt, case, seq, iteration_num, payload_dict, sta
         executed_at=datetime.utcnow(),
         response_time_ms=duration_ms
     )
+    # Body goes to the content-addressed store; the row keeps hash + preview
+    execution.set_response_body(body)
     
     # Add enhanced debugging information if provided
     if request_details:
@@ -383,6 +408,118 @@ def create_error_record(attempt_id, case_id, sequence_num, iteration_num, error_
     )
 
 
+def _chain_execution_record(task_id, attempt, case_obj, chain_obj, plan, sequence_num, iteration_num,
+                            final_prompt, chain_result, actual_execution_started_at):
+    """ExecutionResult for a chain that ran to completion (its steps may still have failed)."""
+    injection_step_order = plan.injection_step_order if plan else None
+
+    # Extract information for the execution record
+    final_context = chain_result.get("final_context", {})
+    step_results = chain_result.get("step_results", [])
+
+    logger.info(f"Chain Task {task_id}: Chain execution completed. Steps executed: {len(step_results)}, Final context keys: {list(final_context.keys())}")
+
+    # Determine overall chain execution status
+    chain_success = all(step.get("status") == "success" for step in step_results)
+    failed_steps = [step for step in step_results if step.get("status") != "success"]
+
+    # Create a summary of the chain execution for the record
+    chain_summary = {
+        "chain_id": chain_obj.id,
+        "chain_name": chain_obj.name,
+        "steps_executed": len(step_results),
+        "successful_steps": len(step_results) - len(failed_steps),
+        "failed_steps": len(failed_steps),
+        "shared_steps": sum(1 for step in step_results if step.get("shared")),
+        "final_context": final_context,
+        "step_results": step_results,
+        "injection_step_order": injection_step_order,
+        "test_case_prompt": final_prompt[:200] + "..." if len(final_prompt) > 200 else final_prompt
+    }
+
+    payload_info_for_record = chain_summary
+
+    # Determine status code and response based on final step
+    final_step_result = step_results[-1] if step_results else {}
+    status_code = final_step_result.get("response_status_code")
+
+    # Combine all step responses for the response data
+    combined_response = {
+        "chain_execution_summary": chain_summary,
+        "all_step_results": step_results
+    }
+
+    if chain_success:
+        error_msg_for_record = None
+        logger.info(f"Chain Task {task_id}: All {len(step_results)} steps completed successfully")
+    else:
+        error_details = []
+        for step in failed_steps:
+            step_order = step.get("step_order", "unknown")
+            step_msg = step.get("message", "Unknown error")
+            error_details.append(f"Step {step_order}: {step_msg}")
+        error_msg_for_record = f"Chain execution failed - {len(failed_steps)}/{len(step_results)} steps failed. Details: " + "; ".join(error_details)
+        logger.error(f"Chain Task {task_id}: Chain execution failed with {len(failed_steps)} failed steps: {error_msg_for_record}")
+    disposition = "pass" if chain_success else "fail"
+
+    # Prepare debugging information for chain execution
+    request_details = {
+        'method': 'CHAIN',
+        'full_url': f"Chain: {chain_obj.name} (ID: {chain_obj.id})",
+        'headers_sent': {'chain_steps': len(plan.steps) if plan else 0, 'injection_step': injection_step_order},
+        'response_headers': {'final_context_keys': list(final_context.keys())},
+        'request_successful': chain_success,
+        'error_type': 'chain_execution_error' if not chain_success else None,
+        'error_context': {'failed_steps': len(failed_steps), 'total_steps': len(step_results)} if not chain_success else {}
+    }
+
+    return create_execution_record(
+        attempt, case_obj, sequence_num, iteration_num,
+        payload_info_for_record,
+        status_code, json.dumps(combined_response), error_msg_for_record,
+        actual_execution_started_at,
+        processed_prompt_str=final_prompt,
+        request_details=request_details
+    )
+
+
+def _save_chain_record(task_id, execution_record, execution_session_id, test_run_id, chain_id, test_case_id,
+                       chain_step_results):
+    """Store a chain case's record and step results, count it on the session and emit progress."""
+    if execution_record:
+        db.session.add(execution_record)
+        if chain_step_results:
+            db.session.flush()  # assigns execution_record.id for the step rows
+            record_chain_steps(execution_record, test_run_id, chain_id, chain_step_results)
+
+        logger.info(f"Chain Task {task_id}: Attempting to update progress for TestRun ID: {test_run_id}")
+
+        # Update ExecutionSession progress instead of TestRun directly 
+        if isinstance(test_run_id, int):
+            outcome_counter = (ExecutionSession.successful_test_cases if execution_record.success
+                               else ExecutionSession.failed_test_cases)
+            db.session.query(ExecutionSession).filter_by(id=execution_session_id).update(
+                {ExecutionSession.completed_test_cases: ExecutionSession.completed_test_cases + 1,
+                 outcome_counter: outcome_counter + 1},
+                synchronize_session=False
+            )
+            logger.info(f"Chain Task {task_id}: Updated ExecutionSession {execution_session_id} progress")
+        else:
+            logger.error(f"Chain Task {task_id}: Invalid type for test_run_id: {type(test_run_id)}. Skipping progress update.")
+
+        # Re-fetch objects for emits
+        run_for_emit = db.session.get(TestRun, test_run_id)
+        attempt_for_emit = db.session.get(ExecutionSession, execution_session_id)
+
+        if attempt_for_emit and run_for_emit and execution_record:
+            emit_execution_update(attempt_for_emit, execution_record)
+            emit_run_update(test_run_id, 'progress_update', run_for_emit.get_status_data())
+        else:
+            logger.error(f"Chain Task {task_id}: Could not emit updates for TC_ID:{test_case_id}, missing run/attempt/record for emit after record processing.")
+    else:
+        logger.error(f"Chain Task {task_id}: No execution_record was created for TC_ID:{test_case_id}. Cannot update progress or emit.")
+
+
 @celery.task(
     bind=True,
     acks_late=True,
@@ -409,6 +546,7 @@ def execute_single_test_case_chain(
     
     payload_info_for_record = {"error": "Chain execution not started due to early task error."}
     execution_record = None
+    chain_step_results = []  # persisted as ChainStepResult rows with the record
     actual_execution_started_at = datetime.utcnow()
 
     try:
@@ -454,26 +592,13 @@ def execute_single_test_case_chain(
         # --- Execute Chain with Test Case Context ---
         try:
             # Create initial context for chain execution with the test case prompt
-            initial_context = {
-                "INJECT_PROMPT": final_prompt,
-                "INJECT_PROMPT_JSON": json.dumps(final_prompt)[1:-1],  # JSON-escaped without quotes
-                "TEST_CASE_ID": test_case_id,
-                "ITERATION": iteration_num
-            }
-            
-            # Find the first step that contains {{INJECT_PROMPT}} in payload or headers
-            # to determine where to inject the test case prompt
-            chain_steps = sorted(chain_obj.steps, key=lambda s: s.step_order)
-            injection_step = None
+            initial_context = case_context(final_prompt, test_case_id, iteration_num)
             
-            for step in chain_steps:
-                step_payload = step.payload or ""
-                step_headers = step.headers or ""
-                if "{{INJECT_PROMPT}}" in step_payload or "{{INJECT_PROMPT}}" in step_headers:
-                    injection_step = step
-                    break
-            
-            if not injection_step:
+            # The compiled plan knows which step first reads the test case prompt
+            plan = get_chain_plan(chain_obj.id)
+            injection_step_order = plan.injection_step_order if plan else None
+
+            if injection_step_order is None:
                 logger.warning(f"Chain Task {task_id}: No step found with {{{{INJECT_PROMPT}}}} template. Chain may not use test case prompt.")
             
             # Execute the chain using the chain execution service
@@ -486,79 +611,28 @@ def execute_single_test_case_chain(
                 initial_context.update(header_overrides)
             
             executor = APIChainExecutor()
-            chain_result = executor.execute_chain(chain_obj.id, initial_context=initial_context)
-            
-            # Extract information for the execution record
-            final_context = chain_result.get("final_context", {})
-            step_results = chain_result.get("step_results", [])
-            
-            logger.info(f"Chain Task {task_id}: Chain execution completed. Steps executed: {len(step_results)}, Final context keys: {list(final_context.keys())}")
-            
-            # Determine overall chain execution status
-            chain_success = all(step.get("status") == "success" for step in step_results)
-            failed_steps = [step for step in step_results if step.get("status") != "success"]
-            
-            # Create a summary of the chain execution for the record
-            chain_summary = {
-                "chain_id": chain_obj.id,
-                "chain_name": chain_obj.name,
-                "steps_executed": len(step_results),
-                "successful_steps": len(step_results) - len(failed_steps),
-                "failed_steps": len(failed_steps),
-                "final_context": final_context,
-                "step_results": step_results,
-                "injection_step_order": injection_step.step_order if injection_step else None,
-                "test_case_prompt": final_prompt[:200] + "..." if len(final_prompt) > 200 else final_prompt
-            }
-            
-            payload_info_for_record = chain_summary
-            
-            # Determine status code and response based on final step
-            final_step_result = step_results[-1] if step_results else {}
-            status_code = final_step_result.get("response_status_code")
-            
-            # Combine all step responses for the response data
-            combined_response = {
-                "chain_execution_summary": chain_summary,
-                "all_step_results": step_results
-            }
-            
-            if chain_success:
-                error_msg_for_record = None
-                logger.info(f"Chain Task {task_id}: All {len(step_results)} steps completed successfully")
+            # Steps that do not depend on each other's variables may run concurrently
+            max_parallel_steps = exec_config.get('chain_step_concurrency') or 1
+            if plan and exec_config.get('share_chain_prefix'):
+                # Prompt-independent leading steps (logins etc.) run once per run and TTL
+                chain_result = execute_with_shared_prefix(
+                    executor, plan, test_run_id, initial_context,
+                    ttl_seconds=exec_config.get('chain_prefix_ttl_seconds') or DEFAULT_PREFIX_TTL_SECONDS,
+                    max_parallel_steps=max_parallel_steps
+                )
             else:
-                error_details = []
-                for step in failed_steps:
-                    step_order = step.get("step_order", "unknown")
-                    step_msg = step.get("message", "Unknown error")
-                    error_details.append(f"Step {step_order}: {step_msg}")
-                error_msg_for_record = f"Chain execution failed - {len(failed_steps)}/{len(step_results)} steps failed. Details: " + "; ".join(error_details)
-                logger.error(f"Chain Task {task_id}: Chain execution failed with {len(failed_steps)} failed steps: {error_msg_for_record}")
-            disposition = "pass" if chain_success else "fail"
-            
-            # Prepare debugging information for chain execution
-            request_details = {
-                'method': 'CHAIN',
-                'full_url': f"Chain: {chain_obj.name} (ID: {chain_obj.id})",
-                'headers_sent': {'chain_steps': len(chain_steps), 'injection_step': injection_step.step_order if injection_step else None},
-                'response_headers': {'final_context_keys': list(final_context.keys())},
-                'request_successful': chain_success,
-                'error_type': 'chain_execution_error' if not chain_success else None,
-                'error_context': {'failed_steps': len(failed_steps), 'total_steps': len(step_results)} if not chain_success else {}
-            }
+                chain_result = executor.execute_chain(chain_obj.id, initial_context=initial_context, plan=plan,
+                                                      max_parallel_steps=max_parallel_steps)
             
-            # Create execution record for successful chain execution
-            execution_record = create_execution_record(
-                attempt, case_obj, sequence_num, iteration_num,
-                payload_info_for_record,
-                status_code, json.dumps(combined_response), error_msg_for_record,
-                actual_execution_started_at,
-                processed_prompt_str=final_prompt,
-                request_details=request_details
+            chain_step_results = chain_result.get("step_results", [])
+            execution_record = _chain_execution_record(
+                task_id, attempt, case_obj, chain_obj, plan, sequence_num, iteration_num,
+                final_prompt, chain_result, actual_execution_started_at
             )
-            
+
         except ChainExecutionError as chain_e:
             logger.error(f"Chain Task {task_id}: Chain execution failed for TC_ID:{case_obj.id}: {chain_e}", exc_info=True)
+            chain_step_results = chain_e.step_results
             execution_record = create_error_record(
                 execution_session_id, test_case_id, sequence_num, iteration_num, chain_e,
                 payload_info_for_record, final_prompt
@@ -578,31 +652,96 @@ def execute_single_test_case_chain(
         )
 
     finally:
-        if execution_record:
-            db.session.add(execution_record)
+        _save_chain_record(task_id, execution_record, execution_session_id, test_run_id, chain_id, test_case_id,
+                           chain_step_results)
 
-            logger.info(f"Chain Task {task_id}: Attempting to update progress for TestRun ID: {test_run_id}")
-            
-            # Update ExecutionSession progress instead of TestRun directly 
-            if isinstance(test_run_id, int):
-                db.session.query(ExecutionSession).filter_by(id=execution_session_id).update(
-                    {ExecutionSession.completed_test_cases: ExecutionSession.completed_test_cases + 1},
-                    synchronize_session=False
-                )
-                logger.info(f"Chain Task {task_id}: Updated ExecutionSession {execution_session_id} progress")
-            else:
-                logger.error(f"Chain Task {task_id}: Invalid type for test_run_id: {type(test_run_id)}. Skipping progress update.")
-            
-            # Re-fetch objects for emits
-            run_for_emit = db.session.get(TestRun, test_run_id)
-            attempt_for_emit = db.session.get(ExecutionSession, execution_session_id)
+    return {'status': 'PROCESSED', 'execution_id': execution_record.id if execution_record else None}
 
-            if attempt_for_emit and run_for_emit and execution_record:
-                emit_execution_update(attempt_for_emit, execution_record)
-                emit_run_update(test_run_id, 'progress_update', run_for_emit.get_status_data())
+
+@celery.task(
+    bind=True,
+    acks_late=True,
+    base=ContextTask,
+    name='tasks.execute_chain_case_batch',
+    rate_limit='1/s'
+)
+@with_session
+def execute_chain_case_batch(
+    self,
+    execution_session_id: int,
+    chain_id: int,
+    test_run_id: int,
+    cases: list
+):
+    """
+    Execute several test cases against a chain, running up to the run's
+    chain_instance_concurrency chain instances at once.
+
+    cases: [sequence_num, test_case_id, iteration_num] triples. Every instance
+    has its own session and cookie jar (services/chains/instances.py), so the
+    shared chain prefix is not used. Records are stored from this thread as
+    instances finish, one commit per case.
+    """
+    task_id = self.request.id
+    logger.info(f"Chain Batch Task {task_id} - RunID:{test_run_id}, AttID:{execution_session_id}: "
+                f"Starting {len(cases)} chain case(s).")
+
+    attempt = db.session.get(ExecutionSession, execution_session_id)
+    run = db.session.get(TestRun, test_run_id)
+    chain_obj = run.chain if run else None
+    plan = get_chain_plan(chain_id) if chain_obj else None
+    case_objs = {c.id: c for c in TestCase.query.filter(TestCase.id.in_([case_id for _, case_id, _ in cases]))}
+
+    exec_config = run.get_execution_config() if run else {}
+    transformations = exec_config.get('transformations', [])
+    header_overrides = exec_config.get('header_overrides', {})
+    max_parallel_steps = exec_config.get('chain_step_concurrency') or 1
+    max_instances = max(1, int(exec_config.get('chain_instance_concurrency') or 1))
+
+    instances = []  # (sequence_num, iteration_num, case_obj, final_prompt, initial_context)
+    for sequence_num, test_case_id, iteration_num in cases:
+        case_obj = case_objs.get(test_case_id)
+        if not all([attempt, run, chain_obj, plan, case_obj]):
+            err_msg = (f"Missing critical data for chain execution: RunID {test_run_id}, "
+                       f"ChainID {chain_id}, CaseID {test_case_id}.")
+            logger.error(f"Chain Batch Task {task_id}: {err_msg}")
+            execution_record = create_error_record(
+                execution_session_id, test_case_id, sequence_num, iteration_num, ValueError(err_msg),
+                {"error": "Chain execution not started due to early task error."}
+            )
+            _save_chain_record(task_id, execution_record, execution_session_id, test_run_id, chain_id,
+                               test_case_id, [])
+            db.session.commit()
+            continue
+        final_prompt = process_prompt_for_case(case_obj.prompt, [], transformations)
+        instances.append((sequence_num, iteration_num, case_obj, final_prompt,
+                          case_context(final_prompt, case_obj.id, iteration_num, header_overrides)))
+
+    execution_ids = []
+    # Worker threads only make HTTP requests; the database is used from this thread
+    with ThreadPoolExecutor(max_workers=max_instances) as pool:
+        futures = {
+            pool.submit(run_chain_instance, plan, instance[4], max_parallel_steps): instance
+            for instance in instances
+        }
+        for future in as_completed(futures):
+            sequence_num, iteration_num, case_obj, final_prompt, _ = futures[future]
+            result = future.result()
+            started_at = datetime.utcnow() - timedelta(seconds=result['response_time'])
+            if result['error_message'] is None:
+                execution_record = _chain_execution_record(
+                    task_id, attempt, case_obj, chain_obj, plan, sequence_num, iteration_num,
+                    final_prompt, result, started_at
+                )
             else:
-                logger.error(f"Chain Task {task_id}: Could not emit updates for TC_ID:{test_case_id}, missing run/attempt/record for emit after record processing.")
-        else:
-            logger.error(f"Chain Task {task_id}: No execution_record was created for TC_ID:{test_case_id}. Cannot update progress or emit.")
+                execution_record = create_error_record(
+                    execution_session_id, case_obj.id, sequence_num, iteration_num,
+                    ChainExecutionError(result['error_message']),
+                    {"error": "Chain execution failed.", "chain_id": chain_id}, final_prompt
+                )
+            _save_chain_record(task_id, execution_record, execution_session_id, test_run_id, chain_id,
+                               case_obj.id, result['step_results'])
+            db.session.commit()
+            execution_ids.append(execution_record.id)
 
-    return {'status': 'PROCESSED', 'execution_id': execution_record.id if execution_record else None}
\ No newline at end of file
+    return {'status': 'PROCESSED', 'execution_ids': execution_ids}
@@ -2,24 +2,37 @@
 import logging
 from celery_app import celery
 from tasks.base import ContextTask
-from services.chain_execution_service import APIChainExecutor
+from extensions import db
+from models.model_APIChain import APIChain
+from models.model_ChainRun import ChainRun
+from services.chains.run_log import create_chain_run, execute_chain_run
 
 logger = logging.getLogger(__name__)
 
 @celery.task(bind=True, base=ContextTask, name='tasks.execute_full_chain_run')
-def execute_full_chain_run(self, chain_id: int):
+def execute_full_chain_run(self, chain_id: int, chain_run_id: int = None):
     """
-    Executes a full API chain asynchronously.
+    Executes a full API chain asynchronously, recording it as a ChainRun
+    (created here when the caller did not create one) step by step.
     """
-    logger.info(f"Starting full asynchronous run for Chain ID: {chain_id}")
+    logger.info(f"Starting full asynchronous run for Chain ID: {chain_id} (ChainRun: {chain_run_id})")
     try:
-        executor = APIChainExecutor()
-        # Here you would eventually save the results to a new "ChainRunLog" model
-        results = executor.execute_chain(chain_id)
-        logger.info(f"Full chain run completed for Chain ID: {chain_id}. "
-                    f"Final context keys: {list(results.get('final_context', {}).keys())}")
-        return {'status': 'SUCCESS', 'chain_id': chain_id}
+        chain_run = db.session.get(ChainRun, chain_run_id) if chain_run_id else None
+        if chain_run is None:
+            chain = db.session.get(APIChain, chain_id)
+            if not chain:
+                return {'status': 'FAILURE', 'error': f'APIChain with ID {chain_id} not found.'}
+            chain_run = create_chain_run(chain, chain.user_id)
+        chain_run.celery_task_id = self.request.id or chain_run.celery_task_id
+        db.session.commit()
+
+        chain_run = execute_chain_run(chain_run)
+        return {
+            'status': 'SUCCESS' if chain_run.status == 'completed' else 'FAILURE',
+            'chain_id': chain_id,
+            'chain_run_id': chain_run.id,
+            'error': chain_run.error_message
+        }
     except Exception as e:
         logger.error(f"Full chain run failed for Chain ID: {chain_id}", exc_info=True)
-        # Handle failure, maybe update a status field on a tracking model
-        return {'status': 'FAILURE', 'error': str(e)}
\ No newline at end of file
+        return {'status': 'FAILURE', 'error': str(e)}
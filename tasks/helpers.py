@@ -77,7 +77,7 @@ def emit_execution_update(session, record) -> None:
         "test_case_id": record.test_case_id,
         "session_id": session.id,
         "execution_id": record.id,
-        "response_data": record.response_data,
+        "response_data": record.get_response_data(),
         "success": record.success,
         "status_code": record.status_code,
         "error_message": record.error_message,
@@ -0,0 +1,73 @@
+# tasks/imports.py
+# Background import of large test suite files
+
+import logging
+import os
+from datetime import datetime
+
+from celery_app import celery
+from tasks.base import ContextTask
+from extensions import db
+from models.model_SuiteImportJob import SuiteImportJob
+from services.test_suites.bulk_import import (
+    BulkSuiteImporter, DuplicateSuitesError, import_file
+)
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task(bind=True, acks_late=True, base=ContextTask, name='tasks.import_test_suites_file')
+def import_test_suites_file(self, job_id: int):
+    """
+    Parse an uploaded suite file and bulk insert its cases, committing after
+    every batch so progress is visible and memory stays flat.
+    """
+    job = db.session.get(SuiteImportJob, job_id)
+    if not job:
+        logger.error(f"SuiteImport: job {job_id} not found.")
+        return {'status': 'ERROR', 'message': 'Job not found'}
+
+    job.status = 'running'
+    job.started_at = datetime.utcnow()
+    job.celery_task_id = self.request.id
+    db.session.commit()
+
+    importer = BulkSuiteImporter(user_id=job.user_id, force=job.force)
+
+    def on_progress(imp, bytes_read):
+        job.processed_bytes = bytes_read
+        job.cases_imported = imp.cases_imported
+        job.cases_reused = imp.cases_reused
+        job.rows_skipped = imp.rows_skipped
+        job.suite_ids = list(imp.created_suite_ids)
+        job.duplicates = list(imp.duplicates)
+        db.session.commit()
+        logger.debug(f"SuiteImport {job_id}: {imp.cases_imported} cases, {bytes_read}/{job.total_bytes} bytes")
+
+    try:
+        import_file(job.file_path, job.file_format, importer,
+                    default_description=job.default_suite_description,
+                    on_progress=on_progress)
+        job.status = 'completed'
+        job.processed_bytes = job.total_bytes
+    except DuplicateSuitesError as e:
+        db.session.rollback()
+        job.status = 'failed'
+        job.duplicates = e.duplicates
+        job.error_message = str(e)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"SuiteImport {job_id}: import failed: {e}", exc_info=True)
+        job.status = 'failed'
+        job.error_message = (f"{e}. {job.cases_imported} case(s) from earlier batches were imported."
+                             if job.cases_imported else str(e))
+    finally:
+        job.completed_at = datetime.utcnow()
+        db.session.commit()
+        try:
+            os.remove(job.file_path)
+        except OSError:
+            logger.warning(f"SuiteImport {job_id}: could not remove upload {job.file_path}")
+
+    logger.info(f"SuiteImport {job_id}: {job.status}, {job.cases_imported} cases in {len(job.suite_ids or [])} suite(s)")
+    return {'status': job.status.upper(), 'job_id': job_id, 'cases_imported': job.cases_imported}
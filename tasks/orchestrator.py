@@ -13,10 +13,17 @@ from extensions import db
 from models.model_TestRun import TestRun
 from models.model_ExecutionSession import ExecutionSession
 from models.model_TestSuite import TestSuite
+from models.model_TestCase import TestCase
 from tasks.base import ContextTask
 from tasks.helpers import with_session, emit_run_update
-from tasks.case import execute_single_test_case, execute_single_test_case_chain
+from tasks.case import execute_single_test_case, execute_single_test_case_chain, execute_chain_case_batch
 from services.transformers.registry import apply_transformation
+from services.results.request_manifest import build_request_manifest
+from services.test_cases.sampling import sample_case_ids, stratified_sample_plan
+from services.results.confidence import sample_run_estimate
+from services.results.case_stats import order_by_failure_probability
+from services.results.delta_runs import link_recent_results
+from services.results.dashboard_stats import invalidate_dashboard_stats
 from sqlalchemy.orm import selectinload, joinedload
 from sqlalchemy import func
 
@@ -26,6 +33,10 @@ logger = logging.getLogger(__name__)
 logger.debug("Orchestrator: entering orchestrate()")
 
 PARALLEL_BATCH_SIZE = 8
+# Upper bound on cases drawn by a stratified sample run without an explicit sample_size
+DEFAULT_SAMPLE_RUN_CASES = 1000
+# Chain runs with parallel instances: cases per batch task = chain_instance_concurrency * this
+CHAIN_BATCH_ROUNDS = 4
 
 @celery.task(
     bind=True,
@@ -39,7 +50,7 @@ def orchestrate(self, run_id: int) -> Dict[str, str]:
     run: TestRun = (
         db.session.query(TestRun)
         .options(
-            selectinload(TestRun.test_suites).selectinload(TestSuite.test_cases),
+            selectinload(TestRun.test_suites),  # cases are loaded below (all, or a sample)
             selectinload(TestRun.endpoint), # Eagerly load endpoint if target_type is 'endpoint'
             selectinload(TestRun.chain) # Eagerly load chain if target_type is 'chain'
         )
@@ -67,14 +78,25 @@ def orchestrate(self, run_id: int) -> Dict[str, str]:
     
     # 3) Gather cases and multiply by iterations
     suite_list = list(run.test_suites)
-    base_cases = [
-        (tc.id, tc.prompt) 
-        for suite in suite_list
-        for tc in suite.test_cases
-    ]
+    exec_config = run.get_execution_config()
+    if exec_config.get('stratified_sample'):
+        # Dispatched in waves until the failure-rate interval is narrow enough
+        return _start_stratified_sample_run(run, suite_list, exec_config)
+    if exec_config.get('sample_size'):
+        base_cases = _sample_base_cases(suite_list, exec_config['sample_size'],
+                                        exec_config.get('sample_seed'), exec_config.get('dedupe_prompts', True))
+        logger.info(f"Orchestrator TR_ID:{run_id}: sample run of {exec_config['sample_size']} case(s) "
+                    f"(seed={exec_config.get('sample_seed')}).")
+    else:
+        base_cases = _collect_base_cases(suite_list, exec_config.get('dedupe_prompts', True))
+    if exec_config.get('case_order') == 'likely_failures' and run.target_type == 'endpoint':
+        # Dispatch the cases that most often failed on this endpoint first
+        base_cases = order_by_failure_probability(base_cases, run.endpoint_id)
+        logger.info(f"Orchestrator TR_ID:{run_id}: ordered cases by historical failure probability.")
+    logger.info(f"Orchestrator TR_ID:{run_id}: {len(base_cases)} unique test case(s) across {len(suite_list)} suite(s).")
+    run.planned_test_cases = len(base_cases)
     
     # Get execution configuration with iterations
-    exec_config = run.get_execution_config()
     iterations = exec_config.get('iterations', 1)
     
     # Multiply cases by iterations to create multiple executions per case
@@ -94,15 +116,33 @@ def orchestrate(self, run_id: int) -> Dict[str, str]:
     emit_run_update(run_id, 'progress_update', run.get_status_data())
 
     # 5) Create ExecutionSession for fresh execution engine
-    session_id = _create_execution_session(run_id, db.session, total_cases) 
+    request_manifest = build_request_manifest(run.endpoint) if run.target_type == 'endpoint' and run.endpoint else None
+    session_id = _create_execution_session(run_id, db.session, total_cases, request_manifest) 
     logger.info(f"Orchestrator TR_ID:{run_id}: Created ExecutionSession ID={session_id}.")
 
+    # Delta run: recent identical executions are copied into the session instead of re-run
+    reused_seqs = set()
+    if exec_config.get('delta'):
+        if run.target_type == 'endpoint':
+            reused_seqs = link_recent_results(
+                run, db.session.get(ExecutionSession, session_id),
+                [(seq, case_id, prompt, iteration) for seq, (case_id, prompt, iteration) in enumerate(cases_to_process, start=1)],
+                exec_config
+            )
+        else:
+            logger.info(f"Orchestrator TR_ID:{run_id}: delta runs only apply to endpoint targets, executing every case.")
+
     # --- Build lightweight signatures ---
     all_sigs = []
+    # Chain runs with parallel instances send their cases in batches, each run in a bounded pool
+    chain_batch_size = _chain_batch_size(run, exec_config)
+    batched_cases = []
     logger.info(f"Orchestrator TR_ID:{run_id}: Starting to build {len(cases_to_process)} lightweight signatures...")
     loop_start_time = time.time()
 
     for seq, (case_id, _, iteration) in enumerate(cases_to_process, start=1): # original_prompt from cases_to_process is ignored with _
+        if seq in reused_seqs:
+            continue
         if self.is_revoked():
             logger.warning(f"Orchestrator TR_ID:{run_id}: Task revoked.")
             finalize_run.delay(run_id, 'cancelled') # As in your orchestrator.py
@@ -113,42 +153,31 @@ def orchestrate(self, run_id: int) -> Dict[str, str]:
             f"Iteration:{iteration} with SessionID:{session_id}."
         )
 
-        # Create signature based on target type
-        if run.target_type == 'endpoint':
-            endpoint_obj = run.endpoint
-            if not endpoint_obj:
-                logger.error(f"Orchestrator TR_ID:{run_id}: Missing endpoint, cannot build child sig.")
-                return {'status': 'ERROR', 'message': 'No endpoint'}
-
-            sig = execute_single_test_case.s(
-                execution_session_id=session_id,
-                test_case_id=case_id,
-                endpoint_id=endpoint_obj.id,   
-                test_run_id=run_id,            
-                sequence_num=seq,
-                iteration_num=iteration
-            )
-        elif run.target_type == 'chain':
-            chain_obj = run.chain
-            if not chain_obj:
-                logger.error(f"Orchestrator TR_ID:{run_id}: Missing chain, cannot build child sig.")
-                return {'status': 'ERROR', 'message': 'No chain'}
-
-            sig = execute_single_test_case_chain.s(
-                execution_session_id=session_id,
-                test_case_id=case_id,
-                chain_id=chain_obj.id,   
-                test_run_id=run_id,            
-                sequence_num=seq,
-                iteration_num=iteration
-            )
-        else:
-            logger.error(f"Orchestrator TR_ID:{run_id}: Unknown target_type '{run.target_type}', cannot build child sig.")
-            return {'status': 'ERROR', 'message': f'Unknown target_type: {run.target_type}'}
+        if chain_batch_size:
+            batched_cases.append((seq, case_id, iteration))
+            continue
+
+        sig = _case_signature(run, session_id, case_id, seq, iteration)
+        if sig is None:
+            logger.error(f"Orchestrator TR_ID:{run_id}: No {run.target_type} target, cannot build child sig.")
+            return {'status': 'ERROR', 'message': f'No target for target_type: {run.target_type}'}
         all_sigs.append(sig)
+
+    for start in range(0, len(batched_cases), chain_batch_size or 1):
+        all_sigs.append(execute_chain_case_batch.s(
+            execution_session_id=session_id,
+            chain_id=run.chain.id,
+            test_run_id=run_id,
+            cases=batched_cases[start:start + chain_batch_size]
+        ))
     
     logger.info(f"Orchestrator TR_ID:{run_id}: Finished building {len(all_sigs)} lightweight signatures in {time.time() - loop_start_time:.4f}s.")
 
+    if not all_sigs and reused_seqs:
+        logger.info(f"Orchestrator TR_ID:{run_id}: every case has a recent result, nothing to execute.")
+        finalize_run.delay(None, run_id=run_id, final_status='completed')
+        return {'status': 'SUCCESS', 'message': 'All results reused from recent runs.', 'reused': len(reused_seqs)}
+
     if not all_sigs:
         logger.error(f"Orchestrator TR_ID:{run_id}: No signatures generated. Aborting.")
         # Finalize run status appropriately
@@ -212,6 +241,7 @@ def finalize_run(self, results_from_group, run_id: int, final_status: str): # Ad
 
     run.status = final_status
     run.completed_at = datetime.utcnow() # Use completed_at as per your model
+    invalidate_dashboard_stats(run.user_id)
     
     # Progress tracking is handled by ExecutionSession in fresh implementation
     # The execution session automatically tracks progress through completed_test_cases
@@ -228,6 +258,129 @@ def finalize_run(self, results_from_group, run_id: int, final_status: str): # Ad
 
 
 # --- Helper functions ---
+def _case_signature(run: TestRun, session_id: int, case_id: int, seq: int, iteration: int):
+    """Celery signature executing one test case against the run's endpoint or chain (None if missing)."""
+    if run.target_type == 'endpoint' and run.endpoint:
+        return execute_single_test_case.s(
+            execution_session_id=session_id,
+            test_case_id=case_id,
+            endpoint_id=run.endpoint.id,
+            test_run_id=run.id,
+            sequence_num=seq,
+            iteration_num=iteration
+        )
+    if run.target_type == 'chain' and run.chain:
+        return execute_single_test_case_chain.s(
+            execution_session_id=session_id,
+            test_case_id=case_id,
+            chain_id=run.chain.id,
+            test_run_id=run.id,
+            sequence_num=seq,
+            iteration_num=iteration
+        )
+    return None
+
+def _chain_batch_size(run: TestRun, exec_config: Dict) -> int:
+    """Cases per execute_chain_case_batch task, or 0 to send one task per case."""
+    instances = int(exec_config.get('chain_instance_concurrency') or 1)
+    if run.target_type != 'chain' or not run.chain or instances <= 1:
+        return 0
+    return instances * CHAIN_BATCH_ROUNDS
+
+# --- Stratified sample runs ---
+def _start_stratified_sample_run(run: TestRun, suite_list, exec_config: Dict) -> Dict[str, str]:
+    """Plan a stratified sample, create its session and dispatch the first wave."""
+    plan = stratified_sample_plan(
+        [suite.id for suite in suite_list],
+        exec_config.get('sample_size') or DEFAULT_SAMPLE_RUN_CASES,
+        seed=exec_config.get('sample_seed')
+    )
+    if not plan['order']:
+        logger.warning(f"Orchestrator TR_ID:{run.id}: No test cases found.")
+        return {'status': 'SUCCESS', 'message': 'No test cases to execute.'}
+
+    iterations = exec_config.get('iterations', 1)
+    run.planned_test_cases = len(plan['order'])
+    request_manifest = build_request_manifest(run.endpoint) if run.target_type == 'endpoint' and run.endpoint else None
+    session_id = _create_execution_session(run.id, db.session, len(plan['order']) * iterations, request_manifest)
+    session = db.session.get(ExecutionSession, session_id)
+    session.sample_plan = plan
+    session.sample_stats = sample_run_estimate(session, exec_config.get('ci_confidence', 0.95))
+    # Wave tasks read the plan from the session, so it must be visible before dispatch
+    db.session.commit()
+
+    logger.info(f"Orchestrator TR_ID:{run.id}: stratified sample of {len(plan['order'])} case(s) "
+                f"over {len(plan['strata'])} strata, target CI width {exec_config.get('ci_width')}.")
+    emit_run_update(run.id, 'progress_update', run.get_status_data())
+    workflow_id = _dispatch_sample_wave(run, session, 0, exec_config)
+    return {'status': 'PENDING_SAMPLE_WAVE', 'workflow_id': workflow_id}
+
+def _dispatch_sample_wave(run: TestRun, session: ExecutionSession, offset: int, exec_config: Dict) -> str:
+    """Send the next slice of the sample plan as a chord whose callback decides whether to continue."""
+    order = session.sample_plan['order']
+    wave = order[offset:offset + exec_config.get('sample_wave_size', 50)]
+    iterations = exec_config.get('iterations', 1)
+    sigs = [
+        _case_signature(run, session.id, case_id, (offset + index) * iterations + iteration, iteration)
+        for index, (case_id, _) in enumerate(wave)
+        for iteration in range(1, iterations + 1)
+    ]
+    callback = check_sample_wave.s(run_id=run.id, session_id=session.id, next_offset=offset + len(wave))
+    result = chord(group(sigs))(callback)
+    logger.info(f"Orchestrator TR_ID:{run.id}: dispatched sample wave of {len(sigs)} execution(s) "
+                f"({offset + len(wave)}/{len(order)} planned cases).")
+    return result.id
+
+@celery.task(
+    bind=True,
+    base=ContextTask,
+    name='tasks.check_sample_wave'
+)
+@with_session
+def check_sample_wave(self, results_from_group, run_id: int, session_id: int, next_offset: int):
+    """
+    Runs after each sample wave: update the failure-rate estimate, then stop
+    if the interval is narrow enough (or the plan is used up), otherwise
+    dispatch the next wave.
+    """
+    run = db.session.get(TestRun, run_id)
+    session = db.session.get(ExecutionSession, session_id)
+    if not run or not session:
+        logger.error(f"SampleWave TR_ID:{run_id}: run or session {session_id} not found.")
+        return {'status': 'FAILED', 'reason': 'not found'}
+
+    exec_config = run.get_execution_config()
+    stats = sample_run_estimate(session, exec_config.get('ci_confidence', 0.95))
+    target_width = exec_config.get('ci_width', 0.1)
+    planned = len(session.sample_plan['order'])
+    stats['planned_cases'] = planned
+    stats['dispatched_cases'] = next_offset
+
+    if run.status in ('cancelled', 'failed'):
+        stats['stop_reason'] = run.status
+    elif (stats['completed'] >= exec_config.get('sample_min_cases', 30)
+            and stats['unobserved_weight'] == 0 and stats['ci_width'] <= target_width):
+        stats['stop_reason'] = 'ci_width_reached'
+    elif next_offset >= planned:
+        stats['stop_reason'] = 'plan_exhausted'
+    else:
+        session.sample_stats = stats
+        db.session.commit()
+        emit_run_update(run_id, 'progress_update', run.get_status_data())
+        _dispatch_sample_wave(run, session, next_offset, exec_config)
+        return {'status': 'CONTINUING', 'ci_width': stats['ci_width']}
+
+    stats['stopped_early'] = stats['stop_reason'] == 'ci_width_reached'
+    session.sample_stats = stats
+    if stats['stopped_early']:
+        # Nothing more will be dispatched; progress is measured against what ran
+        session.total_test_cases = session.completed_test_cases
+    logger.info(f"SampleWave TR_ID:{run_id}: stopping ({stats['stop_reason']}) after {stats['completed']} result(s), "
+                f"failure rate {stats['failure_rate']} CI [{stats['ci_low']:.3f}, {stats['ci_high']:.3f}].")
+    if run.status not in ('cancelled', 'failed'):
+        finalize_run.delay(None, run_id=run_id, final_status='completed')
+    return {'status': 'STOPPED', 'reason': stats['stop_reason']}
+
 def _count_cases(run: TestRun) -> int:
     # Recalculate based on eager-loaded data
     count = 0
@@ -238,7 +391,50 @@ def _count_cases(run: TestRun) -> int:
     return count
 
 
-def _create_execution_session(run_id: int, session, total_test_cases: int = 0) -> int: 
+def _collect_base_cases(suite_list, dedupe_prompts: bool = True) -> List[Tuple[int, str]]:
+    """
+    (case_id, prompt) for every case in the run's suites, in suite order.
+
+    A case shared by several suites is only run once; with dedupe_prompts,
+    distinct cases with exactly the same prompt (and so the same request) are too.
+    """
+    base_cases = []
+    seen_ids, seen_hashes = set(), set()
+    for suite in suite_list:
+        for tc in suite.test_cases:
+            if tc.id in seen_ids:
+                continue
+            seen_ids.add(tc.id)
+            if dedupe_prompts and tc.prompt_hash:
+                if tc.prompt_hash in seen_hashes:
+                    continue
+                seen_hashes.add(tc.prompt_hash)
+            base_cases.append((tc.id, tc.prompt))
+    return base_cases
+
+def _sample_base_cases(suite_list, sample_size: int, seed: int = None,
+                       dedupe_prompts: bool = True) -> List[Tuple[int, str]]:
+    """(case_id, prompt) for a random sample of the run's cases, drawn in SQL without replacement."""
+    case_ids = sample_case_ids([suite.id for suite in suite_list], sample_size, seed)
+    rows = {
+        row.id: row for row in db.session.query(
+            TestCase.id, TestCase.prompt, TestCase.prompt_hash
+        ).filter(TestCase.id.in_(case_ids))
+    }
+    base_cases = []
+    seen_hashes = set()
+    for case_id in case_ids:
+        row = rows.get(case_id)
+        if row is None:
+            continue
+        if dedupe_prompts and row.prompt_hash:
+            if row.prompt_hash in seen_hashes:
+                continue
+            seen_hashes.add(row.prompt_hash)
+        base_cases.append((row.id, row.prompt))
+    return base_cases
+
+def _create_execution_session(run_id: int, session, total_test_cases: int = 0, request_manifest: Dict = None) -> int: 
     """Create a new execution session for the fresh execution engine."""
     new_session = ExecutionSession(
         test_run_id=run_id,
@@ -248,7 +444,8 @@ def _create_execution_session(run_id: int, session, total_test_cases: int = 0) -
         total_test_cases=total_test_cases,
         completed_test_cases=0,
         successful_test_cases=0,
-        failed_test_cases=0
+        failed_test_cases=0,
+        request_manifest=request_manifest
     )
     session.add(new_session)
     session.flush() # Flush to get the ID for the new_session if needed before commit
@@ -266,6 +463,7 @@ def _finalize_run_status(run_id: int, final_status: str, session, message: str =
 
     # Use fresh model approach to complete execution
     run.complete_execution(final_status)
+    invalidate_dashboard_stats(run.user_id)
     
     # Determine event name for WebSocket emission
     if final_status == 'completed_with_no_cases' or final_status == 'completed':